@@ -0,0 +1,92 @@
+import random
+from datetime import date
+from typing import Iterator
+from habit_tracker.database import Database
+from habit_tracker.habit import Habit, EPOCH_ORDINAL, from_epoch_day
+
+"""
+Generator module including the synthetic habit histories used by the benchmark suite.
+"""
+
+PATTERNS = ("uniform", "bursty", "weekdays", "lapses")
+CATEGORIES = ("health", "education", "mental health", "work", "general")
+
+
+def completion_flags(periods: int, probability: float, pattern: str, rng: random.Random, start: int = 0) -> Iterator[bool]:
+    """
+    Yield whether each period of a history was completed.
+    :param periods: Number of periods (days or weeks) in the history.
+    :param probability: Average share of completed periods.
+    :param pattern: Gap pattern: "uniform" (independent periods), "bursty" (long streaks and long gaps),
+                    "weekdays" (weekends skipped) or "lapses" (multi-week breaks between active spells).
+    :param rng: Random number generator.
+    :param start: Epoch day of the first period, used by the "weekdays" pattern.
+    """
+    if pattern not in PATTERNS:
+        raise ValueError(f"Unknown gap pattern '{pattern}'.")
+    completed = rng.random() < probability
+    lapse = 0
+    for period in range(periods):
+        if pattern == "uniform":
+            completed = rng.random() < probability
+        elif pattern == "bursty":
+            # Sticky two-state chain whose stationary share of completed periods is the probability.
+            completed = rng.random() < (0.9 + 0.1 * probability if completed else 0.1 * probability)
+        elif pattern == "weekdays":
+            completed = (start + period + 3) % 7 < 5 and rng.random() < min(1.0, probability * 7 / 5)
+        else:
+            if lapse:
+                lapse -= 1
+                completed = False
+                continue
+            if rng.random() < 0.01:
+                lapse = rng.randint(14, 42)
+            completed = rng.random() < probability
+        yield completed
+
+def generate_habits(habits: int, years: float, probability: float = 0.7, pattern: str = "uniform",
+                    weekly_share: float = 0.2, seed: int = 0, end: date = None) -> Iterator[Habit]:
+    """
+    Yield habits with synthetic completion histories ending on a given date.
+    :param habits: Number of habits.
+    :param years: Years of history per habit.
+    :param probability: Average share of completed periods.
+    :param pattern: Gap pattern (see completion_flags).
+    :param weekly_share: Share of weekly habits.
+    :param seed: Seed of the random number generator.
+    :param end: Last day of the history (default: today).
+    """
+    rng = random.Random(seed)
+    last = (end or date.today()).toordinal() - EPOCH_ORDINAL
+    days = int(years * 365)
+    for number in range(habits):
+        weekly = rng.random() < weekly_share
+        habit = Habit(f"habit-{number:07d}", "weekly" if weekly else "daily", rng.choice(CATEGORIES))
+        first = last - days + 1
+        habit.creation_date = from_epoch_day(first)
+        step = 7 if weekly else 1
+        periods = range(first, last + 1, step)
+        flags = completion_flags(len(periods), probability, pattern, rng, first)
+        habit.completion_days.extend(day for day, completed in zip(periods, flags) if completed)
+        yield habit
+
+def habits_for(completions: int, years: float, probability: float) -> int:
+    """
+    Return the number of daily habits needed for about the given number of completions.
+    :param completions: Target number of completions.
+    :param years: Years of history per habit.
+    :param probability: Average share of completed periods.
+    """
+    return max(1, round(completions / (years * 365 * probability)))
+
+def populate(db: Database, habits: Iterator[Habit]) -> int:
+    """
+    Save generated habits and return the number of completions written.
+    :param db: Database to save to.
+    :param habits: Habits to save.
+    """
+    count = 0
+    for habit in habits:
+        db.save_habit(habit)
+        count += len(habit.completion_days)
+    return count
@@ -0,0 +1,216 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from habit_tracker import analytics, trends
+from habit_tracker.async_database import AsyncDatabase
+from habit_tracker.database import Database
+from habit_tracker.habit import Habit
+from habit_tracker.snapshot import Snapshot, write_snapshot
+from .generator import PATTERNS, generate_habits, habits_for, populate
+
+"""
+Benchmark runner module timing persistence, analytics and CLI commands on synthetic histories, writing the
+results as JSON and comparing them with a stored baseline.
+
+Usage: python -m benchmarks.run [--sizes 1e3 1e5 1e7] [--output results.json] [--baseline benchmarks/baseline.json]
+"""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+CLI_COMMANDS = {
+    "list": ["list"],
+    "analyze_all": ["analyze", "--ls", "--cs", "--cr", "--ms", "--wr", "--mr"],
+    "analyze_habit": ["analyze", "--id", "1", "--ls", "--cs", "--cr"],
+    "complete": ["complete", "--id", "1"],
+    "create": ["create", "--t", "benchmark", "--p", "daily"],
+    "export": ["export", "--f", "export.csv"],
+    "delete": ["delete", "--id", "2"],
+}
+
+
+def best_of(function, repeat: int) -> float:
+    """
+    Return the fastest of several runs of a function, in seconds.
+    :param function: Function to time.
+    :param repeat: Number of runs.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def bench_analytics(habits: list[Habit], repeat: int) -> dict:
+    """
+    Time each analytics function over loaded habits with every available backend.
+    :param habits: Habits with completions.
+    :param repeat: Number of runs per measurement.
+    """
+    results = {}
+    for backend in analytics.BACKENDS:
+        if analytics.set_backend(backend) != backend:
+            continue
+        functions = {
+            "calculate_longest_streak_all": lambda: analytics.calculate_longest_streak_all(habits),
+            "calculate_longest_streak_habit": lambda: [analytics.calculate_longest_streak_habit(h) for h in habits],
+            "calculate_current_streak": lambda: [analytics.calculate_current_streak(h) for h in habits],
+            "get_completion_rate": lambda: [analytics.get_completion_rate(h) for h in habits],
+            "get_most_struggled_habit": lambda: analytics.get_most_struggled_habit(habits),
+        }
+        for name, function in functions.items():
+            results[f"analytics.{backend}.{name}"] = best_of(function, repeat)
+    analytics.set_backend("python")
+    results["analytics.generate_weekly_report"] = best_of(lambda: analytics.generate_weekly_report(habits), repeat)
+    results["analytics.generate_monthly_report"] = best_of(lambda: analytics.generate_monthly_report(habits), repeat)
+    start = date.today() - timedelta(days=90)
+    results["analytics.calculate_current_streak.as_of"] = best_of(
+        lambda: [analytics.calculate_current_streak(h, start) for h in habits], repeat)
+    results["trends.cohort_trend.90_days"] = best_of(lambda: trends.cohort_trend(habits, start, date.today()), repeat)
+    return results
+
+def bench_concurrency(db_path: str, habit_count: int, clients: int = 32, operations: int = 20) -> dict:
+    """
+    Time lookups and completions issued by many clients, once one call after the other on Database and once
+    with all clients running concurrently on AsyncDatabase.
+    :param db_path: Path to the populated SQLite database file.
+    :param habit_count: Number of habits in the database.
+    :param clients: Number of concurrent clients.
+    :param operations: Calls per client.
+    """
+    ids = [[(client * operations + i) % habit_count + 1 for i in range(operations)] for client in range(clients)]
+    results = {}
+    db = Database(db_path)
+    for operation in ("get_habit", "record_completion"):
+        method = getattr(db, operation)
+        results[f"Database.concurrent.{operation}"] = best_of(lambda: [method(id) for client in ids for id in client], 1)
+    db.close()
+
+    async def run_async(operation: str):
+        async with AsyncDatabase(db_path) as adb:
+            async def client(habit_ids: list[int]):
+                for id in habit_ids:
+                    await getattr(adb, operation)(id)
+            await asyncio.gather(*(client(habit_ids) for habit_ids in ids))
+
+    for operation in ("get_habit", "record_completion"):
+        results[f"AsyncDatabase.concurrent.{operation}"] = best_of(lambda: asyncio.run(run_async(operation)), 1)
+    return results
+
+def bench_cli(workdir: str, repeat: int) -> dict:
+    """
+    Time each CLI command end to end in a fresh interpreter against the database in workdir/data.
+    :param workdir: Directory containing data/habits.db.
+    :param repeat: Number of runs per command.
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+    results = {}
+    for name, arguments in CLI_COMMANDS.items():
+        command = [sys.executable, "-m", "habit_tracker", "--direct", *arguments]
+        runs = 1 if name == "create" else repeat
+        results[f"cli.{name}"] = best_of(lambda: subprocess.run(command, cwd=workdir, env=env, check=True,
+                                                                  stdout=subprocess.DEVNULL,
+                                                                  stderr=subprocess.DEVNULL), runs)
+    return results
+
+def bench_size(completions: int, years: float, probability: float, pattern: str, repeat: int) -> dict:
+    """
+    Generate a database with about the given number of completions and time every benchmark on it.
+    :param completions: Target number of completions.
+    :param years: Years of history per habit.
+    :param probability: Average share of completed periods.
+    :param pattern: Gap pattern of the generated histories.
+    :param repeat: Number of runs per measurement.
+    """
+    with tempfile.TemporaryDirectory() as workdir:
+        db = Database(os.path.join(workdir, "data", "habits.db"))
+        count = habits_for(completions, years, probability)
+        habits = generate_habits(count, years, probability, pattern, end=date.today())
+        start = time.perf_counter()
+        written = populate(db, habits)
+        results = {"generate_and_save": time.perf_counter() - start}
+        results["Database.load_habits"] = best_of(db.load_habits, repeat)
+        results["Database.load_stats"] = best_of(db.load_stats, repeat)
+        snapshot = os.path.join(workdir, "data", "habits.snapshot")
+        results["Snapshot.write"] = best_of(lambda: write_snapshot(db, snapshot), 1)
+        results["Snapshot.load_habits"] = best_of(lambda: list(Snapshot(snapshot)), repeat)
+        year, week = date.today().isocalendar()[:2]
+        results["Database.period_report"] = best_of(lambda: db.period_report("week", (year, week)), repeat)
+        new = next(generate_habits(1, years, probability, pattern, seed=1))
+        new.name = "benchmark-save"
+        results["Database.save_habit.new"] = best_of(lambda: db.save_habit(new), 1)
+        results["Database.save_habit.append"] = best_of(lambda: (new.complete_habit(), db.save_habit(new)), repeat)
+        results.update(bench_analytics(db.load_habits(), repeat))
+        db.close()
+        results.update(bench_concurrency(db.db_path, count))
+        results.update(bench_cli(workdir, repeat))
+    return {"habits": count, "completions": written, "timings": results}
+
+def compare(results: dict, baseline: dict, tolerance: float, min_delta: float = 0.001) -> list[str]:
+    """
+    Return a line for every timing slower than its baseline by more than the tolerance.
+    :param results: Benchmark results.
+    :param baseline: Baseline results with the same layout.
+    :param tolerance: Allowed slowdown (e.g., 0.25 for 25%).
+    :param min_delta: Slowdowns below this many seconds are treated as noise.
+    """
+    regressions = []
+    for size, result in results["sizes"].items():
+        reference = baseline.get("sizes", {}).get(size, {}).get("timings", {})
+        for name, seconds in result["timings"].items():
+            if name in reference and seconds > reference[name] * (1 + tolerance) + min_delta:
+                regressions.append(f"{size} {name}: {seconds * 1000:.2f} ms "
+                                   f"(baseline {reference[name] * 1000:.2f} ms, {seconds / reference[name]:.2f}x)")
+    return regressions
+
+def main(argv: list[str] = None) -> int:
+    """
+    Run the benchmark suite and return the process exit code (1 if a regression was found).
+    :param argv: Command-line arguments (default: sys.argv).
+    """
+    parser = argparse.ArgumentParser(description="Habit tracker benchmark suite.")
+    parser.add_argument("--sizes", nargs="+", default=["1e3", "1e5"], help="Target completion counts (e.g., 1e3 1e5 1e7).")
+    parser.add_argument("--years", type=float, default=2, help="Years of history per habit.")
+    parser.add_argument("--probability", type=float, default=0.7, help="Average share of completed periods.")
+    parser.add_argument("--pattern", choices=PATTERNS, default="bursty", help="Gap pattern of the generated histories.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (the fastest is kept).")
+    parser.add_argument("--output", default="benchmark-results.json", help="File to write the results to.")
+    parser.add_argument("--baseline", default=BASELINE, help="Baseline results to compare with.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before a timing is reported.")
+    parser.add_argument("--min-delta", type=float, default=1.0, help="Slowdowns below this many milliseconds are ignored.")
+    parser.add_argument("--update-baseline", action="store_true", help="Store the results as the new baseline.")
+    args = parser.parse_args(argv)
+    results = {"python": platform.python_version(), "machine": platform.machine(), "years": args.years,
+               "probability": args.probability, "pattern": args.pattern, "sizes": {}}
+    for size in args.sizes:
+        print(f"Benchmarking {size} completions...", file=sys.stderr)
+        results["sizes"][size] = bench_size(int(float(size)), args.years, args.probability, args.pattern, args.repeat)
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2)
+    for size, result in results["sizes"].items():
+        print(f"\n{size} completions ({result['completions']} written, {result['habits']} habits)")
+        for name, seconds in result["timings"].items():
+            print(f"  {name:<52} {seconds * 1000:10.2f} ms")
+    if args.update_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(results, file, indent=2)
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --update-baseline to store one.")
+        return 0
+    with open(args.baseline) as file:
+        regressions = compare(results, json.load(file), args.tolerance, args.min_delta / 1000)
+    print("\nRegressions:" if regressions else "\nNo regressions against the baseline.")
+    for line in regressions:
+        print(f"  {line}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,7 @@
+from habit_tracker.cli import cli
+
+"""
+Entry point allowing the application to be run with "python -m habit_tracker".
+"""
+
+cli()
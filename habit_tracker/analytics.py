@@ -1,11 +1,59 @@
-from datetime import datetime, timedelta
-from typing import List
-from .habit import Habit
+import heapq
+from bisect import bisect_left, bisect_right
+from datetime import datetime, date
+from typing import Callable, Iterable, List, Union
+from .habit import Habit, EPOCH_ORDINAL, from_epoch_day, to_epoch_day, to_period
+from .stats import HabitStats
 
 """ 
 Analytics module including all the functions to analyze habit information and records.
 """
 
+BACKENDS = ("python", "numpy")
+numpy_backend = None
+cache = None
+
+
+def set_backend(name: str) -> str:
+    """
+    Select the engine used to compute statistics from completions. The "numpy" backend
+    falls back to pure Python when NumPy is not installed.
+    :param name: Backend name ("python" or "numpy").
+    :return: Name of the backend actually selected.
+    """
+    global numpy_backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown analytics backend '{name}'.")
+    numpy_backend = None
+    if name == "numpy":
+        try:
+            from . import numpy_analytics
+            numpy_backend = numpy_analytics
+        except ImportError:
+            return "python"
+    return name
+
+
+def set_cache(analytics_cache) -> None:
+    """
+    Memoize per-habit results in an AnalyticsCache, keyed by habit ID, habit version and day.
+    :param analytics_cache: Cache to use, or None to compute every result.
+    """
+    global cache
+    cache = analytics_cache
+
+def memoized(habit: Union[Habit, HabitStats], metric: str, compute: Callable[[], object], persist: bool = True) -> object:
+    """
+    Return a per-habit result from the cache, or compute it when caching is off or the habit has unsaved changes.
+    :param habit: Habit or precomputed habit statistics the result belongs to.
+    :param metric: Result name (e.g., "current_streak").
+    :param compute: Function computing the result.
+    :param persist: Allow storing the result in the on-disk cache.
+    """
+    if cache is None or habit.id is None or habit.version is None or (isinstance(habit, Habit) and habit.unsaved_changes()):
+        return compute()
+    return cache.get(habit.id, habit.version, metric, compute, persist)
+
 
 def get_all(habits: List[Habit]) -> List[Habit]:
     """
@@ -31,110 +79,227 @@ def get_by_category(habits: List[Habit], category: str) -> List[Habit]:
     """
     return [habit for habit in habits if habit.category == category]
 
-def calculate_longest_streak_all(habits: List[Habit]) -> int:
+def habit_stats(habit: Union[Habit, HabitStats]) -> HabitStats:
+    """
+    Return precomputed statistics as they are, or compute them from the completions of a habit (with the
+    Python engine for habits with compacted history).
+    :param habit: Habit or precomputed habit statistics.
+    """
+    if isinstance(habit, HabitStats):
+        return habit
+    return memoized(habit, "stats", lambda: numpy_backend.habit_stats(habit) if numpy_backend and habit.summary is None
+                    else HabitStats.from_habit(habit), persist=False)
+
+def reference_day(as_of: date = None) -> int:
+    """
+    Return the epoch day of a reference date.
+    :param as_of: Reference date (default: today).
+    """
+    return (as_of or datetime.now().date()).toordinal() - EPOCH_ORDINAL
+
+def current_period(periodicity: str, as_of: date = None) -> int:
+    """
+    Return the period (epoch day or ISO week ordinal) containing a reference date.
+    :param periodicity: Periodicity of the habit ("daily" or "weekly").
+    :param as_of: Reference date (default: today).
+    """
+    return to_period(reference_day(as_of), periodicity)
+
+def habit_stats_as_of(habit: Union[Habit, HabitStats], as_of: date = None) -> HabitStats:
+    """
+    Return the statistics of a habit counting only completions up to a reference date (inclusive). Statistics
+    without any completion after the reference date are returned as they are; otherwise they are folded from
+    the completions of the habit up to the reference date, and remember that date (see HabitStats.through).
+    :param habit: Habit or precomputed habit statistics.
+    :param as_of: Reference date (default: today).
+    """
+    day = reference_day(as_of)
+    stats = habit_stats(habit)
+    if as_of is None or stats.through == day or stats.through is None and \
+            (stats.last_period is None or stats.last_period < to_period(day + 1, stats.periodicity)):
+        return stats
+    if isinstance(habit, HabitStats):
+        raise ValueError(f"The completions of {habit.name} are needed to analyze it as of {from_epoch_day(day)}.")
+    if habit.summary is not None and habit.summary.horizon > day + 1:
+        raise ValueError(f"The history of {habit.name} before {from_epoch_day(habit.summary.horizon)} has been compacted.")
+    stats = HabitStats(habit.id, habit.name, habit.periodicity, habit.category, habit.creation_date)
+    if habit.summary is not None:
+        stats.set_metrics(habit.summary.metrics())
+    stats.add_days(habit.completion_days[:bisect_right(habit.completion_days, day)])
+    stats.through = day
+    return stats
+
+def live_streak(stats: HabitStats, day: int) -> int:
+    """
+    Return the current streak of habit statistics on an epoch day, kept alive while the habit was completed
+    in the period of the day or the previous period.
+    :param stats: Statistics of the completions up to the day.
+    :param day: Epoch day the streak is evaluated on.
+    """
+    if stats.last_period is None or stats.last_period < to_period(day, stats.periodicity) - 1:
+        return 0
+    return stats.current_streak
+
+def period_rate(stats: HabitStats, day: int) -> float:
+    """
+    Return the share of periods from the creation of a habit up to an epoch day with at least one completion.
+    :param stats: Statistics of the completions up to the day.
+    :param day: Epoch day the rate is evaluated on.
+    """
+    if not stats.completed_periods:
+        return 0.0
+    creation_period = to_period(to_epoch_day(stats.creation_date), stats.periodicity)
+    total_periods = to_period(day, stats.periodicity) - creation_period + 1
+    if total_periods <= 0:
+        return 0.0
+    return stats.completed_periods / total_periods
+
+def calculate_longest_streak_all(habits: List[Union[Habit, HabitStats]]) -> int:
     """
     Calculate longest streak across all habits.
-    :param habits: List of habits.
+    :param habits: List of habits or precomputed habit statistics.
     """
     return max((calculate_longest_streak_habit(habit) for habit in habits), default = 0)
 
-def calculate_longest_streak_habit(habit: Habit) -> int:
+def calculate_longest_streak_habit(habit: Union[Habit, HabitStats]) -> int:
     """
-    Calculate longest streak for a specific habit.
-    :param habit: Habit to calculate longest streak for.
+    Calculate longest streak (consecutive completed days or weeks) for a specific habit.
+    :param habit: Habit or precomputed habit statistics to calculate longest streak for.
     """
-    if not habit.completion_dates:
-        return 0
-    dates = sorted([datetime.fromisoformat(date) for date in habit.completion_dates])
-    streak = max_streak = 1
-    for i in range(1, len(dates)):
-        delta = (dates[i].date() - dates[i - 1].date()).days if habit.periodicity == "daily" else (dates[i].isocalendar()[1] - dates[i - 1].isocalendar()[1])
-        streak = streak + 1 if delta == 1 else 1
-        max_streak = max(streak, max_streak)
-    return max_streak
+    return memoized(habit, "longest_streak", lambda: habit_stats(habit).longest_streak)
 
-def calculate_current_streak(habit: Habit) -> int:
+def calculate_current_streak(habit: Union[Habit, HabitStats], as_of: date = None) -> int:
     """
-    Calculate current streak for a specific habit.
-    :param habit: Habit to calculate current streak for.
+    Calculate current streak for a specific habit. The streak is kept alive while the habit was completed
+    in the current or the previous period.
+    :param habit: Habit or precomputed habit statistics to calculate current streak for.
+    :param as_of: Reference date; completions after it are ignored (default: today).
     """
-    if not habit.completion_dates:
-        return 0
-    dates = sorted([datetime.fromisoformat(date).date() for date in habit.completion_dates], reverse=True)
-    today = datetime.now().date()
-    delta = timedelta(days=1) if habit.periodicity == "daily" else timedelta(weeks=1)
-    streak = 0
-    for i, date in enumerate(dates):
-        if i == 0:
-            if (today - date) > delta:
-                break
-            streak += 1
-        else:
-            if (dates[i - 1] - date) == delta:
-                streak += 1
-            else:
-                break
-    return streak
-
-def get_most_struggled_habit(habits: List[Habit]) -> Habit:
+    metric = "current_streak" if as_of is None else f"current_streak@{as_of.isoformat()}"
+    return memoized(habit, metric, lambda: live_streak(habit_stats_as_of(habit, as_of), reference_day(as_of)),
+                    persist=as_of is None)
+
+def get_most_struggled_habit(habits: List[Union[Habit, HabitStats]]) -> Union[Habit, HabitStats]:
     """
     Get habit with most broken streaks
-    :param habits: List of habits.
+    :param habits: List of habits or precomputed habit statistics.
     """
-    def count_missed_periods(habit: Habit):
-        missed = 0
-        dates = sorted([datetime.fromisoformat(date).date() for date in habit.completion_dates])
-        for i in range(1, len(dates)):
-            previous, current = dates[i-1], dates[i]
-            expected = previous + timedelta(days=1) if habit.periodicity == "daily" else previous + timedelta(weeks=1)
-            if current > expected:
-                missed += 1
-        return missed
-    return max(habits, key=lambda habit: count_missed_periods(habit), default=None) if habits else None
+    return max(habits, key=get_missed_periods, default=None) if habits else None
 
-def get_completion_rate(habit: Habit) -> float:
+def get_missed_periods(habit: Union[Habit, HabitStats]) -> int:
     """
-    Calculate completion rate for a habit.
-    :param habit: Habit to calculate completion rate for.
+    Calculate the number of broken streaks (gaps between completed periods) of a habit.
+    :param habit: Habit or precomputed habit statistics.
     """
-    if not habit.completion_dates:
-        return 0.0
-    creation_date = datetime.fromisoformat(habit.creation_date).date()
-    today = datetime.now().date()
-    if habit.periodicity == "daily":
-        total_periods = (today - creation_date).days + 1
-    else:
-        creation_week = creation_date.isocalendar()[1]
-        current_week = today.isocalendar()[1]
-        total_periods = (current_week - creation_week) + 1
+    return memoized(habit, "missed_periods", lambda: habit_stats(habit).missed_periods)
 
-    if total_periods <= 0:
-        return 0.0
-    return len(habit.completion_dates) / total_periods
+def get_completion_rate(habit: Union[Habit, HabitStats], as_of: date = None) -> float:
+    """
+    Calculate completion rate (share of periods since creation with at least one completion) for a habit.
+    :param habit: Habit or precomputed habit statistics to calculate completion rate for.
+    :param as_of: Reference date; completions and periods after it are ignored (default: today).
+    """
+    metric = "completion_rate" if as_of is None else f"completion_rate@{as_of.isoformat()}"
+    return memoized(habit, metric, lambda: period_rate(habit_stats_as_of(habit, as_of), reference_day(as_of)),
+                    persist=as_of is None)
 
-def generate_weekly_report(habits: List[Habit]) -> dict:
+def week_bounds(year: int, week: int) -> tuple[int, int]:
+    """
+    Return the first and last epoch day of an ISO week.
+    :param year: ISO year (e.g., 2025).
+    :param week: ISO week number (1-53).
+    """
+    monday = date.fromisocalendar(year, week, 1).toordinal() - EPOCH_ORDINAL
+    return monday, monday + 6
+
+def month_bounds(year: int, month: int) -> tuple[int, int]:
+    """
+    Return the first and last epoch day of a calendar month.
+    :param year: Year (e.g., 2025).
+    :param month: Month (1-12).
+    """
+    first = date(year, month, 1).toordinal() - EPOCH_ORDINAL
+    following = date(year + month // 12, month % 12 + 1, 1).toordinal() - EPOCH_ORDINAL
+    return first, following - 1
+
+def completed_between(habit: Habit, start: int, end: int) -> bool:
+    """
+    Return whether a habit was completed between two epoch days (inclusive), by binary search
+    over its sorted completion days.
+    :param habit: Habit to check.
+    :param start: First epoch day of the range.
+    :param end: Last epoch day of the range.
+    """
+    days = habit.completion_days
+    index = bisect_left(days, start)
+    return index < len(days) and days[index] <= end
+
+def generate_weekly_report(habits: List[Habit], year: int = None, week: int = None, as_of: date = None) -> dict:
     """
     Generate weekly report for all habits.
     :param habits: List of habits.
+    :param year: ISO year of the week to report on (default: week of the reference date).
+    :param week: ISO week number of the week to report on (default: week of the reference date).
+    :param as_of: Reference date; completions after it are ignored (default: today).
     """
-    report = dict()
-    today = datetime.now().date()
-    week = today.isocalendar()[1]
-
-    for habit in habits:
-        completed = any(datetime.fromisoformat(date).isocalendar()[1] == week for date in habit.completion_dates)
-        report[habit.name] = completed
-    return report
+    if year is None or week is None:
+        year, week = (as_of or datetime.now().date()).isocalendar()[:2]
+    start, end = week_bounds(year, week)
+    end = min(end, reference_day(as_of)) if as_of else end
+    return {habit.name: completed_between(habit, start, end) for habit in habits}
 
-def generate_monthly_report(habits: List[Habit]) -> dict:
+def generate_monthly_report(habits: List[Habit], year: int = None, month: int = None, as_of: date = None) -> dict:
     """
     Generate monthly report for all habits.
     :param habits: List of habits.
+    :param year: Year of the month to report on (default: month of the reference date).
+    :param month: Month to report on (default: month of the reference date).
+    :param as_of: Reference date; completions after it are ignored (default: today).
+    """
+    if year is None or month is None:
+        reference = as_of or datetime.now().date()
+        year, month = reference.year, reference.month
+    start, end = month_bounds(year, month)
+    end = min(end, reference_day(as_of)) if as_of else end
+    return {habit.name: completed_between(habit, start, end) for habit in habits}
+
+RANKINGS = {
+    "longest_streak": calculate_longest_streak_habit,
+    "current_streak": calculate_current_streak,
+    "completion_rate": get_completion_rate,
+    "missed_periods": get_missed_periods,
+}
+
+def rank_habits(habits: Iterable[Union[Habit, HabitStats]], k: int, metric: str, bottom: bool = False,
+                group_by: str = None, groups: Iterable[str] = None,
+                bound: Callable[[Union[Habit, HabitStats]], float] = None) -> dict:
+    """
+    Select the k habits with the highest (or lowest) value of a metric, per group, keeping a heap of k entries per
+    group (O(n log k)). Ties go to the lower habit ID. Habits streamed in order of a bound on the metric (highest
+    first for top, lowest first for bottom) stop being read once no later habit can enter any group.
+    :param habits: Habits or precomputed habit statistics.
+    :param k: Number of habits per group.
+    :param metric: Metric to rank by (see RANKINGS).
+    :param bottom: Select the lowest values instead of the highest.
+    :param group_by: Attribute to group by ('category' or 'periodicity', default: no grouping).
+    :param groups: All values of the group attribute, needed to stop early with group_by.
+    :param bound: Function returning the bound on the metric of a habit and of all habits after it.
+    :return: (value, habit) pairs per group value (None without group_by), best first.
     """
-    report = dict()
-    today = datetime.now().date()
-    month = today.month
+    if metric not in RANKINGS:
+        raise ValueError(f"Unknown ranking metric '{metric}'.")
+    compute, sign = RANKINGS[metric], -1 if bottom else 1
+    heaps = {None: []} if group_by is None else {group: [] for group in groups or ()}
+    can_stop = k > 0 and bound is not None and (group_by is None or groups is not None)
     for habit in habits:
-        completed = any(datetime.fromisoformat(date).month == month for date in habit.completion_dates)
-        report[habit.name] = completed
-    return report
+        if can_stop and all(len(heap) >= k for heap in heaps.values()) and \
+                sign * bound(habit) < min(heap[0][0] for heap in heaps.values()):
+            break
+        heap = heaps.setdefault(getattr(habit, group_by) if group_by else None, [])
+        entry = (sign * compute(habit), -habit.id, habit)
+        if len(heap) < k:
+            heapq.heappush(heap, entry)
+        elif k and entry[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, entry)
+    return {group: [(sign * score, habit) for score, _, habit in sorted(heap, key=lambda entry: entry[:2], reverse=True)]
+            for group, heap in heaps.items()}
@@ -0,0 +1,196 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import AsyncIterator, Callable
+from .database import Database
+from .habit import Habit
+from .stats import HabitStats
+
+"""
+Async database module including an asyncio front end for Database. Writes run in order on one writer thread
+(completions arriving while it is busy are committed together in one transaction), reads run concurrently on a pool of reader threads (SQLite in WAL mode lets readers proceed while the writer
+commits), and a bound on queued operations applies backpressure to callers.
+"""
+
+
+class AsyncDatabase:
+    """
+    Asyncio interface to a Database with a dedicated writer thread and a reader thread pool.
+    """
+    def __init__(self, db_path: str = "data/habits.db", readers: int = 4, max_pending: int = 1000,
+                 stream_batch: int = 256, **options):
+        """
+        Initializes the thread pools; each thread opens its own connection on first use.
+        :param db_path: Path to the SQLite database file.
+        :param readers: Number of reader threads.
+        :param max_pending: Number of queued operations beyond which callers wait (backpressure).
+        :param stream_batch: Number of habits handed from a reader thread to the event loop at once.
+        :param options: Further Database settings (e.g., synchronous="FULL" or user="alice").
+        """
+        self.db = Database(db_path, **options)
+        self.writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="habit-writer")
+        self.readers = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="habit-reader")
+        self.pending = asyncio.Semaphore(max_pending)
+        self.stream_batch = stream_batch
+        self.completions = []
+        self.drainer = None
+
+    async def __aenter__(self) -> "AsyncDatabase":
+        """
+        Returns the database for use in an async with-statement.
+        """
+        return self
+
+    async def __aexit__(self, *exc_info):
+        """
+        Waits for queued operations and closes the database when leaving an async with-statement.
+        """
+        await self.close()
+
+    async def run(self, pool: ThreadPoolExecutor, function: Callable, *args, **kwargs):
+        """
+        Runs a Database method on a thread pool, waiting first while too many operations are queued.
+        :param pool: Writer or reader pool.
+        :param function: Database method to call.
+        :param args: Positional arguments of the method.
+        :param kwargs: Keyword arguments of the method.
+        """
+        async with self.pending:
+            return await asyncio.get_running_loop().run_in_executor(pool, lambda: function(*args, **kwargs))
+
+    async def close(self):
+        """
+        Waits for queued operations, stops the threads and closes every connection.
+        """
+        loop = asyncio.get_running_loop()
+        if self.drainer is not None:
+            await self.drainer
+        await loop.run_in_executor(None, self.writer.shutdown)
+        await loop.run_in_executor(None, self.readers.shutdown)
+        self.db.close()
+
+    async def save_habit(self, habit: Habit):
+        """
+        Saves a habit and its new completions on the writer thread (see Database.save_habit).
+        :param habit: Habit to save.
+        """
+        await self.run(self.writer, self.db.save_habit, habit)
+
+    async def record_completion(self, id: int, completion_date: str = None) -> str:
+        """
+        Appends a completion on the writer thread, in one transaction with the completions queued alongside it.
+        :param id: Habit ID to complete.
+        :param completion_date: ISO timestamp of the completion (default: now).
+        :return: The recorded completion timestamp.
+        :raises ValueError: If the habit does not exist or belongs to another user.
+        """
+        loop = asyncio.get_running_loop()
+        async with self.pending:
+            future = loop.create_future()
+            self.completions.append((id, completion_date or datetime.now().isoformat(), future))
+            if self.drainer is None or self.drainer.done():
+                self.drainer = loop.create_task(self.write_completions())
+            return await future
+
+    async def write_completions(self):
+        """
+        Writes queued completions in batches until the queue is empty and resolves the future of each completion
+        from the outcome of its own row.
+        """
+        loop = asyncio.get_running_loop()
+        while self.completions:
+            batch, self.completions = self.completions, []
+            written = await loop.run_in_executor(self.writer, self.db.record_completion_batch,
+                                                 [(id, date) for id, date, _ in batch])
+            for position, (id, date, future) in enumerate(batch):
+                if future.done():
+                    continue
+                if not written:
+                    future.set_exception(IOError(f"Completion of habit {id} could not be written."))
+                elif written[position]:
+                    future.set_result(date)
+                else:
+                    future.set_exception(ValueError(f"No habit with ID {id} found."))
+
+    async def record_completions(self, completions: list[tuple[int, str]]) -> int:
+        """
+        Appends completions in one transaction on the writer thread (see Database.record_completions).
+        :param completions: (habit id, ISO timestamp) pairs to append.
+        """
+        return await self.run(self.writer, self.db.record_completions, completions)
+
+    async def delete_habit(self, id: int):
+        """
+        Deletes a habit on the writer thread (see Database.delete_habit).
+        :param id: Habit ID to delete.
+        """
+        await self.run(self.writer, self.db.delete_habit, id)
+
+    async def get_habit(self, id: int, with_completions: bool = True) -> Habit:
+        """
+        Loads a single habit on a reader thread (see Database.get_habit).
+        """
+        return await self.run(self.readers, self.db.get_habit, id, with_completions)
+
+    async def find_habits(self, **filters) -> list[Habit]:
+        """
+        Loads habits matching the filters on a reader thread (see Database.find_habits).
+        """
+        return await self.run(self.readers, self.db.find_habits, **filters)
+
+    async def load_habits(self) -> list[Habit]:
+        """
+        Loads all habits and completions on a reader thread.
+        """
+        return await self.run(self.readers, self.db.load_habits)
+
+    async def load_stats(self, **filters) -> list[HabitStats]:
+        """
+        Loads precomputed statistics on a reader thread (see Database.load_stats).
+        """
+        return await self.run(self.readers, self.db.load_stats, **filters)
+
+    async def period_report(self, grain: str, start: tuple[int, int], end: tuple[int, int] = None, **filters) -> dict:
+        """
+        Counts completions per habit over a range of periods on a reader thread (see Database.period_report).
+        """
+        return await self.run(self.readers, self.db.period_report, grain, start, end, **filters)
+
+    async def iter_habits(self, **filters) -> AsyncIterator[Habit]:
+        """
+        Streams habits from a reader thread in batches through a bounded queue, so the reader pauses while
+        the consumer falls behind (see Database.iter_habits for the filters).
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=2)
+        done = object()
+        stopped = False
+
+        def produce():
+            batch = []
+            try:
+                for habit in self.db.iter_habits(**filters):
+                    batch.append(habit)
+                    if len(batch) >= self.stream_batch:
+                        asyncio.run_coroutine_threadsafe(queue.put(batch), loop).result()
+                        batch = []
+                        if stopped:
+                            return
+                if batch:
+                    asyncio.run_coroutine_threadsafe(queue.put(batch), loop).result()
+            finally:
+                asyncio.run_coroutine_threadsafe(queue.put(done), loop).result()
+
+        async with self.pending:
+            task = loop.run_in_executor(self.readers, produce)
+            finished = False
+            try:
+                while (batch := await queue.get()) is not done:
+                    for habit in batch:
+                        yield habit
+                finished = True
+            finally:
+                stopped = True
+                while not finished:
+                    finished = await queue.get() is done
+                await task
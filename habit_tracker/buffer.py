@@ -0,0 +1,164 @@
+import atexit
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from datetime import datetime
+from .database import Database
+
+"""
+Buffer module including the group-commit write buffer that coalesces completions from many producers
+into one SQLite transaction per batch.
+"""
+
+
+class WriteBuffer:
+    """
+    Collects completion events and writes them in a single transaction every max_events events or
+    max_delay seconds, whichever comes first. Each event gets a future that resolves once its
+    transaction has committed.
+    """
+    def __init__(self, db: Database, max_events: int = 1000, max_delay: float = 0.05, history: int = 10000):
+        """
+        Initializes the buffer and starts its writer thread.
+        :param db: Database the completions are written to.
+        :param max_events: Number of pending events that triggers a flush.
+        :param max_delay: Seconds an event may wait before it is flushed.
+        :param history: Number of recent flushes kept for the latency statistics.
+        """
+        self.db = db
+        self.max_events = max_events
+        self.max_delay = max_delay
+        self.pending = []
+        self.condition = threading.Condition()
+        self.closed = False
+        self.flush_requested = False
+        self.submitted = 0
+        self.committed = 0
+        self.failed = 0
+        self.flushes = 0
+        self.started = None
+        self.latencies = deque(maxlen=history)
+        self.thread = threading.Thread(target=self.run, name="habit-write-buffer", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def __enter__(self) -> "WriteBuffer":
+        """
+        Returns the buffer for use in a with-statement.
+        """
+        return self
+
+    def __exit__(self, *exc_info):
+        """
+        Flushes pending events and stops the writer thread when leaving a with-statement.
+        """
+        self.close()
+
+    def submit(self, id: int, completion_date: str = None) -> Future:
+        """
+        Queues a completion without waiting for it to be written.
+        :param id: Habit ID to complete.
+        :param completion_date: ISO timestamp of the completion (default: now).
+        :return: Future resolving to the completion timestamp once it is committed, or failing with ValueError
+                 if the habit does not exist and IOError if the transaction failed.
+        """
+        future = Future()
+        completion_date = completion_date or datetime.now().isoformat()
+        with self.condition:
+            if self.closed:
+                raise ValueError("Write buffer is closed.")
+            if self.started is None:
+                self.started = time.perf_counter()
+            self.pending.append((id, completion_date, future))
+            self.submitted += 1
+            if len(self.pending) == 1 or len(self.pending) >= self.max_events:
+                self.condition.notify_all()
+        return future
+
+    def record_completion(self, id: int, completion_date: str = None) -> str:
+        """
+        Queues a completion and waits until it is committed.
+        :param id: Habit ID to complete.
+        :param completion_date: ISO timestamp of the completion (default: now).
+        :return: The recorded completion timestamp.
+        """
+        return self.submit(id, completion_date).result()
+
+    def flush(self):
+        """
+        Waits until every event submitted so far is committed or has failed.
+        """
+        with self.condition:
+            target = self.submitted
+            self.flush_requested = True
+            self.condition.notify_all()
+            self.condition.wait_for(lambda: self.committed + self.failed >= target or not self.thread.is_alive())
+
+    def close(self):
+        """
+        Writes all pending events and stops the writer thread. Safe to call more than once.
+        """
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self.thread.join()
+        atexit.unregister(self.close)
+
+    def run(self):
+        """
+        Writer thread loop: waits for a full batch, the oldest event's deadline, a flush request or
+        shutdown, then writes the batch.
+        """
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.pending or self.closed)
+                if not self.pending:
+                    return
+                deadline = time.monotonic() + self.max_delay
+                self.condition.wait_for(lambda: len(self.pending) >= self.max_events or self.closed
+                                        or self.flush_requested or time.monotonic() >= deadline,
+                                        timeout=self.max_delay)
+                batch, self.pending = self.pending[:self.max_events], self.pending[self.max_events:]
+                self.flush_requested = bool(self.pending) and self.flush_requested
+            self.write(batch)
+
+    def write(self, batch: list[tuple[int, str, Future]]):
+        """
+        Commits one batch and resolves the future of each event from the outcome of its own row: the timestamp
+        once committed, ValueError if its habit does not exist, IOError if the transaction failed.
+        :param batch: (habit id, ISO timestamp, future) events to write.
+        """
+        start = time.perf_counter()
+        written = self.db.record_completion_batch([(id, date) for id, date, _ in batch])
+        self.latencies.append(time.perf_counter() - start)
+        for position, (id, date, future) in enumerate(batch):
+            if not written:
+                future.set_exception(IOError(f"Completion of habit {id} could not be written."))
+            elif written[position]:
+                future.set_result(date)
+            else:
+                future.set_exception(ValueError(f"No habit with ID {id} found."))
+        with self.condition:
+            self.flushes += 1
+            self.committed += sum(written)
+            self.failed += len(batch) - sum(written)
+            self.condition.notify_all()
+
+    def stats(self) -> dict:
+        """
+        Returns throughput, batch size and flush latency statistics.
+        """
+        with self.condition:
+            latencies = sorted(self.latencies)
+            elapsed = time.perf_counter() - self.started if self.started else 0
+            committed, flushes = self.committed, self.flushes
+
+        def percentile(share: float) -> float:
+            return latencies[min(len(latencies) - 1, int(share * len(latencies)))] * 1000 if latencies else 0.0
+
+        return {"committed": committed, "failed": self.failed, "flushes": flushes,
+                "events_per_second": committed / elapsed if elapsed else 0.0,
+                "mean_batch_size": committed / flushes if flushes else 0.0,
+                "flush_ms_p50": percentile(0.5), "flush_ms_p99": percentile(0.99),
+                "flush_ms_max": latencies[-1] * 1000 if latencies else 0.0}
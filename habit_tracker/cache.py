@@ -0,0 +1,100 @@
+from collections import OrderedDict
+from datetime import date
+from sqlite3 import Error
+from typing import Callable
+from .habit import EPOCH_ORDINAL
+
+"""
+Cache module including the memoization layer for per-habit analytics results. Results are keyed by habit ID,
+habit version and day: every write to a habit increments its version, so results of unchanged habits are
+reused until the day changes.
+"""
+
+
+class AnalyticsCache:
+    """
+    Least-recently-used cache of per-habit analytics results, optionally backed by the analytics_cache table.
+    """
+    def __init__(self, db=None, max_entries: int = 100000):
+        """
+        Initializes an empty cache.
+        :param db: Database whose analytics_cache table persists results across runs (optional).
+        :param max_entries: Number of results kept in memory before the least recently used are evicted.
+        """
+        self.db = db
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.dirty = {}
+        self.loaded_day = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, id: int, version: int, metric: str, compute: Callable[[], object], persist: bool = True,
+            today: int = None) -> object:
+        """
+        Returns a cached result, computing and storing it on a miss.
+        :param id: Habit ID.
+        :param version: Habit version the result is computed from.
+        :param metric: Result name (e.g., "current_streak").
+        :param compute: Function computing the result.
+        :param persist: Also store the result in the database (only for numbers).
+        :param today: Epoch day the result is valid for (default: today).
+        """
+        today = date.today().toordinal() - EPOCH_ORDINAL if today is None else today
+        if self.db is not None and self.loaded_day != today:
+            self.load(today)
+        key = (id, version, today, metric)
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        self.misses += 1
+        value = compute()
+        self.store(key, value)
+        if persist and self.db is not None:
+            self.dirty[(id, metric)] = (id, metric, version, today, value)
+        return value
+
+    def store(self, key: tuple, value: object):
+        """
+        Adds a result to the in-memory cache, evicting the least recently used results beyond the size limit.
+        :param key: (habit id, version, day, metric) key.
+        :param value: Result to cache.
+        """
+        self.entries[key] = value
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def load(self, today: int):
+        """
+        Loads the persisted results of the day that match the current habit versions.
+        :param today: Epoch day to load results for.
+        """
+        self.loaded_day = today
+        try:
+            cursor = self.db.connect().execute('''
+                SELECT c.id, c.version, c.metric, c.value
+                FROM analytics_cache c
+                JOIN habits h ON h.id = c.id AND h.version = c.version
+                WHERE c.day = ?
+            ''', (today,))
+            for id, version, metric, value in cursor:
+                self.store((id, version, today, metric), value)
+        except Error as e:
+            print(f"Error loading analytics cache: {e}")
+
+    def flush(self):
+        """
+        Writes results computed since the last flush to the database in one transaction.
+        """
+        if self.db is None or not self.dirty:
+            return
+        try:
+            with self.db.connect() as conn:
+                conn.executemany('''
+                    INSERT OR REPLACE INTO analytics_cache (id, metric, version, day, value)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', self.dirty.values())
+            self.dirty.clear()
+        except Error as e:
+            print(f"Error saving analytics cache: {e}")
@@ -1,21 +1,91 @@
+from habit_tracker.timing import Timer, phase
 import os
 import sys
+import time
+from typing import Iterator
 import click
-from tabulate import tabulate
-from habit_tracker.database import Database
-from habit_tracker.habit import Habit
-from habit_tracker.analytics import *
 
 """
 Command-line interface module including all the commands available to the user when running the application on terminal.
+Dependencies of each command are imported lazily inside the command, so short commands only pay for what they use.
 """
 
 @click.group()
-def cli():
+@click.option("--timing", is_flag=True, help="Print a breakdown of startup, import, connect, query and render time.")
+@click.option("--direct", is_flag=True, help="Open the database directly even when a daemon is serving it.")
+@click.option("--user", help="User whose habits to manage, stored in a shard file chosen by hash (data/shards).")
+@click.option("--profile", is_flag=True, help="Record calls of database and analytics functions (see the stats command).")
+@click.option("--dump-profile", metavar="PREFIX", help="Write cProfile (PREFIX.prof) and tracemalloc (PREFIX.tracemalloc) snapshots.")
+@click.pass_context
+def cli(ctx: click.Context, timing: bool, direct: bool, user: str, profile: bool, dump_profile: str):
     """
     Habit tracker command line interface.
     """
-    pass
+    if timing:
+        timer = ctx.ensure_object(Timer)
+        ctx.call_on_close(lambda: click.echo(timer.report(), err=True))
+    if profile:
+        from habit_tracker import profiling
+        profiling.enable()
+        ctx.call_on_close(report_profile)
+    if dump_profile:
+        from habit_tracker.profiling import snapshots
+        ctx.with_resource(snapshots(dump_profile))
+
+def timed(name: str):
+    """
+    Time a phase of the running command when --timing is enabled.
+    :param name: Phase name ('import', 'connect', 'query' or 'render').
+    """
+    return phase(click.get_current_context().find_object(Timer), name)
+
+def report_profile():
+    """
+    Print the calls recorded by --profile and add them to the statistics shown by the stats command.
+    """
+    from tabulate import tabulate
+    from habit_tracker import profiling
+    profiling.save()
+    click.echo(tabulate(profiling.report(), headers=profiling.HEADERS, floatfmt=".3f"), err=True)
+
+def user_database():
+    """
+    Open the database of the --user user on its shard, or the default database file without --user.
+    """
+    user = click.get_current_context().find_root().params.get("user")
+    if user is not None:
+        from habit_tracker.router import StorageRouter
+        return StorageRouter().database(user)
+    from habit_tracker.database import Database
+    return Database()
+
+def open_database():
+    """
+    Connect to the daemon serving the default database, or open the database directly when no daemon
+    is running, --direct is set or a --user is given.
+    """
+    params = click.get_current_context().find_root().params
+    if not params.get("direct") and params.get("user") is None:
+        from habit_tracker.client import connect
+        client = connect()
+        if client:
+            return client
+    return user_database()
+
+def offline_database():
+    """
+    Open the database directly for a command that writes around the daemon (import, compact, reset). Refused
+    while a daemon serves the default database, since it would keep serving its in-memory habits and its
+    pending completions, unless --direct is set.
+    """
+    params = click.get_current_context().find_root().params
+    if not params.get("direct") and params.get("user") is None:
+        from habit_tracker.client import connect
+        client = connect()
+        if client:
+            client.close()
+            raise ValueError("A daemon is serving the database; stop it first or use --direct.")
+    return user_database()
 
 @cli.command()
 @click.option("--task", "--t", required=True, type=str, help="Task name (e.g. 'exercise')")
@@ -29,10 +99,15 @@ def create(task: str, periodicity: str, category: str):
     :param category: Category (e.g. 'general')
     """
     try:
-        habit = Habit(task, periodicity, category)
-        db = Database()
-        db.save_habit(habit)
-        click.echo(f"Created {periodicity} {category} habit: {task} (ID: {habit.id})")
+        with timed("import"):
+            from habit_tracker.habit import Habit
+        with timed("connect"):
+            db = open_database()
+        with timed("query"):
+            habit = Habit(task, periodicity, category)
+            db.save_habit(habit)
+        with timed("render"):
+            click.echo(f"Created {periodicity} {category} habit: {task} (ID: {habit.id})")
     except ValueError as e:
         click.echo(f"Error:  {str(e)}")
     except Exception as e:
@@ -40,58 +115,174 @@ def create(task: str, periodicity: str, category: str):
 
 @cli.command()
 @click.option("--id", type=int, required=True, help="Habit ID to complete")
-def complete(id: int):
+@click.option("--key", help="Idempotency key of the completion; repeating a recorded key records nothing.")
+@click.option("--durable", is_flag=True, help="Wait until a daemon has committed the completion to the database.")
+def complete(id: int, key: str, durable: bool):
     """
-    Mark habit as complete.
+    Mark habit as complete. Exits with status 1 if the completion could not be recorded.
     :param id: Habit ID to complete.
+    :param key: Idempotency key of the completion event.
+    :param durable: Wait until a daemon has committed the completion (direct writes always are).
     """
     try:
-        db = Database()
-        habits = db.load_habits()
-        habit = next((habit for habit in habits if habit.id == id), None)
-        if not habit:
-            raise ValueError(f"No habit with ID {id} found.")
-        habit.complete_habit()
-        db.save_habit(habit)
-        click.echo(f"Completed habit: {habit.name}")
+        with timed("connect"):
+            db = open_database()
+        with timed("query"):
+            habit = db.get_habit(id, with_completions=False)
+            if not habit:
+                raise ValueError(f"No habit with ID {id} found.")
+            from habit_tracker.client import DaemonClient
+            if durable and isinstance(db, DaemonClient):
+                db.record_completion(habit.id, key=key, durable=True)
+            else:
+                db.record_completion(habit.id, key=key)
+        with timed("render"):
+            click.echo(f"Completed habit: {habit.name}")
     except Exception as e:
         click.echo(f"Error: {str(e)}")
+        sys.exit(1)
+
+def paging_options(command):
+    """
+    Add the output format and pagination options shared by list and analyze.
+    :param command: Command function to decorate.
+    """
+    command = click.option("--after-id", type=int, help="Only habits with a greater ID (keyset pagination).")(command)
+    command = click.option("--offset", type=click.IntRange(min=0), help="Number of matching habits to skip.")(command)
+    command = click.option("--limit", type=click.IntRange(min=0), help="Maximum number of habits to output.")(command)
+    return click.option("--format", "fmt", type=click.Choice(["table", "jsonl", "csv", "fixed"]),
+                        help="Output format; jsonl, csv and fixed stream rows as they are read.")(command)
 
 @cli.command()
 @click.option("--periodicity", "--p", type=click.Choice(["daily", "weekly"]), help="Filter habits by periodicity ('daily' or 'weekly')")
 @click.option("--category", "--c", type=str, help="Filter habits by category (e.g. 'health')")
-def list(periodicity: str, category: str):
+@paging_options
+def list(periodicity: str, category: str, fmt: str, limit: int, offset: int, after_id: int):
     """
     List all habits, filter by periodicity or category if desired.
     :param periodicity: Periodicity to filter by ('daily' or 'weekly')
     :param category: Category to filter by (e.g. 'general')
+    :param fmt: Output format ('table', 'jsonl', 'csv' or 'fixed').
+    :param limit: Maximum number of habits to output.
+    :param offset: Number of matching habits to skip.
+    :param after_id: Only list habits with a greater ID.
     """
     try:
-        db = Database()
-        habits = db.load_habits()
-        if periodicity:
-            habits = get_by_periodicity(habits, periodicity)
-        if category:
-            habits = get_by_category(habits, category)
-
-        table = [[habit.id, habit.name, habit.periodicity, habit.category] for habit in habits]
-        click.echo(tabulate(table, headers=["ID", "Task", "Periodicity", "Category"]))
+        with timed("import"):
+            from habit_tracker.output import write_rows
+        with timed("connect"):
+            db = open_database()
+        with timed("query"):
+            fields = ["id", "name", "periodicity", "category"]
+            widths = db.column_widths(periodicity, category) if fmt == "fixed" else {}
+            habits = db.iter_habits(min_id=None if after_id is None else after_id + 1, periodicity=periodicity,
+                                    category=category, limit=limit, offset=offset, with_completions=False)
+        with timed("render"):
+            rows = ([habit.id, habit.name, habit.periodicity, habit.category] for habit in habits)
+            write_rows(rows, fields, click.get_text_stream("stdout"), fmt or "table",
+                       ["ID", "Task", "Periodicity", "Category"], [widths.get(field, 0) for field in fields])
     except Exception as e:
         click.echo(f"Error: {str(e)}")
 
+def snapshot_habits(db, periodicity: str, category: str) -> list:
+    """
+    Return the matching habits of the snapshot of a database, or None (with a notice) if it is missing or stale.
+    :param db: Database the snapshot was written from.
+    :param periodicity: Periodicity to filter by (optional).
+    :param category: Category to filter by (optional).
+    """
+    from habit_tracker.snapshot import Snapshot, snapshot_path
+    path = snapshot_path(db)
+    if not os.path.exists(path):
+        click.echo(f"No snapshot at {path}; reading the database.", err=True)
+        return None
+    snapshot = Snapshot(path)
+    if not snapshot.is_current(db):
+        click.echo("The snapshot is out of date; reading the database (run export-snapshot to refresh it).", err=True)
+        snapshot.close()
+        return None
+    return [habit for habit in snapshot if (periodicity is None or habit.periodicity == periodicity)
+            and (category is None or habit.category == category)]
+
+def habit_history(db, id: int, periodicity: str, category: str, min_id: int = None, limit: int = None,
+                  offset: int = None) -> Iterator:
+    """
+    Stream the matching habits with their completions, for analytics as of a past date.
+    :param db: Database or daemon client to read from.
+    :param id: Habit ID to load (optional).
+    :param periodicity: Periodicity to filter by (optional).
+    :param category: Category to filter by (optional).
+    :param min_id: Lowest habit ID to load (optional).
+    :param limit: Maximum number of habits (optional).
+    :param offset: Number of matching habits to skip (optional).
+    """
+    if id is None:
+        return db.iter_habits(min_id=min_id, periodicity=periodicity, category=category, limit=limit, offset=offset)
+    habit = db.get_habit(id)
+    matches = habit is not None and (min_id is None or id >= min_id) and (periodicity in (None, habit.periodicity)) \
+        and (category in (None, habit.category))
+    return iter([habit] if matches and not offset and limit != 0 else [])
+
+def day_report(db, grain: str, reference, periodicity: str, category: str) -> dict:
+    """
+    Return the completions per habit from the first day of the week or month of a reference date up to that
+    date, from the day rollups of the database.
+    :param db: Database or daemon client to read from.
+    :param grain: Report period ('week' or 'month').
+    :param reference: Last date counted.
+    :param periodicity: Periodicity to filter by (optional).
+    :param category: Category to filter by (optional).
+    """
+    from datetime import timedelta
+    first = reference - timedelta(days=reference.weekday()) if grain == "week" else reference.replace(day=1)
+    start, end = ((day.year, day.timetuple().tm_yday) for day in (first, reference))
+    return db.period_report("day", start, end, periodicity=periodicity, category=category)
+
+def ranked_stats(db, metric: str, bottom: bool, group_by: str, periodicity: str, category: str) -> tuple:
+    """
+    Return the statistics stream to rank habits from: ordered by the metric index of the database when the stored
+    metric bounds the ranked value (so ranking stops early), otherwise all matching statistics.
+    :param db: Database or daemon client.
+    :param metric: Ranking metric.
+    :param bottom: Rank the lowest values.
+    :param group_by: Attribute to rank habits within (optional).
+    :param periodicity: Periodicity to filter by (optional).
+    :param category: Category to filter by (optional).
+    :return: (statistics, groups, bound) arguments for rank_habits.
+    """
+    from habit_tracker.database import Database
+    bounded = metric in ("longest_streak", "missed_periods") or (metric == "current_streak" and not bottom)
+    if not isinstance(db, Database) or not bounded:
+        return db.iter_stats(periodicity=periodicity, category=category), None, None
+    stats = db.iter_stats(periodicity=periodicity, category=category, order_by=metric, descending=not bottom)
+    groups = db.group_values(group_by, periodicity, category) if group_by else None
+    return stats, groups, lambda habit: getattr(habit, metric)
+
 @cli.command()
 @click.option("--id", type=int, help="Habit ID to analyze.")
 @click.option("--periodicity", "--p", type=click.Choice(["daily", "weekly"]), help="Filter habits by periodicity ('daily' or 'weekly')")
 @click.option("--category", "--c", type=str, help="Filter habits by category (e.g. 'health')")
 @click.option("--longest-streak", "--ls", is_flag=True, help="Calculate the longest streak.")
-@click.option("--current-streak", "--cs", is_flag=True, help="Calculate the current streak.")
-@click.option("--completion-rate", "--cr", is_flag=True, help="Calculate completion rate.")
+@click.option("--current-streak", "--cs", is_flag=True, help="Calculate the current streak (consecutive completed days or ISO weeks).")
+@click.option("--completion-rate", "--cr", is_flag=True, help="Calculate completion rate (share of periods since creation with at least one completion).")
 @click.option("--most-struggled", "--ms", is_flag=True, help="Calculate habit struggled with the most.")
 @click.option("--weekly-report", "--wr", is_flag=True, help="Calculate weekly report for habits.")
 @click.option("--monthly-report", "--mr", is_flag=True, help="Calculate monthly report for habits.")
-def analyze(id: int, periodicity: str, category: str, longest_streak, current_streak, completion_rate, most_struggled, weekly_report, monthly_report):
+@click.option("--backend", type=click.Choice(["python", "numpy"]), default="python", help="Analytics engine ('python' or 'numpy').")
+@click.option("--workers", type=click.IntRange(min=1), default=1, help="Worker processes for analyzing all habits.")
+@click.option("--as-of", type=click.DateTime(formats=["%Y-%m-%d"]), help="Reference date for streaks, completion rates and reports; later completions are ignored (default: today).")
+@click.option("--disk-cache", is_flag=True, help="Reuse today's results of earlier runs for habits that did not change.")
+@click.option("--all-users", is_flag=True, help="Aggregate the habits of all users across all shards.")
+@click.option("--snapshot", is_flag=True, help="Analyze all habits from the file written by export-snapshot while it is current.")
+@click.option("--top", type=click.IntRange(min=1), help="Rank the K habits with the highest value of the --by metric.")
+@click.option("--bottom", type=click.IntRange(min=1), help="Rank the K habits with the lowest value of the --by metric.")
+@click.option("--by", type=click.Choice(["longest_streak", "current_streak", "completion_rate", "missed_periods"]), default="longest_streak", help="Metric to rank habits by with --top or --bottom.")
+@click.option("--group-by", type=click.Choice(["category", "periodicity"]), help="Rank habits within each category or periodicity.")
+@paging_options
+def analyze(id: int, periodicity: str, category: str, longest_streak, current_streak, completion_rate, most_struggled, weekly_report, monthly_report, backend, workers, as_of, disk_cache, all_users, snapshot, top, bottom, by, group_by, fmt, limit, offset, after_id):
     """
-    Analyze all habits, or a specific habit by ID.
+    Analyze all habits, or a specific habit by ID. Streaks and completion rates count periods (days or ISO weeks)
+    with at least one completion.
     :param id: Habit ID to analyze.
     :param periodicity: Periodicity to filter by ('daily' or 'weekly')
     :param category: Category to filter by (e.g. 'health')
@@ -101,54 +292,158 @@ def analyze(id: int, periodicity: str, category: str, longest_streak, current_st
     :param most_struggled: Option to calculate the most struggled.
     :param weekly_report: Option to calculate weekly report.
     :param monthly_report: Option to calculate monthly report.
+    :param backend: Analytics engine ('python' or 'numpy').
+    :param workers: Number of worker processes for analyzing all habits.
+    :param as_of: Reference date for streaks, completion rates and reports.
+    :param disk_cache: Option to persist results in the database and reuse them in later runs.
+    :param all_users: Option to aggregate the habits of all users across all shards.
+    :param snapshot: Option to read all habits from the current snapshot file instead of the database.
+    :param top: Number of habits with the highest value of the ranking metric to list.
+    :param bottom: Number of habits with the lowest value of the ranking metric to list.
+    :param by: Ranking metric ('longest_streak', 'current_streak', 'completion_rate' or 'missed_periods').
+    :param group_by: Attribute to rank habits within ('category' or 'periodicity').
+    :param fmt: Output one row of metrics per habit in this format ('table', 'jsonl', 'csv' or 'fixed').
+    :param limit: Maximum number of habits to output with --format.
+    :param offset: Number of matching habits to skip with --format.
+    :param after_id: Only output habits with a greater ID with --format.
     """
     try:
-        db = Database()
-        habits = db.load_habits()
-        if periodicity:
-            habits = get_by_periodicity(habits, periodicity)
-        if category:
-            habits = get_by_category(habits, category)
-        if id:
-            habit = next((habit for habit in habits if habit.id == id), None)
-            if not habit:
-                raise ValueError(f"No habit with ID {id} found.")
-            if longest_streak:
-                click.echo(f"Longest streak for {habit.name}: {calculate_longest_streak_habit(habit)}")
-            if current_streak:
-                click.echo(f"Current streak for {habit.name}: {calculate_current_streak(habit)}")
-            if completion_rate:
-                click.echo(f"Completion rate for {habit.name}: {get_completion_rate(habit) * 100:.2f}%")
-            if most_struggled:
-                click.echo(f"Feature not available for a single habit ID.")
-            if weekly_report:
-                click.echo(f"Feature not available for a single habit ID.")
-            if monthly_report:
-                click.echo(f"Feature not available for a single habit ID.")
-        else:
-            if longest_streak:
-                click.echo(f"Longest streak across all habits: {calculate_longest_streak_all(habits)}")
-            if current_streak:
-                click.echo("Current streaks:")
-                for h in habits:
-                    click.echo(f"- {h.name}: {calculate_current_streak(h)}")
-            if completion_rate:
-                total_completion_rate = sum(get_completion_rate(habit) for habit in habits)
-                average = total_completion_rate / len(habits) if habits else 0
-                click.echo(f"Average completion rate across all habits: {average * 100:.2f}%")
-            if most_struggled:
-                struggled = get_most_struggled_habit(habits)
-                click.echo(f"Most struggled habit: {struggled.name if struggled else 'None'}")
-            if weekly_report:
-                report = generate_weekly_report(habits)
-                click.echo("\nWeekly Report:")
-                for name, completed in report.items():
-                    click.echo(f"- {name}: {'Completed' if completed else 'Not completed'}")
-            if monthly_report:
-                report = generate_monthly_report(habits)
-                click.echo("\nMonthly Report:")
-                for name, completed in report.items():
-                    click.echo(f"- {name}: {'Completed' if completed else 'Not completed'}")
+        with timed("import"):
+            from habit_tracker.database import Database
+            from datetime import datetime
+            from habit_tracker.analytics import (set_backend, set_cache, calculate_current_streak,
+                                                 calculate_longest_streak_habit, get_completion_rate, habit_stats,
+                                                 habit_stats_as_of, rank_habits, generate_weekly_report,
+                                                 generate_monthly_report)
+            from habit_tracker.cache import AnalyticsCache
+            from habit_tracker.output import write_rows
+            from habit_tracker.parallel import analyze_parallel, summarize
+            set_backend(backend)
+        with timed("connect"):
+            db = user_database() if workers > 1 or snapshot else open_database()
+            cache = AnalyticsCache(db if disk_cache and isinstance(db, Database) else None)
+            set_cache(cache if workers == 1 and not all_users else None)
+        reference = as_of.date() if as_of else None
+        if as_of and all_users:
+            raise ValueError("--as-of is not available with --all-users.")
+        if top or bottom:
+            if id or all_users or as_of:
+                raise ValueError("Rankings are not available for a single habit ID, with --all-users or with --as-of.")
+            with timed("query"):
+                lowest = top is None
+                stats, groups, bound = ranked_stats(db, by, lowest, group_by, periodicity, category)
+                ranking = rank_habits(stats, top or bottom, by, lowest, group_by, groups, bound)
+                rows = [[group, rank, habit.id, habit.name, round(value, 4)]
+                        for group, ranked in sorted(ranking.items(), key=lambda item: str(item[0]))
+                        for rank, (value, habit) in enumerate(ranked, start=1)]
+            with timed("render"):
+                fields = ["group", "rank", "id", "name", by]
+                if fmt:
+                    write_rows((row if group_by else row[1:] for row in rows),
+                               fields if group_by else fields[1:], click.get_text_stream("stdout"), fmt)
+                else:
+                    title = f"{'Top' if top else 'Bottom'} {top or bottom} habits by {by.replace('_', ' ')}"
+                    for group, ranked in sorted(ranking.items(), key=lambda item: str(item[0])):
+                        click.echo(f"{title} ({group_by}: {group}):" if group_by else f"{title}:")
+                        for rank, (value, habit) in enumerate(ranked, start=1):
+                            shown = f"{value * 100:.2f}%" if by == "completion_rate" else value
+                            click.echo(f"{rank}. {habit.name} (ID: {habit.id}): {shown}")
+                cache.flush()
+            return
+        if fmt:
+            with timed("query"):
+                metrics = {"longest_streak": (longest_streak, calculate_longest_streak_habit),
+                           "current_streak": (current_streak, lambda habit: calculate_current_streak(habit, reference)),
+                           "completion_rate": (completion_rate, lambda habit: round(get_completion_rate(habit, reference), 4)),
+                           "missed_periods": (most_struggled, lambda habit: habit_stats(habit).missed_periods)}
+                selected = [name for name, (flag, _) in metrics.items() if flag] or [*metrics]
+                fields = ["id", "name", *selected]
+                widths = db.column_widths(periodicity, category) if fmt == "fixed" else {}
+                widths.update(current_streak=widths.get("longest_streak", 0), completion_rate=6)
+                min_id = None if after_id is None else after_id + 1
+                if as_of:
+                    habits = (habit_stats_as_of(habit, reference) for habit in
+                              habit_history(db, id, periodicity, category, min_id, limit, offset))
+                else:
+                    habits = db.iter_stats(id=id, min_id=min_id, periodicity=periodicity, category=category,
+                                           limit=limit, offset=offset)
+            with timed("render"):
+                if weekly_report or monthly_report:
+                    click.echo("Reports are not available with --format.", err=True)
+                rows = ([habit.id, habit.name, *(metrics[name][1](habit) for name in selected)] for habit in habits)
+                write_rows(rows, fields, click.get_text_stream("stdout"), fmt, widths=[widths.get(field, 0) for field in fields])
+                cache.flush()
+            return
+        with timed("query"):
+            lines = []
+            if id:
+                if as_of:
+                    habit = next(habit_history(db, id, periodicity, category), None)
+                    habit = habit and habit_stats_as_of(habit, reference)
+                else:
+                    habit = next(iter(db.load_stats(id, periodicity, category)), None)
+                if not habit:
+                    raise ValueError(f"No habit with ID {id} found.")
+                if longest_streak:
+                    lines.append(f"Longest streak for {habit.name}: {calculate_longest_streak_habit(habit)}")
+                if current_streak:
+                    lines.append(f"Current streak for {habit.name}: {calculate_current_streak(habit, reference)}")
+                if completion_rate:
+                    lines.append(f"Completion rate for {habit.name}: {get_completion_rate(habit, reference) * 100:.2f}%")
+                if most_struggled:
+                    lines.append(f"Feature not available for a single habit ID.")
+                if weekly_report:
+                    lines.append(f"Feature not available for a single habit ID.")
+                if monthly_report:
+                    lines.append(f"Feature not available for a single habit ID.")
+            else:
+                habits = snapshot_habits(db, periodicity, category) if snapshot and not all_users else None
+                if all_users:
+                    from habit_tracker.router import StorageRouter
+                    summary = StorageRouter().summarize(periodicity, category)
+                    if weekly_report or monthly_report:
+                        lines.append("Reports are not available with --all-users.")
+                        weekly_report = monthly_report = False
+                elif habits is not None:
+                    summary = summarize(habits, as_of=reference)
+                elif workers > 1:
+                    summary = analyze_parallel(db, workers, periodicity, category, backend, reference)
+                elif as_of:
+                    summary = summarize(habit_history(db, None, periodicity, category), as_of=reference)
+                else:
+                    summary = summarize(db.load_stats(periodicity=periodicity, category=category))
+                today = reference or datetime.now().date()
+                if longest_streak:
+                    lines.append(f"Longest streak across all habits: {summary.longest_streak}")
+                if current_streak:
+                    lines.append("Current streaks:")
+                    lines.extend(f"- {name}: {streak}" for _, name, streak in summary.current_streaks)
+                if completion_rate:
+                    lines.append(f"Average completion rate across all habits: {summary.average_completion_rate * 100:.2f}%")
+                if most_struggled:
+                    lines.append(f"Most struggled habit: {summary.most_struggled_name}")
+                if weekly_report:
+                    if habits is not None:
+                        report = generate_weekly_report(habits, *today.isocalendar()[:2], as_of=reference)
+                    elif as_of:
+                        report = day_report(db, "week", reference, periodicity, category)
+                    else:
+                        report = db.period_report("week", today.isocalendar()[:2], periodicity=periodicity, category=category)
+                    lines.append("\nWeekly Report:")
+                    lines.extend(f"- {name}: {'Completed' if completed else 'Not completed'}" for name, completed in report.items())
+                if monthly_report:
+                    if habits is not None:
+                        report = generate_monthly_report(habits, today.year, today.month, as_of=reference)
+                    elif as_of:
+                        report = day_report(db, "month", reference, periodicity, category)
+                    else:
+                        report = db.period_report("month", (today.year, today.month), periodicity=periodicity, category=category)
+                    lines.append("\nMonthly Report:")
+                    lines.extend(f"- {name}: {'Completed' if completed else 'Not completed'}" for name, completed in report.items())
+            cache.flush()
+        with timed("render"):
+            for line in lines:
+                click.echo(line)
     except Exception as e:
         click.echo(f"Error: {str(e)}")
 
@@ -160,21 +455,238 @@ def delete(id: int):
     :param id: Habit ID to delete.
     """
     try:
+        with timed("connect"):
+            db = open_database()
+        with timed("query"):
+            db.delete_habit(id)
+        with timed("render"):
+            click.echo(f"Deleted habit with ID: {id}")
+    except Exception as e:
+        click.echo(f"Error: {str(e)}")
+
+@cli.command(name="import")
+@click.option("--file", "--f", "file", required=True, type=click.File("r"), help="CSV or JSONL file to import ('-' for stdin).")
+@click.option("--format", "fmt", type=click.Choice(["csv", "jsonl"]), help="Record format (default: guessed from file name).")
+@click.option("--batch-size", type=click.IntRange(min=1), default=10000, help="Rows inserted per batch.")
+def import_completions(file, fmt: str, batch_size: int):
+    """
+    Import completions from a CSV or JSONL file in a single transaction.
+    :param file: CSV or JSONL file to import.
+    :param fmt: Record format ('csv' or 'jsonl').
+    :param batch_size: Rows inserted per batch.
+    """
+    try:
+        with timed("import"):
+            from habit_tracker.transfer import detect_format, read_records
+        with timed("connect"):
+            db = offline_database()
+        start = time.perf_counter()
+
+        def progress(count: int):
+            elapsed = time.perf_counter() - start
+            click.echo(f"Imported {count} rows ({count / elapsed if elapsed else 0:.0f} rows/s)", err=True)
+
+        with timed("query"):
+            records = read_records(file, fmt or detect_format(file.name))
+            count = db.import_completions(records, batch_size, progress)
+        elapsed = time.perf_counter() - start
+        click.echo(f"Imported {count} completions in {elapsed:.2f}s ({count / elapsed if elapsed else 0:.0f} rows/s).")
+    except Exception as e:
+        click.echo(f"Error: {str(e)}")
+
+@cli.command(name="export-snapshot")
+@click.option("--file", "--f", "file", type=click.Path(dir_okay=False), help="Snapshot file to write (default: next to the database).")
+def export_snapshot(file: str):
+    """
+    Write all habits and completions to a binary snapshot file that analyze --snapshot maps into memory.
+    :param file: Snapshot file to write.
+    """
+    try:
+        with timed("import"):
+            from habit_tracker.snapshot import snapshot_path, write_snapshot
+        with timed("connect"):
+            db = user_database()
+        start = time.perf_counter()
+        with timed("query"):
+            path = file or snapshot_path(db)
+            count = write_snapshot(db, path)
+        click.echo(f"Wrote {count} habits to {path} in {time.perf_counter() - start:.2f}s.")
+    except Exception as e:
+        click.echo(f"Error: {str(e)}")
+
+@cli.command(name="export")
+@click.option("--file", "--f", "file", required=True, type=click.File("w"), help="CSV or JSONL file to write ('-' for stdout).")
+@click.option("--format", "fmt", type=click.Choice(["csv", "jsonl"]), help="Record format (default: guessed from file name).")
+def export_completions(file, fmt: str):
+    """
+    Export all completions with their habit attributes to a CSV or JSONL file.
+    :param file: CSV or JSONL file to write.
+    :param fmt: Record format ('csv' or 'jsonl').
+    """
+    try:
+        with timed("import"):
+            from habit_tracker.transfer import detect_format, write_records
+        with timed("connect"):
+            db = user_database()
+        start = time.perf_counter()
+        with timed("query"):
+            count = write_records(db.iter_completions(), file, fmt or detect_format(file.name))
+        elapsed = time.perf_counter() - start
+        click.echo(f"Exported {count} completions in {elapsed:.2f}s.", err=True)
+    except Exception as e:
+        click.echo(f"Error: {str(e)}")
+
+@cli.command()
+@click.option("--keep-days", type=click.IntRange(min=1), default=365, help="Days of completions kept row by row (default: 365).")
+@click.option("--archive", type=click.Path(dir_okay=False), help="Append compacted completions to a gzip-compressed JSONL file.")
+@click.option("--vacuum-threshold", type=click.FloatRange(0, 1), default=0.25, help="Share of free pages that triggers a vacuum.")
+def compact(keep_days: int, archive: str, vacuum_threshold: float):
+    """
+    Fold completions older than the kept days into per-habit summaries, keeping statistics and reports exact.
+    :param keep_days: Days of completions kept row by row.
+    :param archive: Gzip-compressed JSONL file the compacted completions are appended to.
+    :param vacuum_threshold: Share of free pages that triggers a vacuum.
+    """
+    try:
+        with timed("import"):
+            import gzip
+            from datetime import datetime, timedelta
+            from habit_tracker.transfer import write_records
+        with timed("connect"):
+            db = offline_database()
+        before = (datetime.now() - timedelta(days=keep_days)).date().isoformat()
+        with timed("query"):
+            if archive:
+                with gzip.open(archive, "at") as file:
+                    result = db.compact(before, lambda rows: write_records(rows, file, "jsonl"))
+            else:
+                result = db.compact(before)
+            pages = db.vacuum(vacuum_threshold)
+        click.echo(f"Compacted {result['completions']} completions of {result['habits']} habits before {before}.")
+        if pages:
+            click.echo(f"Vacuum freed {pages} pages.")
+    except Exception as e:
+        click.echo(f"Error: {str(e)}")
+
+@cli.command()
+@click.option("--id", type=int, help="Habit ID to follow (default: all matching habits as a group).")
+@click.option("--periodicity", "--p", type=click.Choice(["daily", "weekly"]), help="Filter habits by periodicity ('daily' or 'weekly')")
+@click.option("--category", "--c", type=str, help="Filter habits by category (e.g. 'health')")
+@click.option("--start", required=True, type=click.DateTime(formats=["%Y-%m-%d"]), help="First date of the series.")
+@click.option("--end", type=click.DateTime(formats=["%Y-%m-%d"]), help="Last date of the series (default: today).")
+@click.option("--step", type=click.Choice(["daily", "weekly"]), default="daily", help="Report every day or every seventh day.")
+@click.option("--format", "fmt", type=click.Choice(["table", "jsonl", "csv"]), default="table", help="Output format.")
+def trend(id: int, periodicity: str, category: str, start, end, step: str, fmt: str):
+    """
+    Show how streaks and completion rates evolved over a date range, for one habit or a group of habits.
+    :param id: Habit ID to follow.
+    :param periodicity: Periodicity to filter by ('daily' or 'weekly')
+    :param category: Category to filter by (e.g. 'health')
+    :param start: First date of the series.
+    :param end: Last date of the series.
+    :param step: Sampling step ('daily' or 'weekly').
+    :param fmt: Output format ('table', 'jsonl' or 'csv').
+    """
+    try:
+        with timed("import"):
+            from datetime import datetime
+            from habit_tracker.output import write_rows
+            from habit_tracker.trends import COHORT_FIELDS, HABIT_FIELDS, cohort_trend, habit_trend
+        with timed("connect"):
+            db = open_database()
+        with timed("query"):
+            first, last = start.date(), (end or datetime.now()).date()
+            habits = habit_history(db, id, periodicity, category)
+            if id:
+                habit = next(habits, None)
+                if not habit:
+                    raise ValueError(f"No habit with ID {id} found.")
+                rows, fields = habit_trend(habit, first, last, step), HABIT_FIELDS
+            else:
+                rows, fields = cohort_trend(habits, first, last, step), COHORT_FIELDS
+        with timed("render"):
+            write_rows(rows, fields, click.get_text_stream("stdout"), fmt)
+    except Exception as e:
+        click.echo(f"Error: {str(e)}")
+
+@cli.command()
+@click.option("--flush-interval", type=click.IntRange(min=1), default=50, help="Milliseconds a completion may wait before it is written.")
+@click.option("--batch-size", type=click.IntRange(min=1), default=1000, help="Pending completions that trigger an early write.")
+def serve(flush_interval: int, batch_size: int):
+    """
+    Run a daemon that keeps habits in memory and serves the other commands over a Unix socket.
+    :param flush_interval: Milliseconds a completion may wait before it is written.
+    :param batch_size: Pending completions that trigger an early write.
+    """
+    try:
+        import asyncio
+        import signal
+        from habit_tracker.client import socket_path
+        from habit_tracker.database import Database
+        from habit_tracker.server import HabitServer
+        if click.get_current_context().find_root().params.get("user") is not None:
+            raise ValueError("The daemon only serves the default database; run serve without --user.")
         db = Database()
-        db.delete_habit(id)
-        click.echo(f"Deleted habit with ID: {id}")
+        server = HabitServer(db, socket_path(db.db_path), flush_interval / 1000, batch_size)
+
+        async def run():
+            task = asyncio.current_task()
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, task.cancel)
+            click.echo(f"Serving {len(server.habits)} habits on {server.path}")
+            await server.serve()
+
+        try:
+            asyncio.run(run())
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            pass
+        db.close()
+        stats = server.buffer.stats()
+        click.echo(f"Daemon stopped. Wrote {stats['committed']} completions in {stats['flushes']} transactions "
+                   f"(p99 flush latency: {stats['flush_ms_p99']:.2f} ms).")
+    except Exception as e:
+        click.echo(f"Error: {str(e)}")
+
+@cli.command()
+@click.option("--reset", "clear", is_flag=True, help="Delete the collected statistics.")
+def stats(clear: bool):
+    """
+    Show call statistics collected by commands run with --profile.
+    :param clear: Option to delete the collected statistics.
+    """
+    try:
+        from tabulate import tabulate
+        from habit_tracker import profiling
+        if clear:
+            if os.path.exists(profiling.PROFILE_PATH):
+                os.remove(profiling.PROFILE_PATH)
+            click.echo("Profile statistics cleared.")
+            return
+        rows = profiling.report(profiling.load())
+        if not rows:
+            click.echo("No profile statistics collected yet. Run commands with --profile first.")
+            return
+        click.echo(tabulate(rows, headers=profiling.HEADERS, floatfmt=".3f"))
     except Exception as e:
         click.echo(f"Error: {str(e)}")
 
 @cli.command()
 def reset():
     """
-    Reset database file.
+    Reset database file, or delete all habits of the --user user.
     """
     try:
-        db = Database()
-        if os.path.exists("data/habits.db"):
-            os.remove("data/habits.db")
+        db = offline_database()
+        if click.get_current_context().find_root().params.get("user") is not None:
+            ids = [habit.id for habit in db.iter_habits(with_completions=False)]
+            for id in ids:
+                db.delete_habit(id)
+            click.echo(f"Deleted {len(ids)} habits of user '{db.user}'.")
+            return
+        db.close()
+        if os.path.exists(db.db_path):
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(db.db_path + suffix):
+                    os.remove(db.db_path + suffix)
             click.echo(f"Database reset successfully.")
         else:
             click.echo("Database file does not exist.")
@@ -0,0 +1,210 @@
+import json
+import os
+import socket
+from typing import Iterator
+from .habit import Habit
+from .stats import HabitStats
+
+"""
+Client module including the socket client of the habit tracker daemon and the JSON encoding of habits.
+The client mirrors the Database methods used by the command-line interface, so commands can use either.
+"""
+
+
+def socket_path(db_path: str = "data/habits.db") -> str:
+    """
+    Return the Unix-domain socket path of the daemon serving a database.
+    :param db_path: Path to the SQLite database file.
+    """
+    return os.path.splitext(db_path)[0] + ".sock"
+
+def encode_habit(habit: Habit, with_completions: bool = True) -> dict:
+    """
+    Convert a habit to a JSON-serializable dict.
+    :param habit: Habit to convert.
+    :param with_completions: Include the completion days.
+    """
+    return {"id": habit.id, "name": habit.name, "periodicity": habit.periodicity, "category": habit.category,
+            "creation_date": habit.creation_date,
+            "completion_days": habit.completion_days.tolist() if with_completions else [],
+            "summary": [habit.summary.horizon, *habit.summary.metrics()] if habit.summary else None}
+
+def decode_habit(data: dict) -> Habit:
+    """
+    Rebuild a habit from a dict created by encode_habit.
+    :param data: Encoded habit.
+    """
+    habit = Habit(data["name"], data["periodicity"], data["category"])
+    habit.id, habit.creation_date = data["id"], data["creation_date"]
+    habit.completion_days.extend(data["completion_days"])
+    if data.get("summary"):
+        habit.summary = HabitStats(habit.id, habit.name, habit.periodicity, habit.category, habit.creation_date)
+        habit.summary.horizon = data["summary"][0]
+        habit.summary.set_metrics(data["summary"][1:])
+    habit.mark_clean()
+    return habit
+
+def connect(db_path: str = "data/habits.db") -> "DaemonClient":
+    """
+    Connect to the daemon serving a database.
+    :param db_path: Path to the SQLite database file.
+    :return: A connected client, or None if no daemon is listening.
+    """
+    path = socket_path(db_path)
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+    return DaemonClient(sock, db_path)
+
+
+class DaemonClient:
+    """
+    Sends requests to the habit tracker daemon over its Unix-domain socket, one JSON object per line.
+    """
+    def __init__(self, sock: socket.socket, db_path: str):
+        """
+        Initializes the client on a connected socket.
+        :param sock: Socket connected to the daemon.
+        :param db_path: Path to the SQLite database file served by the daemon.
+        """
+        self.sock = sock
+        self.file = sock.makefile("rwb")
+        self.db_path = db_path
+
+    def request(self, op: str, **params) -> object:
+        """
+        Sends one request and waits for its response.
+        :param op: Operation name (e.g., "complete").
+        :param params: Operation parameters.
+        :return: The result of the operation.
+        """
+        self.file.write(json.dumps({"op": op, **params}).encode() + b"\n")
+        self.file.flush()
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError("The daemon closed the connection.")
+        response = json.loads(line)
+        if not response["ok"]:
+            raise ValueError(response["error"])
+        return response["result"]
+
+    def close(self):
+        """
+        Closes the connection to the daemon.
+        """
+        self.file.close()
+        self.sock.close()
+
+    def save_habit(self, habit: Habit):
+        """
+        Creates a new habit through the daemon and sets its ID.
+        :param habit: New habit to save.
+        """
+        if habit.id is not None:
+            raise ValueError("The daemon can only save new habits.")
+        habit.id = self.request("create", name=habit.name, periodicity=habit.periodicity,
+                                category=habit.category, creation_date=habit.creation_date)
+        habit.mark_clean()
+
+    def record_completion(self, id: int, completion_date: str = None, key: str = None, durable: bool = False) -> str:
+        """
+        Records a completion; the daemon acknowledges it before writing it to SQLite in a batch, or after
+        writing it when it has an idempotency key or durable is set.
+        :param id: Habit ID to complete.
+        :param completion_date: ISO timestamp of the completion (default: now).
+        :param key: Idempotency key of the completion event; an event whose key was already recorded is ignored.
+        :param durable: Wait until the completion is committed to SQLite.
+        :return: The recorded completion timestamp (for a repeated key, the one recorded first).
+        """
+        return self.request("complete", id=id, completion_date=completion_date, key=key,
+                            durable=durable)["completion_date"]
+
+    def delete_habit(self, id: int):
+        """
+        Deletes a habit and its completions.
+        :param id: Habit ID to delete.
+        """
+        self.request("delete", id=id)
+
+    def get_habit(self, id: int, with_completions: bool = True) -> Habit:
+        """
+        Loads a single habit by ID.
+        :param id: Habit ID to load.
+        :param with_completions: Also load the completion history of the habit.
+        :return: The habit, or None if no habit with this ID exists.
+        """
+        data = self.request("get", id=id, with_completions=with_completions)
+        return decode_habit(data) if data else None
+
+    def find_habits(self, periodicity: str = None, category: str = None, since: str = None, until: str = None,
+                    limit: int = None, offset: int = None, with_completions: bool = True) -> list[Habit]:
+        """
+        Loads habits matching the filters, ordered by ID (see Database.find_habits).
+        """
+        return [decode_habit(data) for data in self.request(
+            "find", periodicity=periodicity, category=category, since=since, until=until, limit=limit,
+            offset=offset, with_completions=with_completions)]
+
+    def iter_habits(self, min_id: int = None, periodicity: str = None, category: str = None, limit: int = None,
+                    offset: int = None, with_completions: bool = True, page_size: int = 1000) -> Iterator[Habit]:
+        """
+        Streams habits matching the filters page by page, resuming each page after the last ID received.
+        """
+        for data in self.pages("find", min_id, limit, offset, page_size, periodicity=periodicity,
+                               category=category, with_completions=with_completions):
+            yield decode_habit(data)
+
+    def iter_stats(self, id: int = None, min_id: int = None, periodicity: str = None, category: str = None,
+                   limit: int = None, offset: int = None, page_size: int = 1000) -> Iterator[HabitStats]:
+        """
+        Streams the statistics of the matching habits page by page (see Database.iter_stats).
+        """
+        for row in self.pages("stats", min_id, limit, offset, page_size, id=id, periodicity=periodicity,
+                              category=category):
+            yield HabitStats.from_row(row)
+
+    def pages(self, op: str, min_id: int, limit: int, offset: int, page_size: int, **params) -> Iterator:
+        """
+        Yields the results of a listing operation with keyset pagination: the first page applies the offset,
+        every following page starts after the last habit ID of the previous one.
+        :param op: Listing operation ("find" or "stats").
+        :param min_id: Lowest habit ID to list (optional).
+        :param limit: Maximum number of results (optional).
+        :param offset: Number of matching results to skip (optional).
+        :param page_size: Results per request.
+        :param params: Filters of the operation.
+        """
+        while limit is None or limit > 0:
+            size = page_size if limit is None else min(page_size, limit)
+            page = self.request(op, min_id=min_id, limit=size, offset=offset, **params)
+            yield from page
+            if len(page) < size:
+                return
+            last = page[-1]
+            min_id, offset = (last["id"] if isinstance(last, dict) else last[0]) + 1, None
+            limit = None if limit is None else limit - len(page)
+
+    def column_widths(self, periodicity: str = None, category: str = None) -> dict:
+        """
+        Returns the widest text of each output column over the matching habits (see Database.column_widths).
+        """
+        return self.request("widths", periodicity=periodicity, category=category)
+
+    def load_stats(self, id: int = None, periodicity: str = None, category: str = None) -> list[HabitStats]:
+        """
+        Loads the statistics of the matching habits (see Database.load_stats).
+        """
+        return [HabitStats.from_row(row) for row in self.request("stats", id=id, periodicity=periodicity,
+                                                                  category=category)]
+
+    def period_report(self, grain: str, start: tuple[int, int], end: tuple[int, int] = None,
+                      periodicity: str = None, category: str = None) -> dict:
+        """
+        Counts completed days per habit over a range of periods (see Database.period_report).
+        """
+        return self.request("report", grain=grain, start=start, end=end, periodicity=periodicity, category=category)
@@ -1,114 +1,1055 @@
 import sqlite3
 from sqlite3 import Error
+from contextlib import closing, contextmanager
+from collections import Counter
+from datetime import datetime, date
+from typing import Callable, Iterable, Iterator
 import os
-from .habit import Habit
+import random
+import threading
+import time
+from .habit import Habit, EPOCH_ORDINAL, to_epoch_day, from_epoch_day
+from .stats import HabitStats
 
 """ 
 Database class including the SQLite persistence system for keeping habit records.
 """
 
+ROLLUP_BACKFILL = '''
+    INSERT INTO completion_rollups (id, grain, year, period, completions)
+    SELECT id, 'day', CAST(strftime('%Y', completion_day * 86400, 'unixepoch') AS INTEGER),
+           CAST(strftime('%j', completion_day * 86400, 'unixepoch') AS INTEGER), COUNT(*)
+    FROM completions
+    GROUP BY 1, 3, 4;
+    INSERT INTO completion_rollups (id, grain, year, period, completions)
+    SELECT id, 'week', CAST(strftime('%Y', thursday * 86400, 'unixepoch') AS INTEGER),
+           (CAST(strftime('%j', thursday * 86400, 'unixepoch') AS INTEGER) - 1) / 7 + 1, COUNT(*)
+    FROM (SELECT id, completion_day - (completion_day + 3) % 7 + 3 AS thursday FROM completions)
+    GROUP BY 1, 3, 4;
+    INSERT INTO completion_rollups (id, grain, year, period, completions)
+    SELECT id, 'month', CAST(strftime('%Y', completion_day * 86400, 'unixepoch') AS INTEGER),
+           CAST(strftime('%m', completion_day * 86400, 'unixepoch') AS INTEGER), COUNT(*)
+    FROM completions
+    GROUP BY 1, 3, 4;
+'''
+
+MIGRATIONS = [
+    '''
+    CREATE TABLE IF NOT EXISTS habits (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        periodicity TEXT NOT NULL,
+        category TEXT,
+        creation_date TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS completions (
+        completion_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        id INTEGER NOT NULL,
+        completion_date TEXT NOT NULL,
+        FOREIGN KEY(id) REFERENCES habits(id)
+    );
+    ''',
+    '''
+    ALTER TABLE habits ADD COLUMN creation_day INTEGER;
+    ALTER TABLE completions ADD COLUMN completion_day INTEGER;
+    UPDATE habits SET creation_day = CAST(julianday(substr(creation_date, 1, 10)) - 2440587.5 AS INTEGER);
+    UPDATE completions SET completion_day = CAST(julianday(substr(completion_date, 1, 10)) - 2440587.5 AS INTEGER);
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_habits_name ON habits(name);
+    CREATE INDEX IF NOT EXISTS idx_completions_habit_day ON completions(id, completion_day);
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS habit_stats (
+        id INTEGER PRIMARY KEY,
+        current_streak INTEGER NOT NULL DEFAULT 0,
+        longest_streak INTEGER NOT NULL DEFAULT 0,
+        last_period INTEGER,
+        completion_count INTEGER NOT NULL DEFAULT 0,
+        missed_periods INTEGER NOT NULL DEFAULT 0,
+        stale INTEGER NOT NULL DEFAULT 1,
+        FOREIGN KEY(id) REFERENCES habits(id)
+    );
+    ''',
+    '''
+    CREATE INDEX IF NOT EXISTS idx_habits_periodicity ON habits(periodicity);
+    CREATE INDEX IF NOT EXISTS idx_habits_category ON habits(category, periodicity);
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS completion_rollups (
+        id INTEGER NOT NULL,
+        grain TEXT NOT NULL,
+        year INTEGER NOT NULL,
+        period INTEGER NOT NULL,
+        completions INTEGER NOT NULL,
+        PRIMARY KEY (id, grain, year, period),
+        FOREIGN KEY(id) REFERENCES habits(id)
+    ) WITHOUT ROWID;
+    ''' + ROLLUP_BACKFILL,
+    '''
+    ALTER TABLE habits ADD COLUMN version INTEGER NOT NULL DEFAULT 0;
+    CREATE TABLE IF NOT EXISTS analytics_cache (
+        id INTEGER NOT NULL,
+        metric TEXT NOT NULL,
+        version INTEGER NOT NULL,
+        day INTEGER NOT NULL,
+        value,
+        PRIMARY KEY (id, metric),
+        FOREIGN KEY(id) REFERENCES habits(id)
+    ) WITHOUT ROWID;
+    ''',
+    '''
+    ALTER TABLE habits ADD COLUMN user TEXT NOT NULL DEFAULT '';
+    DROP INDEX IF EXISTS idx_habits_name;
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_habits_user_name ON habits(user, name);
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS completion_summaries (
+        id INTEGER PRIMARY KEY,
+        horizon INTEGER NOT NULL,
+        periodicity TEXT NOT NULL,
+        current_streak INTEGER NOT NULL,
+        longest_streak INTEGER NOT NULL,
+        last_period INTEGER,
+        completion_count INTEGER NOT NULL,
+        missed_periods INTEGER NOT NULL,
+        completions INTEGER NOT NULL,
+        FOREIGN KEY(id) REFERENCES habits(id)
+    );
+    ''',
+    '''
+    CREATE INDEX IF NOT EXISTS idx_stats_longest_streak ON habit_stats(longest_streak);
+    CREATE INDEX IF NOT EXISTS idx_stats_current_streak ON habit_stats(current_streak);
+    CREATE INDEX IF NOT EXISTS idx_stats_missed_periods ON habit_stats(missed_periods);
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS meta (
+        key TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    ) WITHOUT ROWID;
+    INSERT OR IGNORE INTO meta (key, value) VALUES ('changes', 0);
+    CREATE TRIGGER IF NOT EXISTS habits_insert_changes AFTER INSERT ON habits
+    BEGIN UPDATE meta SET value = value + 1 WHERE key = 'changes'; END;
+    CREATE TRIGGER IF NOT EXISTS habits_update_changes AFTER UPDATE ON habits
+    BEGIN UPDATE meta SET value = value + 1 WHERE key = 'changes'; END;
+    CREATE TRIGGER IF NOT EXISTS habits_delete_changes AFTER DELETE ON habits
+    BEGIN UPDATE meta SET value = value + 1 WHERE key = 'changes'; END;
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS completion_keys (
+        key TEXT PRIMARY KEY,
+        id INTEGER NOT NULL,
+        completion_date TEXT NOT NULL
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_completion_keys_id ON completion_keys(id);
+    ''',
+    '''
+    ALTER TABLE habit_stats RENAME COLUMN completion_count TO completed_periods;
+    ALTER TABLE completion_summaries RENAME COLUMN completion_count TO completed_periods;
+    ''',
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+COMPACTED_DAYS = '''
+    SELECT day, completions FROM (
+        SELECT CAST(julianday(printf('%04d-01-01', year)) - 2440587.5 AS INTEGER) + period - 1 AS day, completions
+        FROM completion_rollups
+        WHERE id = ? AND grain = 'day'
+    )
+    WHERE day < ?
+    ORDER BY day
+'''
+
+STALE_STATS = '''
+    SELECT h.id, h.name, h.periodicity, h.category, h.creation_date
+    FROM habits h
+    LEFT JOIN habit_stats s ON s.id = h.id
+    WHERE s.id IS NULL OR s.stale
+'''
+
+
+def rollup_keys(epoch_day: int) -> list[tuple[str, int, int]]:
+    """
+    Returns the (grain, year, period) rollup buckets of a completion day: day of year, ISO week and month.
+    :param epoch_day: Number of days since 1970-01-01.
+    """
+    day = date.fromordinal(epoch_day + EPOCH_ORDINAL)
+    iso_year, iso_week, _ = day.isocalendar()
+    return [("day", day.year, day.timetuple().tm_yday), ("week", iso_year, iso_week), ("month", day.year, day.month)]
+
+
 class Database:
-    def __init__(self):
+    def __init__(self, db_path: str = "data/habits.db", wal: bool = True, synchronous: str = "NORMAL",
+                 mmap_size: int = 256 * 1024 * 1024, cache_size: int = -16000, cached_statements: int = 256,
+                 user: str = "", busy_timeout: int = 5000, retries: int = 5, backoff: float = 0.02):
         """
-        Initializes database connection and creates tables.
+        Initializes database settings and creates tables if the schema is not current.
+        Connections are opened lazily, tuned once and kept open (one per thread) until close().
+        Every query is scoped to the habits of one user (tenant); habit names are unique per user.
+        Writes take the write lock up front, waiting up to the busy timeout and then retrying with backoff.
+        :param db_path: Path to the SQLite database file.
+        :param wal: Use write-ahead logging instead of a rollback journal.
+        :param synchronous: SQLite synchronous level (e.g., "NORMAL" or "FULL").
+        :param mmap_size: Bytes of the database file to memory-map for reads (0 disables it).
+        :param cache_size: Page cache size (negative values are KiB, positive values are pages).
+        :param cached_statements: Number of prepared statements cached per connection.
+        :param user: User whose habits are read and written ("" for the default user, None to read the
+                     habits of all users, e.g. for aggregates).
+        :param busy_timeout: Milliseconds a statement waits for a lock held by another connection.
+        :param retries: Attempts to take the write lock again after the busy timeout expired.
+        :param backoff: Seconds to wait before the first retry, doubled (with jitter) for every further retry.
         """
-        self.db_path = "data/habits.db"
-        os.makedirs("data", exist_ok=True)
+        self.db_path = db_path
+        self.user = user
+        self.wal = wal
+        self.synchronous = synchronous
+        self.mmap_size = mmap_size
+        self.cache_size = cache_size
+        self.cached_statements = cached_statements
+        self.busy_timeout = busy_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.local = threading.local()
+        self.connections = []
+        self.lock = threading.Lock()
         self.create_tables()
 
+    def __enter__(self) -> "Database":
+        """
+        Returns the database for use in a with-statement.
+        """
+        return self
+
+    def __exit__(self, *exc_info):
+        """
+        Closes all connections when leaving a with-statement.
+        """
+        self.close()
+
+    def connect(self) -> sqlite3.Connection:
+        """
+        Returns the connection of the calling thread, opening and tuning it on first use.
+        """
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            if not os.path.exists(self.db_path):
+                os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout / 1000,
+                                   cached_statements=self.cached_statements, check_same_thread=False)
+            if self.wal:
+                conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(f'PRAGMA synchronous={self.synchronous}')
+            conn.execute(f'PRAGMA mmap_size={int(self.mmap_size)}')
+            conn.execute(f'PRAGMA cache_size={int(self.cache_size)}')
+            with self.lock:
+                self.connections.append(conn)
+            self.local.conn = conn
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Runs a write transaction that takes the write lock before its first read (BEGIN IMMEDIATE), so checks and
+        read-modify-writes inside it cannot interleave with other writers. Taking the lock is retried with
+        exponential backoff and jitter when the busy timeout expires; the transaction commits when the block
+        succeeds and rolls back otherwise.
+        """
+        conn = self.connect()
+        for attempt in range(self.retries + 1):
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                break
+            except sqlite3.OperationalError as e:
+                if attempt == self.retries or not ("locked" in str(e) or "busy" in str(e)):
+                    raise
+                time.sleep(self.backoff * 2 ** attempt * random.uniform(0.5, 1.5))
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+    def close(self):
+        """
+        Closes every connection opened by this database.
+        """
+        with self.lock:
+            for conn in self.connections:
+                conn.close()
+            self.connections.clear()
+            self.local = threading.local()
+
     def create_tables(self):
         """
-        Creates habits and completions tables.
-        """
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute('''
-                    CREATE TABLE IF NOT EXISTS habits (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        name TEXT NOT NULL,
-                        periodicity TEXT NOT NULL,
-                        category TEXT,
-                        creation_date TEXT NOT NULL
-                    )
-                ''')
-                conn.execute('''
-                    CREATE TABLE IF NOT EXISTS completions (
-                        completion_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        id INTEGER NOT NULL,
-                        completion_date TEXT NOT NULL,
-                        FOREIGN KEY(id) REFERENCES habits(id)
-                    )
-                ''')
+        Creates habits and completions tables and upgrades older database files in place by applying
+        every migration newer than the schema version stored in PRAGMA user_version. No DDL runs when
+        the schema is already current.
+        """
+        try:
+            conn = self.connect()
+            version = conn.execute('PRAGMA user_version').fetchone()[0]
+            for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+                conn.executescript(f'BEGIN; {migration} PRAGMA user_version = {number}; COMMIT;')
         except Error as e:
             print(f"Database error: {e}")
 
     def save_habit(self, habit: Habit):
         """
-        Saves habit and its completions to the database.
+        Saves habit and its completions to the database. Only changed fields and newly appended
+        completions are written for habits that were already saved or loaded.
+        Completions before the compaction horizon of the habit are kept when its history is rewritten, and
+        days that were already stored keep their first recorded timestamp.
         :param habit: Habit to save.
+        :raises ValueError: If a new habit's name is taken, or a saved habit belongs to another user.
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.transaction() as conn:
                 cursor = conn.cursor()
+                horizon, stored = None, {}
                 if habit.id is None:
-                    cursor.execute('SELECT id FROM habits WHERE name = ?', (habit.name,))
+                    cursor.execute('SELECT id FROM habits WHERE user = ? AND name = ?', (self.user or "", habit.name))
                     existing_habit = cursor.fetchone()
                     if existing_habit:
                         raise ValueError(f"Habit with name '{habit.name}' already exists.")
                     cursor.execute('''
-                        INSERT INTO habits (name, periodicity, category, creation_date)
-                        VALUES (?, ?, ?, ?)
-                    ''', (habit.name, habit.periodicity, habit.category, habit.creation_date))
+                        INSERT INTO habits (name, periodicity, category, creation_date, creation_day, user)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    ''', (*habit.fields(), to_epoch_day(habit.creation_date), self.user or ""))
                     habit.id = cursor.lastrowid
+                    cursor.execute('INSERT INTO habit_stats (id, stale) VALUES (?, 0)', (habit.id,))
                 else:
-                    cursor.execute('''
-                    UPDATE habits
-                    SET name=?, periodicity=?, category=?, creation_date=?
-                    WHERE id=?
-                    ''',(habit.name, habit.periodicity, habit.category, habit.creation_date, habit.id))
-                cursor.execute('DELETE FROM completions WHERE id=?', (habit.id,))
-                for date in habit.completion_dates:
-                    cursor.execute('''
-                    INSERT INTO completions (id, completion_date)
-                    VALUES (?,?)
-                    ''', (habit.id, date))
-                conn.commit()
+                    if not self.owned(conn, [habit.id]):
+                        raise ValueError(f"No habit with ID {habit.id} found.")
+                    if habit.fields_changed():
+                        cursor.execute('''
+                        UPDATE habits
+                        SET name=?, periodicity=?, category=?, creation_date=?, creation_day=?
+                        WHERE id=?
+                        ''', (*habit.fields(), to_epoch_day(habit.creation_date), habit.id))
+                    if habit.history_rewritten() or habit.periodicity != habit.saved_fields[1]:
+                        self.mark_stale(conn, habit.id)
+                    if habit.history_rewritten():
+                        cursor.execute('''
+                        SELECT completion_day, completion_date FROM completions
+                        WHERE id=? ORDER BY completion_id DESC
+                        ''', (habit.id,))
+                        stored = dict(cursor.fetchall())
+                        cursor.execute('DELETE FROM completions WHERE id=?', (habit.id,))
+                        horizon = self.reset_rollups(conn, habit.id)
+                if habit.history_rewritten():
+                    days = [day for day in habit.completion_days if horizon is None or day >= horizon]
+                    completions = [stored.get(day) or from_epoch_day(day) for day in days]
+                else:
+                    completions = habit.new_completions()
+                    days = [to_epoch_day(date) for date in completions]
+                cursor.executemany('''
+                    INSERT INTO completions (id, completion_date, completion_day)
+                    VALUES (?,?,?)
+                ''', zip([habit.id] * len(days), completions, days))
+                self.update_stats(conn, habit.id, days)
+                self.update_rollups(conn, ((habit.id, day) for day in days))
+                version = self.bump_versions(conn, [habit.id])[0]
+            habit.mark_clean()
+            habit.version = version
         except Error as e:
             print(f"Error saving habit: {e}")
 
+    def record_completion(self, id: int, completion_date: str = None, key: str = None) -> str:
+        """
+        Appends a single completion row for a habit without rewriting its existing history.
+        :param id: Habit ID to complete.
+        :param completion_date: ISO timestamp of the completion (default: now).
+        :param key: Idempotency key of the completion event; an event whose key was already recorded is ignored.
+        :return: The recorded completion timestamp (for a repeated key, the one recorded first).
+        :raises ValueError: If the habit does not exist or belongs to another user.
+        :raises sqlite3.OperationalError: If the write lock is still held by another connection after all retries.
+        """
+        completion_date = completion_date or datetime.now().isoformat()
+        with self.transaction() as conn:
+            if self.insert_completions(conn, [(id, completion_date, key)])[0]:
+                return completion_date
+            recorded = self.keyed_completion(key) if key is not None else None
+        if recorded is None:
+            raise ValueError(f"No habit with ID {id} found.")
+        return recorded[1]
+
+    def record_completions(self, completions: list[tuple]) -> int:
+        """
+        Appends completions of one or more habits atomically in a single write transaction, updating statistics
+        and rollups of every touched habit.
+        :param completions: (habit id, ISO timestamp) pairs or (habit id, ISO timestamp, idempotency key) triples
+                            to append. Completions with a key that was already recorded are skipped.
+        :return: Number of completions recorded (0 if the transaction failed). Completions of habits
+                 that do not exist or belong to another user are skipped.
+        """
+        return sum(self.record_completion_batch(completions))
+
+    def record_completion_batch(self, completions: list[tuple]) -> list[bool]:
+        """
+        Appends completions atomically like record_completions and reports the outcome of each one.
+        :param completions: (habit id, ISO timestamp) pairs or (habit id, ISO timestamp, idempotency key) triples.
+        :return: Whether each completion was recorded, in order (an empty list if the transaction failed).
+        """
+        try:
+            with self.transaction() as conn:
+                return self.insert_completions(conn, completions)
+        except Error as e:
+            print(f"Error recording completion: {e}")
+            return []
+
+    def insert_completions(self, conn: sqlite3.Connection, completions: list[tuple]) -> list[bool]:
+        """
+        Appends completions within a write transaction, skipping completions of habits that are not owned and
+        completions with an idempotency key that was already recorded.
+        :param conn: Connection of the ongoing write transaction.
+        :param completions: (habit id, ISO timestamp) pairs or (habit id, ISO timestamp, idempotency key) triples.
+        :return: Whether each completion was inserted, in order.
+        """
+        completions = [(*completion, None)[:3] for completion in completions]
+        owned = self.owned(conn, {id for id, _, _ in completions})
+        keys = self.new_keys(conn, (key for _, _, key in completions))
+        rows, keyed, inserted = [], [], []
+        for id, date, key in completions:
+            inserted.append(id in owned and (key is None or key in keys))
+            if inserted[-1]:
+                rows.append((id, date, to_epoch_day(date)))
+                if key is not None:
+                    keys.remove(key)
+                    keyed.append((key, id, date))
+        days = {}
+        for id, _, day in rows:
+            days.setdefault(id, []).append(day)
+        conn.executemany('''
+            INSERT INTO completions (id, completion_date, completion_day)
+            VALUES (?,?,?)
+        ''', rows)
+        conn.executemany('INSERT INTO completion_keys (key, id, completion_date) VALUES (?,?,?)', keyed)
+        for id, habit_days in days.items():
+            self.update_stats(conn, id, habit_days)
+        self.update_rollups(conn, ((id, day) for id, _, day in rows))
+        self.bump_versions(conn, days)
+        return inserted
+
     def delete_habit(self, id: int):
         """
         Deletes habit and its completions from the database.
         :param id: Habit ID to delete.
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self.transaction() as conn:
+                if not self.owned(conn, [id]):
+                    return
                 cursor = conn.cursor()
                 cursor.execute('DELETE FROM habits WHERE id = ?', (id,))
                 cursor.execute('DELETE FROM completions WHERE id = ?', (id,))
-                conn.commit()
+                cursor.execute('DELETE FROM habit_stats WHERE id = ?', (id,))
+                cursor.execute('DELETE FROM completion_rollups WHERE id = ?', (id,))
+                cursor.execute('DELETE FROM analytics_cache WHERE id = ?', (id,))
+                cursor.execute('DELETE FROM completion_summaries WHERE id = ?', (id,))
+                cursor.execute('DELETE FROM completion_keys WHERE id = ?', (id,))
         except Error as e:
             print(f"Error deleting habit: {e}")
 
+    def new_keys(self, conn: sqlite3.Connection, keys: Iterable[str]) -> set[str]:
+        """
+        Returns the idempotency keys among the given ones that were not recorded yet.
+        :param conn: Connection of the ongoing write transaction.
+        :param keys: Idempotency keys of completion events (None entries are ignored).
+        """
+        sql = 'SELECT 1 FROM completion_keys WHERE key = ?'
+        return {key for key in set(keys) - {None} if conn.execute(sql, (key,)).fetchone() is None}
+
+    def keyed_completion(self, key: str) -> tuple[int, str]:
+        """
+        Returns the completion recorded with an idempotency key.
+        :param key: Idempotency key of the completion event.
+        :return: (habit id, ISO timestamp), or None if no completion was recorded with this key.
+        """
+        try:
+            return self.connect().execute(
+                'SELECT id, completion_date FROM completion_keys WHERE key = ?', (key,)).fetchone()
+        except Error as e:
+            print(f"Error loading completion: {e}")
+            return None
+
+    def owned(self, conn: sqlite3.Connection, ids: Iterable[int]) -> set[int]:
+        """
+        Returns the IDs of existing habits among the given ones that belong to the user of this database.
+        :param conn: Connection to query.
+        :param ids: Habit IDs to check.
+        """
+        ids = list(ids)
+        if self.user is None:
+            sql, params = 'SELECT id FROM habits WHERE id = ?', [[id] for id in ids]
+        else:
+            sql, params = 'SELECT id FROM habits WHERE id = ? AND user = ?', [[id, self.user] for id in ids]
+        return {row[0] for values in params for row in conn.execute(sql, values)}
+
+    def change_counter(self) -> int:
+        """
+        Returns the number of habit inserts, updates and deletions in the database file so far, counted by triggers.
+        Every write of a habit or its completions increments the version of the habit and thereby the counter.
+        """
+        try:
+            return self.connect().execute("SELECT value FROM meta WHERE key = 'changes'").fetchone()[0]
+        except Error as e:
+            print(f"Error reading change counter: {e}")
+            return -1
+
+    def bump_versions(self, conn: sqlite3.Connection, ids: Iterable[int]) -> list[int]:
+        """
+        Increments the version of every changed habit, invalidating its cached analytics results.
+        :param conn: Connection of the ongoing write transaction.
+        :param ids: IDs of the changed habits.
+        :return: New versions, in the order of the IDs.
+        """
+        ids = list(ids)
+        conn.executemany('UPDATE habits SET version = version + 1 WHERE id = ?', ((id,) for id in ids))
+        return [conn.execute('SELECT version FROM habits WHERE id = ?', (id,)).fetchone()[0] for id in ids]
+
+    def update_stats(self, conn: sqlite3.Connection, id: int, epoch_days: list[int]):
+        """
+        Folds newly recorded completion days into the stored statistics of a habit in O(1) per day.
+        Statistics that are missing, stale or receive a day older than their last period are marked
+        stale instead and rebuilt by the next refresh_stats call.
+        :param conn: Connection of the ongoing write transaction.
+        :param id: Habit ID the completions were recorded for.
+        :param epoch_days: Recorded completion days since 1970-01-01.
+        """
+        row = conn.execute('''
+            SELECT h.id, h.name, h.periodicity, h.category, h.creation_date, s.current_streak,
+                   s.longest_streak, s.last_period, s.completed_periods, s.missed_periods, s.stale
+            FROM habits h
+            LEFT JOIN habit_stats s ON s.id = h.id
+            WHERE h.id = ?
+        ''', (id,)).fetchone()
+        if row is None or not epoch_days:
+            return
+        stats = HabitStats.from_row(row[:-1])
+        if row[-1] is None or row[-1] or not stats.add_days(sorted(epoch_days)):
+            self.mark_stale(conn, id)
+        else:
+            self.write_stats(conn, stats)
+
+    def update_rollups(self, conn: sqlite3.Connection, completions: Iterable[tuple[int, int]]):
+        """
+        Adds completions to the daily, weekly and monthly rollup counts, one upsert per touched bucket.
+        :param conn: Connection of the ongoing write transaction.
+        :param completions: (habit id, epoch day) pairs of the recorded completions.
+        """
+        counts = Counter((id, *key) for id, day in completions for key in rollup_keys(day))
+        conn.executemany('''
+            INSERT INTO completion_rollups (id, grain, year, period, completions)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(id, grain, year, period) DO UPDATE SET completions = completions + excluded.completions
+        ''', ((*key, count) for key, count in counts.items()))
+
+    def reset_rollups(self, conn: sqlite3.Connection, id: int) -> int:
+        """
+        Deletes the rollups of a habit whose history is rewritten, except the counts of its compacted completions.
+        :param conn: Connection of the ongoing write transaction.
+        :param id: Habit ID whose history is rewritten.
+        :return: Compaction horizon of the habit (None if it was never compacted).
+        """
+        row = conn.execute('SELECT horizon FROM completion_summaries WHERE id = ?', (id,)).fetchone()
+        kept = conn.execute(COMPACTED_DAYS, (id, row[0])).fetchall() if row else []
+        conn.execute('DELETE FROM completion_rollups WHERE id = ?', (id,))
+        self.update_rollups(conn, ((id, day) for day, count in kept for _ in range(count)))
+        return row[0] if row else None
+
+    def backfill_rollups(self):
+        """
+        Rebuilds all rollup counts from the completions table with set-based aggregate queries. Rollups of
+        compacted habits are kept, since they also count completions no longer in the completions table.
+        """
+        uncompacted = 'FROM completions WHERE id NOT IN (SELECT id FROM completion_summaries)'
+        try:
+            conn = self.connect()
+            conn.commit()
+            conn.executescript(f'''
+                BEGIN;
+                DELETE FROM completion_rollups WHERE id NOT IN (SELECT id FROM completion_summaries);
+                {ROLLUP_BACKFILL.replace('FROM completions', uncompacted)}
+                COMMIT;
+            ''')
+        except Error as e:
+            print(f"Error backfilling rollups: {e}")
+
+    def period_report(self, grain: str, start: tuple[int, int], end: tuple[int, int] = None,
+                      periodicity: str = None, category: str = None) -> dict:
+        """
+        Sums completions per habit over a range of periods from the rollup tables, with one primary
+        key range lookup per habit instead of a scan of the completion history.
+        :param grain: Rollup grain ('day', 'week' or 'month').
+        :param start: First (year, period) of the range, e.g. (2025, 12) for ISO week 12 of 2025.
+        :param end: Last (year, period) of the range (default: start).
+        :param periodicity: Periodicity to filter by (optional).
+        :param category: Category to filter by (optional).
+        :return: Completion count per habit name, including habits without completions in the range.
+        """
+        end = end or start
+        query, params = self.habit_query(periodicity=periodicity, category=category)
+        try:
+            cursor = self.connect().execute(f'''
+                SELECT h.name, COALESCE(SUM(r.completions), 0)
+                FROM ({query}) h
+                LEFT JOIN completion_rollups r
+                    ON r.id = h.id AND r.grain = ? AND (r.year, r.period) BETWEEN (?, ?) AND (?, ?)
+                GROUP BY h.id
+                ORDER BY h.id
+            ''', (*params, grain, *start, *end))
+            return dict(cursor.fetchall())
+        except Error as e:
+            print(f"Error loading report: {e}")
+            return {}
+
+    def mark_stale(self, conn: sqlite3.Connection, id: int):
+        """
+        Marks the stored statistics of a habit as stale.
+        :param conn: Connection of the ongoing write transaction.
+        :param id: Habit ID whose statistics are outdated.
+        """
+        conn.execute('INSERT OR REPLACE INTO habit_stats (id, stale) VALUES (?, 1)', (id,))
+
+    def write_stats(self, conn: sqlite3.Connection, stats: HabitStats):
+        """
+        Stores up-to-date statistics of a habit.
+        :param conn: Connection of the ongoing write transaction.
+        :param stats: Statistics to store.
+        """
+        conn.execute('''
+            INSERT OR REPLACE INTO habit_stats
+            (id, current_streak, longest_streak, last_period, completed_periods, missed_periods, stale)
+            VALUES (?, ?, ?, ?, ?, ?, 0)
+        ''', (stats.id, *stats.metrics()))
+
+    def refresh_stats(self):
+        """
+        Rebuilds the statistics of every habit whose stored statistics are missing or stale from the summary
+        of its compacted history and its completion days, read in order from the (habit id, completion day) index.
+        Rows are read and rebuilt inside one write transaction, so completions recorded meanwhile are not lost.
+        """
+        try:
+            if not self.connect().execute(f'SELECT EXISTS ({STALE_STATS})').fetchone()[0]:
+                return
+            with self.transaction() as conn:
+                stale = conn.execute(STALE_STATS).fetchall()
+                for row in stale:
+                    stats = HabitStats(*row)
+                    self.load_summary(conn, stats)
+                    days = conn.execute('''
+                        SELECT completion_day FROM completions WHERE id = ? ORDER BY completion_day
+                    ''', (stats.id,))
+                    stats.add_days(day for (day,) in days)
+                    self.write_stats(conn, stats)
+        except Error as e:
+            print(f"Error refreshing habit statistics: {e}")
+
+    def load_summary(self, conn: sqlite3.Connection, stats: HabitStats) -> int:
+        """
+        Folds the compacted history of a habit into empty statistics and sets their horizon: the stored summary
+        if it was computed for the same periodicity, otherwise the compacted days kept in the daily rollups.
+        :param conn: Connection to query.
+        :param stats: Empty statistics of the habit.
+        :return: Number of compacted completions (0 if the habit was never compacted).
+        """
+        row = conn.execute('''
+            SELECT horizon, periodicity, current_streak, longest_streak, last_period, completed_periods,
+                   missed_periods, completions
+            FROM completion_summaries
+            WHERE id = ?
+        ''', (stats.id,)).fetchone()
+        if row is None:
+            return 0
+        stats.horizon, periodicity, *metrics, completions = row
+        if periodicity == stats.periodicity:
+            stats.set_metrics(metrics)
+        else:
+            stats.add_days(day for day, _ in conn.execute(COMPACTED_DAYS, (stats.id, stats.horizon)))
+        return completions
+
+    def compact(self, before: str, archive: Callable[[Iterable[tuple]], int] = None) -> dict:
+        """
+        Folds the completions recorded before a horizon into a summary of the streak and completion statistics
+        of each habit and deletes them, in one transaction. Statistics, rollups and period reports stay exact;
+        loaded habits carry the summary and only the completions since the horizon.
+        :param before: ISO date of the horizon; completions on earlier days are compacted.
+        :param archive: Function receiving the compacted rows in the layout of iter_completions before they are
+                        deleted (e.g., to write them to a compressed file).
+        :return: Number of compacted habits and completions.
+        """
+        horizon = to_epoch_day(before)
+        query, params = self.habit_query()
+        result = {"habits": 0, "completions": 0}
+        try:
+            with self.transaction() as conn:
+                habits = conn.execute(f'''
+                    SELECT h.id, h.name, h.periodicity, h.category, h.creation_date
+                    FROM ({query}) h
+                    WHERE EXISTS (SELECT 1 FROM completions c WHERE c.id = h.id AND c.completion_day < ?)
+                ''', (*params, horizon)).fetchall()
+                if archive and habits:
+                    with closing(conn.execute(f'''
+                            SELECT h.id, h.name, h.periodicity, h.category, h.creation_date, c.completion_date
+                            FROM ({query}) h
+                            JOIN completions c ON c.id = h.id AND c.completion_day < ?
+                            ORDER BY h.id, c.completion_id
+                        ''', (*params, horizon))) as cursor:
+                        archive(cursor)
+                for row in habits:
+                    stats = HabitStats(*row)
+                    completions = self.load_summary(conn, stats)
+                    days = [day for (day,) in conn.execute('''
+                        SELECT completion_day FROM completions WHERE id = ? AND completion_day < ? ORDER BY completion_day
+                    ''', (stats.id, horizon))]
+                    stats.add_days(days)
+                    conn.execute('''
+                        INSERT OR REPLACE INTO completion_summaries
+                        (id, horizon, periodicity, current_streak, longest_streak, last_period, completed_periods,
+                         missed_periods, completions)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ''', (stats.id, max(horizon, stats.horizon or horizon), stats.periodicity, *stats.metrics(),
+                          completions + len(days)))
+                    conn.execute('DELETE FROM completions WHERE id = ? AND completion_day < ?', (stats.id, horizon))
+                    result["habits"] += 1
+                    result["completions"] += len(days)
+        except Error as e:
+            print(f"Error compacting completions: {e}")
+            return {"habits": 0, "completions": 0}
+        return result
+
+    def vacuum(self, threshold: float = 0.25, pages: int = None) -> int:
+        """
+        Returns free pages to the file system once they make up a share of the file. The first run switches
+        the file to incremental auto-vacuum with a full VACUUM; later runs free pages incrementally.
+        :param threshold: Share of free pages below which nothing is done.
+        :param pages: Maximum number of pages to free per run (default: all).
+        :return: Number of pages removed from the file.
+        """
+        try:
+            conn = self.connect()
+            conn.commit()
+            size, free = (conn.execute(f'PRAGMA {pragma}').fetchone()[0] for pragma in ("page_count", "freelist_count"))
+            if not size or free / size < threshold:
+                return 0
+            if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+                conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+                conn.execute('VACUUM')
+            else:
+                conn.execute(f'PRAGMA incremental_vacuum({int(pages or 0)})').fetchall()
+            return size - conn.execute('PRAGMA page_count').fetchone()[0]
+        except Error as e:
+            print(f"Error vacuuming database: {e}")
+            return 0
+
+    def habit_query(self, id: int = None, min_id: int = None, max_id: int = None, periodicity: str = None,
+                    category: str = None, limit: int = None, offset: int = None) -> tuple[str, list]:
+        """
+        Compiles habit filters into a SELECT over the habits of the user, ordered by ID and answered from the
+        primary key and the name, periodicity and category indexes.
+        :param id: Habit ID to select (optional).
+        :param min_id: Lowest habit ID to select (optional).
+        :param max_id: Highest habit ID to select (optional).
+        :param periodicity: Periodicity to filter by (optional).
+        :param category: Category to filter by (optional).
+        :param limit: Maximum number of habits (optional).
+        :param offset: Number of matching habits to skip (optional).
+        :return: SQL selecting (id, name, periodicity, category, creation_date, version) and its parameters.
+        """
+        clauses, params = [], []
+        for column, operator, value in (("user", "=", self.user), ("id", "=", id), ("id", ">=", min_id),
+                                        ("id", "<=", max_id), ("periodicity", "=", periodicity),
+                                        ("category", "=", category)):
+            if value is not None:
+                clauses.append(f'{column} {operator} ?')
+                params.append(value)
+        sql = 'SELECT id, name, periodicity, category, creation_date, version FROM habits'
+        if clauses:
+            sql += f" WHERE {' AND '.join(clauses)}"
+        sql += ' ORDER BY id'
+        if limit is not None or offset:
+            sql += ' LIMIT ? OFFSET ?'
+            params += [-1 if limit is None else limit, offset or 0]
+        return sql, params
+
+    def load_stats(self, id: int = None, periodicity: str = None, category: str = None) -> list[HabitStats]:
+        """
+        Loads precomputed statistics of the matching habits without loading any completion history,
+        rebuilding stale statistics first.
+        :param id: Habit ID to load (optional).
+        :param periodicity: Periodicity to filter by (optional).
+        :param category: Category to filter by (optional).
+        """
+        return list(self.iter_stats(id=id, periodicity=periodicity, category=category))
+
+    def iter_stats(self, id: int = None, min_id: int = None, periodicity: str = None, category: str = None,
+                   limit: int = None, offset: int = None, order_by: str = None, descending: bool = False) -> Iterator[HabitStats]:
+        """
+        Streams precomputed statistics of the matching habits from a cursor, ordered by ID or by a stored metric,
+        rebuilding stale statistics first.
+        :param id: Habit ID to load (optional).
+        :param min_id: Lowest habit ID to load, for keyset pagination (optional).
+        :param periodicity: Periodicity to filter by (optional).
+        :param category: Category to filter by (optional).
+        :param limit: Maximum number of habits (optional).
+        :param offset: Number of matching habits to skip (optional).
+        :param order_by: Indexed metric to stream the statistics in order of ('longest_streak', 'current_streak'
+                         or 'missed_periods'; default: habit ID), read from the metric index so rows after
+                         the point where the consumer stops are never read. Ties come in no particular order.
+        :param descending: Stream the highest values of order_by first.
+        """
+        if order_by not in (None, "longest_streak", "current_streak", "missed_periods"):
+            raise ValueError(f"Statistics cannot be ordered by '{order_by}'.")
+        order = f"s.{order_by}{' DESC' if descending else ''}" if order_by else "h.id"
+        query, params = self.habit_query(id=id, min_id=min_id, periodicity=periodicity, category=category,
+                                         limit=limit, offset=offset)
+        source = (f'habit_stats s CROSS JOIN ({query}) h ON s.id = h.id' if order_by
+                  else f'({query}) h JOIN habit_stats s ON s.id = h.id')
+        self.refresh_stats()
+        try:
+            with closing(self.connect().execute(f'''
+                    SELECT h.id, h.name, h.periodicity, h.category, h.creation_date, s.current_streak,
+                           s.longest_streak, s.last_period, s.completed_periods, s.missed_periods, h.version
+                    FROM {source}
+                    ORDER BY {order}
+                ''', params)) as cursor:
+                for row in cursor:
+                    stats = HabitStats.from_row(row[:-1])
+                    stats.version = row[-1]
+                    yield stats
+        except Error as e:
+            print(f"Error loading habit statistics: {e}")
+
+    def group_values(self, column: str, periodicity: str = None, category: str = None) -> list[str]:
+        """
+        Returns the distinct categories or periodicities of the matching habits.
+        :param column: Attribute to list ('category' or 'periodicity').
+        :param periodicity: Periodicity to filter by (optional).
+        :param category: Category to filter by (optional).
+        """
+        if column not in ("category", "periodicity"):
+            raise ValueError(f"Habits cannot be grouped by '{column}'.")
+        query, params = self.habit_query(periodicity=periodicity, category=category)
+        try:
+            return [row[0] for row in self.connect().execute(f'SELECT DISTINCT h.{column} FROM ({query}) h', params)]
+        except Error as e:
+            print(f"Error loading groups: {e}")
+            return []
+
+    def column_widths(self, periodicity: str = None, category: str = None) -> dict:
+        """
+        Returns the widest text of each output column over the matching habits, computed by an aggregate
+        query so fixed-width output can be written while rows are still being read.
+        :param periodicity: Periodicity to filter by (optional).
+        :param category: Category to filter by (optional).
+        :return: Width per column (id, name, periodicity, category, longest_streak, missed_periods).
+        """
+        self.refresh_stats()
+        query, params = self.habit_query(periodicity=periodicity, category=category)
+        columns = ("id", "name", "periodicity", "category", "longest_streak", "missed_periods")
+        try:
+            row = self.connect().execute(f'''
+                SELECT MAX(LENGTH(h.id)), MAX(LENGTH(h.name)), MAX(LENGTH(h.periodicity)),
+                       MAX(LENGTH(h.category)), MAX(LENGTH(s.longest_streak)), MAX(LENGTH(s.missed_periods))
+                FROM ({query}) h
+                LEFT JOIN habit_stats s ON s.id = h.id
+            ''', params).fetchone()
+            return dict(zip(columns, (width or 0 for width in row)))
+        except Error as e:
+            print(f"Error measuring columns: {e}")
+            return dict.fromkeys(columns, 0)
+
     def load_habits(self) -> list[Habit]:
         """
         Loads habits and completions from the database.
         """
-        habits = []
+        return list(self.iter_habits())
+
+    def get_habit(self, id: int, with_completions: bool = True) -> Habit:
+        """
+        Loads a single habit by ID with an indexed lookup.
+        :param id: Habit ID to load.
+        :param with_completions: Also load the completion history of the habit.
+        :return: The habit, or None if no habit with this ID exists.
+        """
+        habits = self.iter_habits(id=id, with_completions=with_completions)
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('SELECT * FROM habits')
-                for row in cursor.fetchall():
-                    habit = Habit(row[1], row[2], row[3])
-                    habit.id, habit.creation_date = row[0], row[4]
-                    cursor.execute('''
-                        SELECT completion_date 
-                        FROM completions 
-                        WHERE id = ?''',
-                        (habit.id,))
-                    habit.completion_dates = [row[0] for row in cursor.fetchall()]
-                    habits.append(habit)
+            return next(habits, None)
+        finally:
+            habits.close()
+
+    def find_habits(self, periodicity: str = None, category: str = None, since: str = None, until: str = None,
+                    limit: int = None, offset: int = None, with_completions: bool = True) -> list[Habit]:
+        """
+        Loads habits matching the filters, ordered by ID.
+        :param periodicity: Periodicity to filter by (optional).
+        :param category: Category to filter by (optional).
+        :param since: Only load completions on or after this ISO date (optional).
+        :param until: Only load completions on or before this ISO date (optional).
+        :param limit: Maximum number of habits (optional).
+        :param offset: Number of matching habits to skip (optional).
+        :param with_completions: Also load completion histories.
+        """
+        return list(self.iter_habits(periodicity=periodicity, category=category, since=since, until=until,
+                                     limit=limit, offset=offset, with_completions=with_completions))
+
+    def iter_habits(self, min_id: int = None, max_id: int = None, id: int = None, periodicity: str = None,
+                    category: str = None, since: str = None, until: str = None, limit: int = None,
+                    offset: int = None, with_completions: bool = True) -> Iterator[Habit]:
+        """
+        Streams matching habits and their completions from a single ordered join, yielding each habit as soon
+        as all of its completion rows have been read so memory stays flat regardless of database size.
+        Filters and pagination apply to habits; completions are only read for the habits that match.
+        Compacted habits carry the summary of their compacted history (see compact).
+        :param min_id: Lowest habit ID to load (optional).
+        :param max_id: Highest habit ID to load (optional).
+        :param id: Habit ID to load (optional).
+        :param periodicity: Periodicity to filter by (optional).
+        :param category: Category to filter by (optional).
+        :param since: Only load completions on or after this ISO date (optional).
+        :param until: Only load completions on or before this ISO date (optional).
+        :param limit: Maximum number of habits (optional).
+        :param offset: Number of matching habits to skip (optional).
+        :param with_completions: Also load completion histories.
+        """
+        query, params = self.habit_query(id, min_id, max_id, periodicity, category, limit, offset)
+        join = 'c.id = h.id'
+        if since is not None:
+            join += ' AND c.completion_day >= ?'
+            params.append(to_epoch_day(since))
+        if until is not None:
+            join += ' AND c.completion_day <= ?'
+            params.append(to_epoch_day(until))
+        query = f'''
+            SELECT h.*, s.id IS NOT NULL AS compacted
+            FROM ({query}) h
+            LEFT JOIN completion_summaries s ON s.id = h.id
+        '''
+        if not with_completions:
+            sql = f'SELECT *, NULL FROM ({query}) h ORDER BY h.id'
+        else:
+            sql = f'''
+                SELECT h.id, h.name, h.periodicity, h.category, h.creation_date, h.version, h.compacted, c.completion_day
+                FROM ({query}) h
+                LEFT JOIN completions c ON {join}
+                ORDER BY h.id, c.completion_day
+            '''
+        try:
+            conn = self.connect()
+            with closing(conn.execute(sql, params)) as cursor:
+                habit = None
+                for id, name, periodicity, category, creation_date, version, compacted, completion_day in cursor:
+                    if habit is None or habit.id != id:
+                        if habit is not None:
+                            habit.mark_clean()
+                            yield habit
+                        habit = Habit(name, periodicity, category)
+                        habit.id, habit.creation_date, habit.version = id, creation_date, version
+                        if compacted:
+                            habit.summary = HabitStats(id, name, periodicity, category, creation_date)
+                            self.load_summary(conn, habit.summary)
+                    if completion_day is not None and (not habit.completion_days or habit.completion_days[-1] != completion_day):
+                        habit.completion_days.append(completion_day)
+                if habit is not None:
+                    habit.mark_clean()
+                    yield habit
         except Error as e:
             print(f"Error loading habits: {e}")
-        return habits
\ No newline at end of file
+
+    def iter_completions(self) -> Iterator[tuple]:
+        """
+        Streams every completion with the attributes of its habit, ordered by habit and insertion.
+        Yields (habit_id, name, periodicity, category, creation_date, completion_date) tuples.
+        """
+        query, params = self.habit_query()
+        try:
+            with closing(self.connect().execute(f'''
+                    SELECT h.id, h.name, h.periodicity, h.category, h.creation_date, c.completion_date
+                    FROM ({query}) h
+                    JOIN completions c ON c.id = h.id
+                    ORDER BY h.id, c.completion_id
+                ''', params)) as cursor:
+                yield from cursor
+        except Error as e:
+            print(f"Error exporting completions: {e}")
+
+    def import_completions(self, records: Iterable[dict], batch_size: int = 10000,
+                           progress: Callable[[int], None] = None) -> int:
+        """
+        Bulk-inserts completions inside a single transaction using batched executemany calls.
+        Records reference their habit by name (habits missing from the database are created from the
+        record's periodicity, category and creation date) or, without a name, by habit_id.
+        Statistics of every touched habit are marked stale and rebuilt lazily.
+        :param records: Dicts with a completion_date and either a name or a habit_id.
+        :param batch_size: Number of rows per executemany call.
+        :param progress: Callback receiving the number of rows imported so far after every batch.
+        :return: Number of imported completions.
+        """
+        count = 0
+        try:
+            with self.transaction() as conn:
+                query, params = self.habit_query()
+                ids = {row[0] for row in conn.execute(query, params)}
+                names = {}
+                touched = set()
+                batch = []
+                for line, record in enumerate(records, start=1):
+                    if record.get("name"):
+                        id = names.get(record["name"]) or self.import_habit(conn, record)
+                        names[record["name"]] = id
+                    else:
+                        id = int(record["habit_id"])
+                        if id not in ids:
+                            raise ValueError(f"Record {line}: no habit with ID {id} found.")
+                    date = record["completion_date"]
+                    batch.append((id, date, to_epoch_day(date)))
+                    touched.add(id)
+                    if len(batch) >= batch_size:
+                        count += self.insert_batch(conn, batch, progress, count)
+                count += self.insert_batch(conn, batch, progress, count)
+                conn.executemany('INSERT OR REPLACE INTO habit_stats (id, stale) VALUES (?, 1)',
+                                 ((id,) for id in touched))
+                self.bump_versions(conn, touched)
+        except Error as e:
+            print(f"Error importing completions: {e}")
+            return 0
+        return count
+
+    def import_habit(self, conn: sqlite3.Connection, record: dict) -> int:
+        """
+        Returns the ID of the habit named in an import record, creating the habit if it does not exist.
+        :param conn: Connection of the ongoing import transaction.
+        :param record: Import record with a name and optional periodicity, category and creation_date.
+        """
+        existing = conn.execute('SELECT id FROM habits WHERE user = ? AND name = ?',
+                                (self.user or "", record["name"])).fetchone()
+        if existing:
+            return existing[0]
+        creation_date = record.get("creation_date") or record["completion_date"]
+        cursor = conn.execute('''
+            INSERT INTO habits (name, periodicity, category, creation_date, creation_day, user)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (record["name"], record.get("periodicity") or "daily", record.get("category") or "general",
+              creation_date, to_epoch_day(creation_date), self.user or ""))
+        return cursor.lastrowid
+
+    def insert_batch(self, conn: sqlite3.Connection, batch: list[tuple], progress: Callable[[int], None],
+                     imported: int) -> int:
+        """
+        Inserts and clears one batch of (habit id, completion date, completion day) rows.
+        :param conn: Connection of the ongoing import transaction.
+        :param batch: Rows to insert; emptied afterwards.
+        :param progress: Callback receiving the number of rows imported so far (optional).
+        :param imported: Number of rows imported before this batch.
+        :return: Number of rows inserted.
+        """
+        size = len(batch)
+        if size:
+            conn.executemany('''
+                INSERT INTO completions (id, completion_date, completion_day)
+                VALUES (?,?,?)
+            ''', batch)
+            self.update_rollups(conn, ((id, day) for id, _, day in batch))
+            batch.clear()
+            if progress:
+                progress(imported + size)
+        return size
@@ -1,14 +1,49 @@
-from datetime import datetime
+from array import array
+from bisect import bisect_left
+from datetime import datetime, date
 
 """
 Habit class including constructor for individual habits with all attributes and completion.
 """
 
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def to_epoch_day(timestamp: str) -> int:
+    """
+    Converts an ISO date or timestamp to the number of days since 1970-01-01.
+    :param timestamp: ISO date or timestamp (e.g., "2025-03-23T10:00:00").
+    """
+    return date.fromisoformat(timestamp[:10]).toordinal() - EPOCH_ORDINAL
+
+
+def to_period(epoch_day: int, periodicity: str) -> int:
+    """
+    Converts an epoch day to the period it belongs to: the day itself for daily habits, or the ordinal
+    of its Monday-based ISO week for weekly habits (1970-01-01 was a Thursday in week 0).
+    :param epoch_day: Number of days since 1970-01-01.
+    :param periodicity: Frequency of the habit ("daily" or "weekly").
+    """
+    return epoch_day if periodicity == "daily" else (epoch_day + 3) // 7
+
+
+def from_epoch_day(epoch_day: int) -> str:
+    """
+    Converts a number of days since 1970-01-01 back to an ISO date.
+    :param epoch_day: Number of days since 1970-01-01.
+    """
+    return date.fromordinal(epoch_day + EPOCH_ORDINAL).isoformat()
+
 
 class Habit:
     """
-    Represents individual habits.
+    Represents individual habits. Completions are kept in a compact, sorted and deduplicated
+    array of epoch days (4 bytes each) instead of a list of ISO timestamp strings. Completions removed
+    by compaction are represented by summary, the statistics folded from them (None if never compacted).
     """
+    __slots__ = ("id", "name", "periodicity", "category", "creation_date", "completion_days",
+                 "pending", "rewritten", "saved_fields", "version", "summary")
+
     def __init__(self, name: str, periodicity: str, category: str):
         """
         Initializes habit with task name, periodicity, and category.
@@ -21,12 +56,95 @@ class Habit:
         self.periodicity = periodicity
         self.category = category
         self.creation_date = datetime.now().isoformat()
-        self.completion_dates = []
+        self.completion_days = array("i")
+        self.pending = []
+        self.rewritten = False
+        self.saved_fields = None
+        self.version = None
+        self.summary = None
+
+    @property
+    def completion_dates(self) -> tuple[str, ...]:
+        """
+        Returns the completed days as ISO dates in ascending order.
+        """
+        return tuple(from_epoch_day(day) for day in self.completion_days)
+
+    @completion_dates.setter
+    def completion_dates(self, timestamps):
+        """
+        Replaces the whole completion history, which is rewritten on the next save.
+        :param timestamps: ISO dates or timestamps of the completions.
+        """
+        self.completion_days = array("i", sorted({to_epoch_day(timestamp) for timestamp in timestamps}))
+        self.pending = []
+        self.rewritten = True
+
+    def add_day(self, epoch_day: int) -> bool:
+        """
+        Inserts a completed day, keeping the array sorted and free of duplicates.
+        :param epoch_day: Number of days since 1970-01-01.
+        :return: False if the day was already completed.
+        """
+        days = self.completion_days
+        if not days or epoch_day > days[-1]:
+            days.append(epoch_day)
+            return True
+        index = bisect_left(days, epoch_day)
+        if days[index] == epoch_day:
+            return False
+        days.insert(index, epoch_day)
+        return True
+
+    def add_completion(self, timestamp: str):
+        """
+        Records a completion at the given timestamp, to be appended to the database on the next save.
+        :param timestamp: ISO date or timestamp of the completion.
+        """
+        self.add_day(to_epoch_day(timestamp))
+        self.pending.append(timestamp)
 
     def complete_habit(self):
         """
         Records habit completion timestamp.
         """
-        self.completion_dates.append(datetime.now().isoformat())
+        self.add_completion(datetime.now().isoformat())
 
+    def fields(self) -> tuple:
+        """
+        Returns the persisted attributes of the habit (name, periodicity, category, creation date).
+        """
+        return self.name, self.periodicity, self.category, self.creation_date
 
+    def mark_clean(self):
+        """
+        Records the current state as persisted, so later saves only write what changed since.
+        """
+        self.saved_fields = self.fields()
+        self.pending = []
+        self.rewritten = False
+
+    def fields_changed(self) -> bool:
+        """
+        Returns whether any persisted attribute changed since the habit was last saved or loaded.
+        """
+        return self.fields() != self.saved_fields
+
+    def history_rewritten(self) -> bool:
+        """
+        Returns whether the completion history was replaced since the last save, or the habit was never
+        saved or loaded in this process, which requires a full rewrite.
+        """
+        return self.saved_fields is None or self.rewritten
+
+    def unsaved_changes(self) -> bool:
+        """
+        Returns whether the habit differs from its saved version (new, edited or with new completions).
+        """
+        return self.history_rewritten() or bool(self.pending) or self.fields_changed()
+
+    def new_completions(self) -> list[str]:
+        """
+        Returns completion timestamps recorded since the habit was last saved or loaded.
+        """
+        return list(self.pending)
@@ -0,0 +1,44 @@
+import numpy as np
+from .habit import Habit
+from .stats import HabitStats
+
+"""
+Vectorized analytics backend using NumPy. Each habit's completions are converted once to a sorted
+int32 array of epoch days, and all statistics are derived from it with array operations.
+Selected with analytics.set_backend("numpy").
+"""
+
+
+def completion_days(habit: Habit) -> np.ndarray:
+    """
+    Return the completion days of a habit as a sorted int32 array of days since 1970-01-01,
+    sharing memory with the habit's own completion array.
+    :param habit: Habit to convert.
+    """
+    return np.frombuffer(habit.completion_days, dtype=np.int32)
+
+def completion_periods(days: np.ndarray, periodicity: str) -> np.ndarray:
+    """
+    Return the sorted distinct periods (epoch days or ISO week ordinals) of completion days.
+    :param days: Sorted completion days since 1970-01-01.
+    :param periodicity: Periodicity of the habit ("daily" or "weekly").
+    """
+    return np.unique(days if periodicity == "daily" else (days + 3) // 7)
+
+def habit_stats(habit: Habit) -> HabitStats:
+    """
+    Compute streak and completion statistics of a habit from run lengths of consecutive periods.
+    :param habit: Habit to compute statistics for.
+    """
+    stats = HabitStats(habit.id, habit.name, habit.periodicity, habit.category, habit.creation_date)
+    periods = completion_periods(completion_days(habit), habit.periodicity)
+    if periods.size == 0:
+        return stats
+    breaks = np.flatnonzero(np.diff(periods) != 1) + 1
+    runs = np.diff(np.concatenate(([0], breaks, [periods.size])))
+    stats.current_streak = int(runs[-1])
+    stats.longest_streak = int(runs.max())
+    stats.last_period = int(periods[-1])
+    stats.completed_periods = int(periods.size)
+    stats.missed_periods = int(breaks.size)
+    return stats
@@ -0,0 +1,58 @@
+import csv
+import json
+from typing import IO, Iterable, Sequence
+
+"""
+Output module including streaming writers for command results (table, JSONL, CSV and fixed-width).
+"""
+
+OUTPUT_FORMATS = ("table", "jsonl", "csv", "fixed")
+FLUSH_EVERY = 1000
+
+
+def format_fixed(row: Sequence, widths: list[int]) -> str:
+    """
+    Format a row as fixed-width text: numbers are right-aligned, other values left-aligned.
+    :param row: Values of the row.
+    :param widths: Width of each column.
+    """
+    return "  ".join(str(value).rjust(width) if isinstance(value, (int, float)) else str(value).ljust(width)
+                     for value, width in zip(row, widths)).rstrip()
+
+def write_rows(rows: Iterable[Sequence], fields: list[str], stream: IO[str], fmt: str, headers: list[str] = None,
+               widths: list[int] = None) -> int:
+    """
+    Write result rows as they are produced. Only the "table" format buffers all rows (to size its columns);
+    "fixed" uses precomputed column widths instead, so the first rows appear immediately and memory stays flat.
+    :param rows: Rows with one value per field.
+    :param fields: Field names, used as JSONL keys and CSV header.
+    :param stream: Text stream to write to.
+    :param fmt: Output format ("table", "jsonl", "csv" or "fixed").
+    :param headers: Column titles of the "table" and "fixed" formats (default: field names).
+    :param widths: Widest value of each column for the "fixed" format.
+    :return: Number of rows written.
+    """
+    headers = headers or fields
+    if fmt == "table":
+        from tabulate import tabulate
+        rows = [list(row) for row in rows]
+        stream.write(tabulate(rows, headers=headers) + "\n")
+        return len(rows)
+    if fmt == "csv":
+        writer = csv.writer(stream)
+        writer.writerow(fields)
+        write = writer.writerow
+    elif fmt == "jsonl":
+        write = lambda row: stream.write(json.dumps(dict(zip(fields, row))) + "\n")
+    else:
+        widths = [max(len(header), width) for header, width in zip(headers, widths or [0] * len(headers))]
+        stream.write(format_fixed(headers, widths) + "\n")
+        stream.write(format_fixed(["-" * width for width in widths], widths) + "\n")
+        write = lambda row: stream.write(format_fixed(row, widths) + "\n")
+    count = 0
+    for row in rows:
+        write(row)
+        count += 1
+        if count == 1 or count % FLUSH_EVERY == 0:
+            stream.flush()
+    return count
@@ -0,0 +1,157 @@
+from datetime import date
+from typing import AsyncIterable, Iterable, Union
+from .analytics import set_backend, habit_stats_as_of, calculate_current_streak, get_completion_rate
+from .database import Database
+from .habit import Habit
+from .stats import HabitStats
+
+"""
+Parallel analytics module including a process pool runner that shards habits by ID range.
+"""
+
+
+class Summary:
+    """
+    Represents mergeable analytics aggregates over a set of habits.
+    """
+    def __init__(self):
+        """
+        Initializes empty aggregates.
+        """
+        self.habit_count = 0
+        self.longest_streak = 0
+        self.completion_rate_total = 0.0
+        self.most_struggled = None
+        self.current_streaks = []
+
+    def add(self, habit: Union[Habit, HabitStats], as_of: date = None):
+        """
+        Adds the metrics of a habit to the aggregates.
+        :param habit: Habit or precomputed habit statistics.
+        :param as_of: Reference date; completions after it are ignored (default: today).
+        """
+        stats = habit_stats_as_of(habit, as_of)
+        self.habit_count += 1
+        self.longest_streak = max(self.longest_streak, stats.longest_streak)
+        self.completion_rate_total += get_completion_rate(stats, as_of)
+        self.current_streaks.append((stats.id, stats.name, calculate_current_streak(stats, as_of)))
+        self.most_struggled = max_struggled(self.most_struggled, (stats.missed_periods, stats.id, stats.name))
+
+    def merge(self, other: "Summary") -> "Summary":
+        """
+        Merges the aggregates of another shard into these.
+        :param other: Aggregates of another shard.
+        """
+        self.habit_count += other.habit_count
+        self.longest_streak = max(self.longest_streak, other.longest_streak)
+        self.completion_rate_total += other.completion_rate_total
+        self.current_streaks.extend(other.current_streaks)
+        self.most_struggled = max_struggled(self.most_struggled, other.most_struggled)
+        return self
+
+    @property
+    def average_completion_rate(self) -> float:
+        """
+        Returns the mean completion rate across all aggregated habits.
+        """
+        return self.completion_rate_total / self.habit_count if self.habit_count else 0.0
+
+    @property
+    def most_struggled_name(self) -> str:
+        """
+        Returns the name of the habit with most broken streaks, or None if no habits were aggregated.
+        """
+        return self.most_struggled[2] if self.most_struggled else None
+
+
+def max_struggled(first: tuple, second: tuple) -> tuple:
+    """
+    Return the (missed periods, id, name) entry with most missed periods, preferring the lower ID on ties.
+    :param first: Current most struggled entry or None.
+    :param second: Candidate entry or None.
+    """
+    if first is None or second is None:
+        return first or second
+    return second if (second[0], -second[1]) > (first[0], -first[1]) else first
+
+def summarize(habits: Iterable[Union[Habit, HabitStats]], periodicity: str = None, category: str = None,
+              as_of: date = None) -> Summary:
+    """
+    Aggregate the metrics of habits matching the optional filters.
+    :param habits: Habits or precomputed habit statistics.
+    :param periodicity: Periodicity to filter by ('daily' or 'weekly').
+    :param category: Category to filter by (e.g. 'health').
+    :param as_of: Reference date; completions after it are ignored (default: today).
+    """
+    summary = Summary()
+    for habit in habits:
+        if (periodicity is None or habit.periodicity == periodicity) and (category is None or habit.category == category):
+            summary.add(habit, as_of)
+    return summary
+
+async def summarize_async(habits: AsyncIterable[Union[Habit, HabitStats]], periodicity: str = None,
+                          category: str = None) -> Summary:
+    """
+    Aggregate the metrics of habits matching the optional filters as they arrive from an async stream
+    (e.g., AsyncDatabase.iter_habits).
+    :param habits: Async stream of habits or precomputed habit statistics.
+    :param periodicity: Periodicity to filter by ('daily' or 'weekly').
+    :param category: Category to filter by (e.g. 'health').
+    """
+    summary = Summary()
+    async for habit in habits:
+        if (periodicity is None or habit.periodicity == periodicity) and (category is None or habit.category == category):
+            summary.add(habit)
+    return summary
+
+def summarize_range(db_path: str, min_id: int, max_id: int, periodicity: str = None, category: str = None,
+                    backend: str = "python", user: str = "", as_of: date = None) -> Summary:
+    """
+    Worker entry point: read one ID range of habits directly from SQLite and aggregate their metrics.
+    :param db_path: Path to the SQLite database file.
+    :param min_id: Lowest habit ID of the shard.
+    :param max_id: Highest habit ID of the shard.
+    :param periodicity: Periodicity to filter by ('daily' or 'weekly').
+    :param category: Category to filter by (e.g. 'health').
+    :param backend: Analytics engine ('python' or 'numpy').
+    :param user: User whose habits are analyzed (None for all users).
+    :param as_of: Reference date; completions after it are ignored (default: today).
+    """
+    set_backend(backend)
+    with Database(db_path, user=user) as db:
+        return summarize(db.iter_habits(min_id, max_id, periodicity=periodicity, category=category), as_of=as_of)
+
+def id_ranges(db: Database, shards: int) -> list[tuple[int, int]]:
+    """
+    Split the habit ID space into contiguous ranges of roughly equal width.
+    :param db: Database to shard.
+    :param shards: Number of ranges.
+    """
+    low, high = db.connect().execute('SELECT MIN(id), MAX(id) FROM habits').fetchone()
+    if low is None:
+        return []
+    width = -(-(high - low + 1) // shards)
+    return [(start, min(start + width - 1, high)) for start in range(low, high + 1, width)]
+
+def analyze_parallel(db: Database, workers: int, periodicity: str = None, category: str = None,
+                     backend: str = "python", as_of: date = None) -> Summary:
+    """
+    Aggregate the metrics of all habits with a pool of worker processes, one ID range per worker.
+    :param db: Database to analyze.
+    :param workers: Number of worker processes.
+    :param periodicity: Periodicity to filter by ('daily' or 'weekly').
+    :param category: Category to filter by (e.g. 'health').
+    :param backend: Analytics engine ('python' or 'numpy').
+    :param as_of: Reference date; completions after it are ignored (default: today).
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    summary = Summary()
+    ranges = id_ranges(db, workers)
+    if not ranges:
+        return summary
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as pool:
+        futures = [pool.submit(summarize_range, db.db_path, low, high, periodicity, category, backend, db.user, as_of)
+                   for low, high in ranges]
+        for future in futures:
+            summary.merge(future.result())
+    return summary
@@ -0,0 +1,231 @@
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+"""
+Profiling module including opt-in instrumentation of Database methods and analytics functions and hooks
+for dumping cProfile and tracemalloc snapshots. Nothing is wrapped until enable() is called, so the
+instrumentation costs nothing while it is off.
+"""
+
+PROFILE_PATH = "data/profile.json"
+HEADERS = ["Function", "Calls", "Total ms", "Mean ms", "p50 ms", "p99 ms", "Rows read", "Rows written"]
+BUCKETS = 32
+registry = {}
+originals = []
+lock = threading.Lock()
+
+
+class CallStats:
+    """
+    Call count, total time, rows read and written, and a latency histogram of one instrumented function.
+    Histogram bucket i counts calls that took less than 2**i microseconds (and at least 2**(i-1)).
+    """
+    __slots__ = ("calls", "seconds", "rows_read", "rows_written", "histogram")
+
+    def __init__(self):
+        """
+        Initializes empty statistics.
+        """
+        self.calls = 0
+        self.seconds = 0.0
+        self.rows_read = 0
+        self.rows_written = 0
+        self.histogram = [0] * BUCKETS
+
+    def add(self, seconds: float, rows_read: int = 0, rows_written: int = 0):
+        """
+        Records one call.
+        :param seconds: Duration of the call.
+        :param rows_read: Rows or items returned by the call.
+        :param rows_written: Database rows inserted, updated or deleted by the call.
+        """
+        with lock:
+            self.calls += 1
+            self.seconds += seconds
+            self.rows_read += rows_read
+            self.rows_written += rows_written
+            self.histogram[min(BUCKETS - 1, int(seconds * 1e6).bit_length())] += 1
+
+    def merge(self, data: dict):
+        """
+        Adds statistics stored by to_dict.
+        :param data: Statistics of earlier runs.
+        """
+        self.calls += data["calls"]
+        self.seconds += data["seconds"]
+        self.rows_read += data["rows_read"]
+        self.rows_written += data["rows_written"]
+        self.histogram = [a + b for a, b in zip(self.histogram, data["histogram"])]
+
+    def percentile(self, share: float) -> float:
+        """
+        Returns the upper bound, in seconds, of the histogram bucket containing a percentile.
+        :param share: Percentile as a share (e.g., 0.99).
+        """
+        seen = 0
+        for bucket, count in enumerate(self.histogram):
+            seen += count
+            if count and seen >= share * self.calls:
+                return 2 ** bucket / 1e6
+        return 0.0
+
+    def to_dict(self) -> dict:
+        """
+        Returns the statistics as a JSON-serializable dict.
+        """
+        return {"calls": self.calls, "seconds": self.seconds, "rows_read": self.rows_read,
+                "rows_written": self.rows_written, "histogram": self.histogram}
+
+
+def rows_of(result) -> int:
+    """
+    Returns the number of rows or items in a call result.
+    :param result: Value returned by an instrumented function.
+    """
+    return len(result) if isinstance(result, (list, dict)) else 0
+
+def total_changes(args: tuple) -> int:
+    """
+    Returns the total number of rows changed on the calling thread's connection of a Database method's instance.
+    :param args: Positional arguments of the call, starting with the Database instance.
+    """
+    conn = getattr(getattr(args[0], "local", None), "conn", None) if args else None
+    return conn.total_changes if conn else 0
+
+def instrument(name: str, function, writes: bool = False):
+    """
+    Returns a wrapper recording every call of a function. Generators are timed while they produce
+    items only, and their items are counted as rows read.
+    :param name: Name the calls are recorded under (e.g., "Database.load_stats").
+    :param function: Function to wrap.
+    :param writes: Count rows changed on the Database connection as rows written.
+    """
+    stats = registry.setdefault(name, CallStats())
+    if inspect.isgeneratorfunction(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            generator = function(*args, **kwargs)
+            elapsed, rows = 0.0, 0
+            try:
+                while True:
+                    start = time.perf_counter()
+                    try:
+                        item = next(generator)
+                    except StopIteration:
+                        return
+                    finally:
+                        elapsed += time.perf_counter() - start
+                    rows += 1
+                    yield item
+            finally:
+                generator.close()
+                stats.add(elapsed, rows)
+        return wrapper
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        changes = total_changes(args) if writes else 0
+        start = time.perf_counter()
+        result = None
+        try:
+            result = function(*args, **kwargs)
+            return result
+        finally:
+            elapsed = time.perf_counter() - start
+            written = max(0, total_changes(args) - changes) if writes else 0
+            stats.add(elapsed, rows_of(result), written)
+    return wrapper
+
+def enable():
+    """
+    Wraps every Database method and analytics function with call recording. Safe to call more than once.
+    """
+    if originals:
+        return
+    from . import analytics
+    from .database import Database
+    for name, function in vars(Database).items():
+        if inspect.isfunction(function) and not name.startswith("_"):
+            originals.append((Database, name, function))
+            setattr(Database, name, instrument(f"Database.{name}", function, writes=True))
+    for name, function in vars(analytics).items():
+        if inspect.isfunction(function) and function.__module__ == analytics.__name__:
+            originals.append((analytics, name, function))
+            setattr(analytics, name, instrument(f"analytics.{name}", function))
+
+def disable():
+    """
+    Restores the original functions. Functions imported by name while instrumentation was on stay wrapped.
+    """
+    while originals:
+        owner, name, function = originals.pop()
+        setattr(owner, name, function)
+
+def reset():
+    """
+    Clears the recorded statistics.
+    """
+    with lock:
+        for stats in registry.values():
+            stats.__init__()
+
+def load(path: str = PROFILE_PATH) -> dict:
+    """
+    Loads statistics saved by earlier runs.
+    :param path: Path to the JSON statistics file.
+    :return: Dict of statistics by function name.
+    """
+    loaded = {}
+    if os.path.exists(path):
+        with open(path) as file:
+            for name, data in json.load(file).items():
+                loaded.setdefault(name, CallStats()).merge(data)
+    return loaded
+
+def save(path: str = PROFILE_PATH):
+    """
+    Adds the statistics of this run to those saved by earlier runs.
+    :param path: Path to the JSON statistics file.
+    """
+    merged = load(path)
+    for name, stats in registry.items():
+        if stats.calls:
+            merged.setdefault(name, CallStats()).merge(stats.to_dict())
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as file:
+        json.dump({name: stats.to_dict() for name, stats in sorted(merged.items())}, file, indent=1)
+
+def report(stats: dict = None) -> list[list]:
+    """
+    Returns one row per called function (see HEADERS), slowest total time first.
+    :param stats: Dict of statistics by function name (default: this run).
+    """
+    stats = registry if stats is None else stats
+    return [[name, s.calls, s.seconds * 1000, s.seconds * 1000 / s.calls, s.percentile(0.5) * 1000,
+             s.percentile(0.99) * 1000, s.rows_read, s.rows_written]
+            for name, s in sorted(stats.items(), key=lambda item: -item[1].seconds) if s.calls]
+
+@contextmanager
+def snapshots(prefix: str):
+    """
+    Profiles the with-block with cProfile and tracemalloc and dumps prefix.prof (readable with pstats)
+    and prefix.tracemalloc (readable with tracemalloc.Snapshot.load).
+    :param prefix: Path prefix of the dump files.
+    """
+    import cProfile
+    import tracemalloc
+    profiler = cProfile.Profile()
+    tracemalloc.start()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(f"{prefix}.prof")
+        tracemalloc.take_snapshot().dump(f"{prefix}.tracemalloc")
+        tracemalloc.stop()
@@ -0,0 +1,111 @@
+import os
+import threading
+import zlib
+from .database import Database
+from .parallel import Summary, summarize
+
+"""
+Router module including the storage router that shards users (tenants) across SQLite files by hash, so writers
+of users on different shards never wait for the same file lock.
+"""
+
+
+class StorageRouter:
+    """
+    Maps every user to one of a fixed number of SQLite shard files and opens user-scoped databases on them.
+    """
+    def __init__(self, directory: str = "data/shards", shards: int = 8, **options):
+        """
+        Initializes the router. The number of shards must not change once users have been stored.
+        :param directory: Directory containing the shard files.
+        :param shards: Number of shard files.
+        :param options: Connection settings passed to every Database (e.g., synchronous="FULL").
+        """
+        self.directory = directory
+        self.shards = shards
+        self.options = options
+        self.databases = {}
+        self.lock = threading.Lock()
+
+    def __enter__(self) -> "StorageRouter":
+        """
+        Returns the router for use in a with-statement.
+        """
+        return self
+
+    def __exit__(self, *exc_info):
+        """
+        Closes all databases when leaving a with-statement.
+        """
+        self.close()
+
+    def shard_of(self, user: str) -> int:
+        """
+        Returns the shard of a user from a stable hash of the user name.
+        :param user: User name.
+        """
+        return zlib.crc32(user.encode()) % self.shards
+
+    def shard_path(self, shard: int) -> str:
+        """
+        Returns the path of a shard file.
+        :param shard: Shard number.
+        """
+        return os.path.join(self.directory, f"habits-{shard:03d}.db")
+
+    def database(self, user: str) -> Database:
+        """
+        Returns the database of a user, scoped to the user's habits on the user's shard.
+        :param user: User name.
+        """
+        with self.lock:
+            if user not in self.databases:
+                self.databases[user] = Database(self.shard_path(self.shard_of(user)), user=user, **self.options)
+            return self.databases[user]
+
+    def shard_databases(self) -> list[Database]:
+        """
+        Returns a database reading the habits of all users for every existing shard file.
+        """
+        paths = [self.shard_path(shard) for shard in range(self.shards)]
+        return [Database(path, user=None, **self.options) for path in paths if os.path.exists(path)]
+
+    def users(self) -> list[str]:
+        """
+        Returns the names of all users with at least one habit, across all shards.
+        """
+        users = set()
+        for db in self.shard_databases():
+            with db:
+                users.update(row[0] for row in db.connect().execute('SELECT DISTINCT user FROM habits'))
+        return sorted(users)
+
+    def summarize(self, periodicity: str = None, category: str = None) -> Summary:
+        """
+        Aggregates the metrics of the habits of all users, reading every shard in its own thread.
+        :param periodicity: Periodicity to filter by ('daily' or 'weekly').
+        :param category: Category to filter by (e.g. 'health').
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        summary = Summary()
+        databases = self.shard_databases()
+        if not databases:
+            return summary
+
+        def summarize_shard(db: Database) -> Summary:
+            with db:
+                return summarize(db.iter_stats(periodicity=periodicity, category=category))
+
+        with ThreadPoolExecutor(max_workers=len(databases)) as pool:
+            for shard_summary in pool.map(summarize_shard, databases):
+                summary.merge(shard_summary)
+        return summary
+
+    def close(self):
+        """
+        Closes the databases of all users opened by this router.
+        """
+        with self.lock:
+            for db in self.databases.values():
+                db.close()
+            self.databases.clear()
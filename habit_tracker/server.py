@@ -0,0 +1,221 @@
+import asyncio
+import json
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from .buffer import WriteBuffer
+from .client import encode_habit
+from .database import Database
+from .habit import Habit, to_epoch_day, to_period
+from .stats import HabitStats
+
+"""
+Server module including the asyncio daemon that keeps habits and statistics in memory and serves
+them over a Unix-domain socket, writing completions through a group-commit write buffer.
+"""
+
+
+class HabitServer:
+    """
+    Serves create, complete, delete, list and analysis requests from memory.
+    """
+    def __init__(self, db: Database, path: str, flush_interval: float = 0.05, batch_size: int = 1000):
+        """
+        Initializes the server and loads all habits, completions and statistics into memory.
+        :param db: Database to serve.
+        :param path: Path of the Unix-domain socket to listen on.
+        :param flush_interval: Seconds a recorded completion may wait before it is written.
+        :param batch_size: Number of pending completions that triggers an early write.
+        """
+        self.db = db
+        self.path = path
+        self.habits = {habit.id: habit for habit in db.iter_habits()}
+        self.stats = {stats.id: stats for stats in db.load_stats()}
+        self.names = {habit.name: habit.id for habit in self.habits.values()}
+        self.buffer = WriteBuffer(db, batch_size, flush_interval)
+        self.writer = ThreadPoolExecutor(max_workers=1)
+
+    async def serve(self):
+        """
+        Listens on the socket until cancelled, then writes pending completions and removes the socket.
+        """
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        server = await asyncio.start_unix_server(self.handle, self.path)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.buffer.close()
+            self.writer.shutdown()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Answers the requests of one client connection, one JSON object per line.
+        :param reader: Stream of the client requests.
+        :param writer: Stream for the responses.
+        """
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                    handler = getattr(self, f"op_{request.pop('op', '')}", None)
+                    if handler is None:
+                        raise ValueError("Unknown operation.")
+                    response = {"ok": True, "result": await handler(**request)}
+                except (ValueError, KeyError, TypeError, OSError, sqlite3.Error) as e:
+                    response = {"ok": False, "error": str(e)}
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def write(self, function, *args):
+        """
+        Runs a database write on the dedicated writer thread, preserving the order of writes.
+        :param function: Database method to call.
+        :param args: Arguments of the method.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self.writer, function, *args)
+
+    async def flush(self):
+        """
+        Waits until all completions recorded so far are committed.
+        """
+        await self.write(self.buffer.flush)
+
+    def matching(self, periodicity: str = None, category: str = None, min_id: int = None, limit: int = None,
+                 offset: int = None) -> list[Habit]:
+        """
+        Returns the in-memory habits matching the filters, ordered by ID.
+        :param periodicity: Periodicity to filter by (optional).
+        :param category: Category to filter by (optional).
+        :param min_id: Lowest habit ID to return (optional).
+        :param limit: Maximum number of habits (optional).
+        :param offset: Number of matching habits to skip (optional).
+        """
+        habits = [habit for id, habit in sorted(self.habits.items())
+                  if (periodicity is None or habit.periodicity == periodicity)
+                  and (category is None or habit.category == category) and (min_id is None or id >= min_id)]
+        habits = habits[offset or 0:]
+        return habits[:limit] if limit is not None else habits
+
+    def habit(self, id: int) -> Habit:
+        """
+        Returns an in-memory habit by ID.
+        :param id: Habit ID.
+        """
+        if id not in self.habits:
+            raise ValueError(f"No habit with ID {id} found.")
+        return self.habits[id]
+
+    async def op_create(self, name: str, periodicity: str, category: str, creation_date: str = None) -> int:
+        """
+        Creates a habit, writing it to SQLite before answering so its ID is known.
+        """
+        if name in self.names:
+            raise ValueError(f"Habit with name '{name}' already exists.")
+        habit = Habit(name, periodicity, category)
+        habit.creation_date = creation_date or habit.creation_date
+        await self.write(self.db.save_habit, habit)
+        if habit.id is None:
+            raise ValueError(f"Habit '{name}' could not be saved.")
+        self.habits[habit.id] = habit
+        self.stats[habit.id] = HabitStats.from_habit(habit)
+        self.names[name] = habit.id
+        return habit.id
+
+    async def op_complete(self, id: int, completion_date: str = None, durable: bool = False, key: str = None) -> dict:
+        """
+        Records a completion in memory and queues it for the next batched write. With durable set,
+        the batch is written right away and the answer is only sent once the completion is committed. Completions with an idempotency key are
+        written before answering; a repeated key applies the completion recorded first, which is already in memory
+        unless another process recorded it.
+        """
+        habit = self.habit(id)
+        completion_date = completion_date or datetime.now().isoformat()
+        if key is not None:
+            await self.flush()
+            completion_date = await self.write(self.db.record_completion, id, completion_date, key)
+        day = to_epoch_day(completion_date)
+        habit.add_day(day)
+        if not self.stats[id].add_period(to_period(day, habit.periodicity)):
+            self.stats[id] = HabitStats.from_habit(habit)
+        if key is None:
+            future = self.buffer.submit(id, completion_date)
+            if durable:
+                await self.flush()
+                await asyncio.wrap_future(future)
+        return {"name": habit.name, "completion_date": completion_date}
+
+    async def op_delete(self, id: int):
+        """
+        Deletes a habit after flushing its pending completions.
+        """
+        habit = self.habit(id)
+        await self.flush()
+        await self.write(self.db.delete_habit, id)
+        del self.habits[id], self.stats[id], self.names[habit.name]
+
+    async def op_flush(self) -> dict:
+        """
+        Writes all pending completions before answering with the write buffer statistics.
+        """
+        await self.flush()
+        return self.buffer.stats()
+
+    async def op_get(self, id: int, with_completions: bool = True) -> dict:
+        """
+        Returns one habit, or None if it does not exist.
+        """
+        habit = self.habits.get(id)
+        return encode_habit(habit, with_completions) if habit else None
+
+    async def op_find(self, periodicity: str = None, category: str = None, since: str = None, until: str = None,
+                      limit: int = None, offset: int = None, with_completions: bool = True,
+                      min_id: int = None) -> list[dict]:
+        """
+        Returns the habits matching the filters, with completions optionally restricted to a date range.
+        """
+        habits = self.matching(periodicity, category, min_id, limit, offset)
+        encoded = [encode_habit(habit, with_completions) for habit in habits]
+        if since is not None or until is not None:
+            low = to_epoch_day(since) if since else float("-inf")
+            high = to_epoch_day(until) if until else float("inf")
+            for data in encoded:
+                data["completion_days"] = [day for day in data["completion_days"] if low <= day <= high]
+        return encoded
+
+    async def op_stats(self, id: int = None, periodicity: str = None, category: str = None, min_id: int = None,
+                       limit: int = None, offset: int = None) -> list[list]:
+        """
+        Returns the statistics rows of the matching habits.
+        """
+        matching = self.matching(periodicity, category, id if id is not None else min_id, limit, offset)
+        return [[stats.id, stats.name, stats.periodicity, stats.category, stats.creation_date, *stats.metrics()]
+                for stats in (self.stats[habit.id] for habit in matching) if id is None or stats.id == id]
+
+    async def op_widths(self, periodicity: str = None, category: str = None) -> dict:
+        """
+        Returns the widest text of each output column over the matching habits.
+        """
+        habits = self.matching(periodicity, category)
+        stats = [self.stats[habit.id] for habit in habits]
+        return {"id": max((len(str(habit.id)) for habit in habits), default=0),
+                "name": max((len(habit.name) for habit in habits), default=0),
+                "periodicity": max((len(habit.periodicity) for habit in habits), default=0),
+                "category": max((len(str(habit.category)) for habit in habits), default=0),
+                "longest_streak": max((len(str(s.longest_streak)) for s in stats), default=0),
+                "missed_periods": max((len(str(s.missed_periods)) for s in stats), default=0)}
+
+    async def op_report(self, grain: str, start: list, end: list = None, periodicity: str = None,
+                        category: str = None) -> dict:
+        """
+        Sums completions per habit over a range of periods from the rollups in the database (see
+        Database.period_report), after writing the pending completions, so the daemon and direct access agree.
+        """
+        await self.flush()
+        return await self.write(self.db.period_report, grain, tuple(start), tuple(end or start), periodicity, category)
@@ -0,0 +1,180 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Iterator
+from .database import Database
+from .habit import Habit
+from .stats import HabitStats
+
+"""
+Snapshot module including a binary file format holding all habits of a database for fast cold starts.
+
+Layout (little-endian):
+- header: magic, format version, habit count, database change counter, completion count and the offsets of the
+  sections below (HEADER)
+- completions: int32 epoch days of all habits, each habit's days sorted and stored one habit after the other
+- offsets: uint64 index of the first completion of each habit, plus the completion count
+- habits: one fixed-size record per habit (HABIT) with its ID, version, compacted history summary and the
+  position of its name, periodicity, category and creation date in the strings section
+- strings: UTF-8 text of the habit records
+
+Reading maps the file and hands out habits whose completion days are slices of the mapped completions, so
+analytics run on the file without copying or parsing it.
+"""
+
+MAGIC = b"HABITSNP"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sIIqQQQQQ")
+HABIT = struct.Struct("<qq8I6iB7x")
+HAS_SUMMARY, NO_LAST_PERIOD = 1, 2
+
+
+def snapshot_path(db: Database) -> str:
+    """
+    Return the default snapshot file of a database, next to the database file and named after its user.
+    :param db: Database the snapshot is written from.
+    """
+    return os.path.splitext(db.db_path)[0] + (f".{db.user}" if db.user else "") + ".snapshot"
+
+def write_snapshot(db: Database, path: str) -> int:
+    """
+    Write all habits of a database to a snapshot file, replacing an existing file atomically.
+    The change counter is read before the habits, so changes made while writing make the snapshot stale.
+    :param db: Database to read.
+    :param path: Snapshot file to write.
+    :return: Number of habits written.
+    """
+    changes = db.change_counter()
+    offsets = array("Q", [0])
+    records = bytearray()
+    strings = bytearray()
+    temporary = f"{path}.tmp"
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(temporary, "wb") as file:
+        file.write(bytes(HEADER.size))
+        for habit in db.iter_habits():
+            days = array("i", habit.completion_days)
+            if sys.byteorder != "little":
+                days.byteswap()
+            file.write(days.tobytes())
+            offsets.append(offsets[-1] + len(days))
+            positions = []
+            for text in habit.fields():
+                encoded = (text or "").encode()
+                positions += [len(strings), len(encoded)]
+                strings += encoded
+            summary = habit.summary
+            flags = (HAS_SUMMARY if summary else 0) | (NO_LAST_PERIOD if not summary or summary.last_period is None else 0)
+            metrics = [summary.horizon, *(metric or 0 for metric in summary.metrics())] if summary else [0] * 6
+            records += HABIT.pack(habit.id, habit.version or 0, *positions, *metrics, flags)
+        padding = -file.tell() % 8
+        file.write(bytes(padding))
+        offsets_offset = file.tell()
+        if sys.byteorder != "little":
+            offsets.byteswap()
+        file.write(offsets.tobytes())
+        habits_offset = file.tell()
+        file.write(records)
+        strings_offset = file.tell()
+        file.write(strings)
+        file.seek(0)
+        count = len(records) // HABIT.size
+        file.write(HEADER.pack(MAGIC, FORMAT_VERSION, count, changes, HEADER.size, offsets_offset - HEADER.size - padding,
+                               offsets_offset, habits_offset, strings_offset))
+    os.replace(temporary, path)
+    return count
+
+
+class Snapshot:
+    """
+    Represents a memory-mapped snapshot file. Habits read from it share the mapped completion days and are
+    read-only: completing them or saving them back is not supported.
+    """
+    def __init__(self, path: str):
+        """
+        Maps a snapshot file and validates its header.
+        :param path: Snapshot file written by write_snapshot.
+        """
+        self.path = path
+        with open(path, "rb") as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            (magic, version, self.habit_count, self.changes, days_offset, days_size, offsets_offset, habits_offset,
+             strings_offset) = HEADER.unpack_from(self.map)
+        except struct.error:
+            raise ValueError(f"'{path}' is not a habit snapshot.")
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"'{path}' is not a habit snapshot of format version {FORMAT_VERSION}.")
+        buffer = memoryview(self.map)
+        self.days = buffer[days_offset:days_offset + days_size].cast("i")
+        self.offsets = buffer[offsets_offset:habits_offset].cast("Q")
+        if sys.byteorder != "little":
+            self.days, self.offsets = array("i", self.days), array("Q", self.offsets)
+            self.days.byteswap()
+            self.offsets.byteswap()
+        self.records = buffer[habits_offset:strings_offset]
+        self.strings = buffer[strings_offset:]
+
+    def __enter__(self) -> "Snapshot":
+        """
+        Returns the snapshot for use in a with-statement.
+        """
+        return self
+
+    def __exit__(self, *exc_info):
+        """
+        Unmaps the file when leaving a with-statement.
+        """
+        self.close()
+
+    def __len__(self) -> int:
+        """
+        Returns the number of habits in the snapshot.
+        """
+        return self.habit_count
+
+    def __iter__(self) -> Iterator[Habit]:
+        """
+        Yields the habits of the snapshot in ID order.
+        """
+        return (self.habit(index) for index in range(self.habit_count))
+
+    def is_current(self, db: Database) -> bool:
+        """
+        Returns whether the database has not changed since the snapshot was written.
+        :param db: Database the snapshot was written from.
+        """
+        return self.changes == db.change_counter()
+
+    def habit(self, index: int) -> Habit:
+        """
+        Returns the habit at a position of the snapshot, with its completion days as a slice of the mapped file.
+        :param index: Position of the habit (0 to len - 1).
+        """
+        id, version, *positions, horizon, current, longest, last, count, missed, flags = \
+            HABIT.unpack_from(self.records, index * HABIT.size)
+        name, periodicity, category, creation_date = (
+            str(self.strings[start:start + length], "utf-8") for start, length in zip(positions[::2], positions[1::2]))
+        habit = Habit(name, periodicity, category)
+        habit.id, habit.version, habit.creation_date = id, version, creation_date
+        habit.completion_days = self.days[self.offsets[index]:self.offsets[index + 1]]
+        if flags & HAS_SUMMARY:
+            habit.summary = HabitStats(id, name, periodicity, category, creation_date)
+            habit.summary.horizon = horizon
+            habit.summary.set_metrics((current, longest, None if flags & NO_LAST_PERIOD else last, count, missed))
+        habit.mark_clean()
+        return habit
+
+    def close(self):
+        """
+        Unmaps the file once no habit read from it is referenced anymore (otherwise when the last one is released).
+        """
+        for view in (self.days, self.offsets, self.records, self.strings):
+            if isinstance(view, memoryview):
+                view.release()
+        try:
+            self.map.close()
+        except BufferError:
+            pass
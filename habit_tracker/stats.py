@@ -0,0 +1,95 @@
+from .habit import Habit, to_period
+
+"""
+Statistics module including the precomputed streak and completion summary of a habit.
+"""
+
+
+class HabitStats:
+    """
+    Represents the streak and completion statistics of a habit, maintained one completed period at a time.
+    """
+    def __init__(self, id: int, name: str, periodicity: str, category: str, creation_date: str):
+        """
+        Initializes empty statistics for a habit.
+        :param id: Habit ID.
+        :param name: Name of the habit (e.g., "Exercise").
+        :param periodicity: Frequency of the habit ("daily" or "weekly").
+        :param category: Category of the habit (e.g., "health").
+        :param creation_date: ISO timestamp the habit was created at.
+        """
+        self.id = id
+        self.name = name
+        self.periodicity = periodicity
+        self.category = category
+        self.creation_date = creation_date
+        self.current_streak = 0
+        self.longest_streak = 0
+        self.last_period = None
+        self.completed_periods = 0
+        self.missed_periods = 0
+        self.version = None
+        self.horizon = None
+        self.through = None
+
+    @classmethod
+    def from_habit(cls, habit: Habit) -> "HabitStats":
+        """
+        Computes statistics from the full completion history of a habit.
+        :param habit: Habit to compute statistics for, resuming from the summary of its compacted history.
+        """
+        stats = cls(habit.id, habit.name, habit.periodicity, habit.category, habit.creation_date)
+        if habit.summary is not None:
+            stats.set_metrics(habit.summary.metrics())
+        stats.add_days(habit.completion_days)
+        return stats
+
+    @classmethod
+    def from_row(cls, row: tuple) -> "HabitStats":
+        """
+        Restores statistics from a row of habit attributes followed by the stored metrics.
+        :param row: (id, name, periodicity, category, creation_date, *metrics) as returned by the database.
+        """
+        stats = cls(*row[:5])
+        stats.set_metrics(row[5:])
+        return stats
+
+    def metrics(self) -> tuple:
+        """
+        Returns the stored metrics (current streak, longest streak, last period, completed periods, missed periods).
+        """
+        return self.current_streak, self.longest_streak, self.last_period, self.completed_periods, self.missed_periods
+
+    def set_metrics(self, metrics: tuple):
+        """
+        Replaces the stored metrics.
+        :param metrics: (current streak, longest streak, last period, completed periods, missed periods).
+        """
+        self.current_streak, self.longest_streak, self.last_period, self.completed_periods, self.missed_periods = metrics
+
+    def add_period(self, period: int) -> bool:
+        """
+        Folds a completed period into the statistics in O(1).
+        :param period: Completed period (see to_period).
+        :return: False if the period precedes the last completed period, so the statistics must be rebuilt.
+        """
+        if self.last_period is not None and period <= self.last_period:
+            return period == self.last_period
+        if self.last_period is not None and period == self.last_period + 1:
+            self.current_streak += 1
+        else:
+            if self.last_period is not None:
+                self.missed_periods += 1
+            self.current_streak = 1
+        self.longest_streak = max(self.longest_streak, self.current_streak)
+        self.last_period = period
+        self.completed_periods += 1
+        return True
+
+    def add_days(self, epoch_days) -> bool:
+        """
+        Folds completed epoch days into the statistics.
+        :param epoch_days: Completion days since 1970-01-01, in ascending order.
+        :return: False if any day falls before the last completed period, so the statistics must be rebuilt.
+        """
+        return all(self.add_period(to_period(day, self.periodicity)) for day in epoch_days)
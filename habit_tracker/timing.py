@@ -0,0 +1,48 @@
+import time
+from contextlib import contextmanager, nullcontext
+
+"""
+Timing module including a lightweight phase timer for breaking down command latency.
+"""
+
+STARTED = time.perf_counter()
+
+
+class Timer:
+    """
+    Accumulates wall time per named phase (e.g., import, connect, query, render).
+    """
+    def __init__(self):
+        """
+        Initializes the timer, counting the time since this module was imported as startup.
+        """
+        self.phases = {"startup": time.perf_counter() - STARTED}
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Measures the wall time spent inside the with-block and adds it to a phase.
+        :param name: Phase name.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def report(self) -> str:
+        """
+        Returns one line per phase with its duration in milliseconds, followed by the total.
+        """
+        lines = [f"{name:>8}: {seconds * 1000:8.2f} ms" for name, seconds in self.phases.items()]
+        lines.append(f"{'total':>8}: {sum(self.phases.values()) * 1000:8.2f} ms")
+        return "\n".join(lines)
+
+
+def phase(timer: Timer, name: str):
+    """
+    Returns a context manager timing a phase, or a no-op one when timing is disabled.
+    :param timer: Timer of the current command, or None when timing is disabled.
+    :param name: Phase name.
+    """
+    return timer.phase(name) if timer else nullcontext()
@@ -0,0 +1,52 @@
+import csv
+import json
+from typing import IO, Iterable, Iterator
+
+"""
+Transfer module including streaming readers and writers for bulk completion import and export (CSV/JSONL).
+"""
+
+FIELDS = ["habit_id", "name", "periodicity", "category", "creation_date", "completion_date"]
+FORMATS = ("csv", "jsonl")
+
+
+def detect_format(filename: str) -> str:
+    """
+    Guess the record format from a file name, defaulting to CSV.
+    :param filename: Name of the file to read or write.
+    """
+    return "jsonl" if filename.endswith((".jsonl", ".json")) else "csv"
+
+def read_records(stream: IO[str], fmt: str) -> Iterator[dict]:
+    """
+    Stream completion records from a CSV file with a header row or from a JSON Lines file.
+    :param stream: Text stream to read from.
+    :param fmt: Record format ("csv" or "jsonl").
+    """
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+    else:
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+
+def write_records(rows: Iterable[tuple], stream: IO[str], fmt: str) -> int:
+    """
+    Stream completion rows (in FIELDS order) to a CSV or JSON Lines file.
+    :param rows: Completion rows as returned by Database.iter_completions.
+    :param stream: Text stream to write to.
+    :param fmt: Record format ("csv" or "jsonl").
+    :return: Number of rows written.
+    """
+    count = 0
+    if fmt == "csv":
+        writer = csv.writer(stream)
+        writer.writerow(FIELDS)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    else:
+        for row in rows:
+            stream.write(json.dumps(dict(zip(FIELDS, row))) + "\n")
+            count += 1
+    return count
@@ -0,0 +1,89 @@
+from datetime import date
+from typing import Iterable, Iterator, List
+from .analytics import live_streak, period_rate
+from .habit import Habit, EPOCH_ORDINAL, from_epoch_day, to_epoch_day, to_period
+from .stats import HabitStats
+
+"""
+Trends module including time series of habit metrics over a date range, computed in one sweep over the sorted
+completions of each habit instead of one full recomputation per reported day.
+"""
+
+STEPS = {"daily": 1, "weekly": 7}
+HABIT_FIELDS = ["date", "current_streak", "longest_streak", "completion_rate"]
+COHORT_FIELDS = ["date", "habits", "active_streaks", "average_current_streak", "longest_streak",
+                 "average_completion_rate"]
+
+
+def sample_days(start: date, end: date, step: str = "daily") -> range:
+    """
+    Return the epoch days a series is reported on: every day, or every seventh day, from start to end.
+    :param start: First reported date.
+    :param end: Last date of the range (inclusive).
+    :param step: Sampling step ('daily' or 'weekly').
+    """
+    if step not in STEPS:
+        raise ValueError(f"Unknown trend step '{step}'.")
+    if end < start:
+        raise ValueError("The end of the trend range precedes its start.")
+    return range(start.toordinal() - EPOCH_ORDINAL, end.toordinal() - EPOCH_ORDINAL + 1, STEPS[step])
+
+def sweep(habit: Habit, days: range) -> Iterator[HabitStats]:
+    """
+    Yield the statistics of a habit as of each sample day, folding each completion exactly once (O(days +
+    completions)). The same statistics object is updated and yielded for every day.
+    :param habit: Habit with its completion days (and the summary of its compacted history, if any).
+    :param days: Ascending epoch days to sample on.
+    """
+    stats = HabitStats(habit.id, habit.name, habit.periodicity, habit.category, habit.creation_date)
+    if habit.summary is not None:
+        if days and days[0] < habit.summary.horizon - 1:
+            raise ValueError(f"The history of {habit.name} before {from_epoch_day(habit.summary.horizon)} has been compacted.")
+        stats.set_metrics(habit.summary.metrics())
+    completions, index = habit.completion_days, 0
+    for day in days:
+        while index < len(completions) and completions[index] <= day:
+            stats.add_period(to_period(completions[index], habit.periodicity))
+            index += 1
+        stats.through = day
+        yield stats
+
+def habit_trend(habit: Habit, start: date, end: date, step: str = "daily") -> List[list]:
+    """
+    Compute the current streak, longest streak and completion rate of a habit as of every sample day of a range.
+    :param habit: Habit with its completion days.
+    :param start: First reported date.
+    :param end: Last date of the range (inclusive).
+    :param step: Sampling step ('daily' or 'weekly').
+    :return: One row per sample day with the fields of HABIT_FIELDS.
+    """
+    days = sample_days(start, end, step)
+    return [[from_epoch_day(day), live_streak(stats, day), stats.longest_streak, round(period_rate(stats, day), 4)]
+            for day, stats in zip(days, sweep(habit, days))]
+
+def cohort_trend(habits: Iterable[Habit], start: date, end: date, step: str = "daily") -> List[list]:
+    """
+    Compute aggregate metrics of a group of habits as of every sample day of a range, sweeping one habit at a
+    time so habits can be streamed from the database. Habits only count from the day they were created.
+    :param habits: Habits with their completion days.
+    :param start: First reported date.
+    :param end: Last date of the range (inclusive).
+    :param step: Sampling step ('daily' or 'weekly').
+    :return: One row per sample day with the fields of COHORT_FIELDS.
+    """
+    days = sample_days(start, end, step)
+    counts, active, streaks, longest, rates = ([0] * len(days) for _ in range(5))
+    for habit in habits:
+        created = to_epoch_day(habit.creation_date)
+        for position, (day, stats) in enumerate(zip(days, sweep(habit, days))):
+            if day < created:
+                continue
+            streak = live_streak(stats, day)
+            counts[position] += 1
+            active[position] += streak > 0
+            streaks[position] += streak
+            longest[position] = max(longest[position], stats.longest_streak)
+            rates[position] += period_rate(stats, day)
+    return [[from_epoch_day(day), count, active[position], round(streaks[position] / count, 4) if count else 0.0,
+             longest[position], round(rates[position] / count, 4) if count else 0.0]
+            for position, (day, count) in enumerate(zip(days, counts))]
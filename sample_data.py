@@ -24,12 +24,12 @@ def load_sample_data():
             habit.creation_date = (today - timedelta(days=27)).isoformat()
             for i in range(28):
                 completion_date = today - timedelta(days=i)
-                habit.completion_dates.append(completion_date.isoformat())
+                habit.add_completion(completion_date.isoformat())
         else:
             habit.creation_date = (today - timedelta(weeks=3)).isoformat()
             for i in range(4):
                 completion_date = today - timedelta(weeks=i)
-                habit.completion_dates.append(completion_date.isoformat())
+                habit.add_completion(completion_date.isoformat())
 
     db = Database()
     for habit in habits:
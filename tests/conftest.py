@@ -0,0 +1,15 @@
+import pytest
+from habit_tracker.database import Database
+
+"""
+Shared fixtures for the test suite.
+"""
+
+@pytest.fixture
+def db(tmp_path) -> Database:
+    """
+    Fixture for an empty database stored in a temporary directory, closed after the test.
+    :param tmp_path: Temporary directory provided by pytest.
+    """
+    with Database(str(tmp_path / "habits.db")) as db:
+        yield db
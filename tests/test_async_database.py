@@ -0,0 +1,53 @@
+import asyncio
+from datetime import datetime, timedelta
+from habit_tracker.async_database import AsyncDatabase
+from habit_tracker.habit import Habit
+from habit_tracker.parallel import summarize, summarize_async
+
+"""
+Testing module including a unit test suite for validating the asyncio database front end.
+"""
+
+def test_concurrent_operations(tmp_path):
+    """
+    Test that concurrent saves, completions, lookups and deletions through a small pending bound all complete, and
+    that a completion of a deleted habit fails without failing the completion committed alongside it.
+    :param tmp_path: Temporary directory provided by pytest.
+    """
+    async def scenario():
+        async with AsyncDatabase(str(tmp_path / "habits.db"), readers=2, max_pending=4) as db:
+            habits = [Habit(f"Habit {i}", "daily", "health") for i in range(20)]
+            await asyncio.gather(*(db.save_habit(habit) for habit in habits))
+            day = (datetime.now() - timedelta(days=1)).isoformat()
+            await asyncio.gather(*(db.record_completion(habit.id, day) for habit in habits))
+            loaded = await asyncio.gather(*(db.get_habit(habit.id) for habit in habits))
+            assert [len(habit.completion_days) for habit in loaded] == [1] * 20
+            await db.delete_habit(habits[0].id)
+            assert len(await db.load_habits()) == 19
+            results = await asyncio.gather(db.record_completion(habits[1].id, day), db.record_completion(habits[0].id, day),
+                                           return_exceptions=True)
+            assert results[0] == day and isinstance(results[1], ValueError)
+            assert [stats.longest_streak for stats in await db.load_stats(category="health")] == [1] * 19
+
+    asyncio.run(scenario())
+
+def test_stream_feeds_analytics(tmp_path):
+    """
+    Test that streamed habits arrive in order across batches, can be abandoned early and summarize like the sync path.
+    :param tmp_path: Temporary directory provided by pytest.
+    """
+    async def scenario():
+        async with AsyncDatabase(str(tmp_path / "habits.db"), stream_batch=3) as db:
+            for i in range(10):
+                habit = Habit(f"Habit {i}", "weekly" if i % 2 else "daily", "health")
+                habit.completion_dates = [(datetime.now() - timedelta(days=d)).isoformat() for d in range(i)]
+                await db.save_habit(habit)
+            assert [habit.name async for habit in db.iter_habits(periodicity="daily")] == [f"Habit {i}" for i in range(0, 10, 2)]
+            async for habit in db.iter_habits():
+                break
+            summary = await summarize_async(db.iter_habits())
+            expected = summarize(await db.load_habits())
+            assert (summary.habit_count, summary.longest_streak, summary.current_streaks) == \
+                   (expected.habit_count, expected.longest_streak, expected.current_streaks)
+
+    asyncio.run(scenario())
@@ -0,0 +1,69 @@
+import pytest
+import random
+import sys
+import habit_tracker
+from habit_tracker.habit import Habit
+from datetime import datetime, timedelta
+from habit_tracker import analytics
+from habit_tracker.analytics import *
+
+"""
+Testing module checking that every analytics backend produces identical results on a shared corpus.
+"""
+
+@pytest.fixture
+def corpus() -> list[Habit]:
+    """
+    Fixture for seeded random habits with gaps, duplicate completions and histories spanning several years.
+    """
+    rng = random.Random(42)
+    habits = []
+    for i in range(40):
+        habit = Habit(f"Habit {i}", rng.choice(["daily", "weekly"]), rng.choice(["health", "education"]))
+        days = rng.randint(0, 1200)
+        habit.creation_date = (datetime.now() - timedelta(days=days)).isoformat()
+        probability = rng.random()
+        dates = [
+            (datetime.now() - timedelta(days=day, hours=rng.randint(0, 12))).isoformat()
+            for day in range(days) for _ in range(rng.choice([1, 1, 1, 2])) if rng.random() < probability
+        ]
+        rng.shuffle(dates)
+        for date in dates:
+            habit.add_completion(date)
+        habits.append(habit)
+    return habits
+
+def run_all(habits: list[Habit]) -> tuple:
+    """
+    Compute every analytics result for a list of habits.
+    :param habits: List of habits.
+    """
+    per_habit = [
+        (calculate_longest_streak_habit(habit), calculate_current_streak(habit), get_completion_rate(habit),
+         habit_stats(habit).metrics())
+        for habit in habits
+    ]
+    return (per_habit, calculate_longest_streak_all(habits), get_most_struggled_habit(habits).name,
+            generate_weekly_report(habits), generate_monthly_report(habits))
+
+def test_numpy_backend_matches_python(corpus: list[Habit]):
+    """
+    Test that the NumPy backend produces the same results as the pure Python backend.
+    :param corpus: Fixture for a shared habit corpus.
+    """
+    pytest.importorskip("numpy")
+    expected = run_all(corpus)
+    try:
+        assert set_backend("numpy") == "numpy"
+        assert run_all(corpus) == expected
+    finally:
+        set_backend("python")
+
+def test_numpy_backend_falls_back_without_numpy(monkeypatch):
+    """
+    Test that selecting the NumPy backend falls back to pure Python when NumPy cannot be imported.
+    """
+    monkeypatch.setitem(sys.modules, "habit_tracker.numpy_analytics", None)
+    monkeypatch.delattr(habit_tracker, "numpy_analytics", raising=False)
+    assert set_backend("numpy") == "python"
+    assert analytics.numpy_backend is None
@@ -0,0 +1,33 @@
+import pytest
+from datetime import date
+from benchmarks.generator import PATTERNS, generate_habits, habits_for
+from benchmarks.run import compare
+from habit_tracker.habit import to_epoch_day
+
+"""
+Testing module including a unit test suite for validating the benchmark data generator and baseline comparison.
+"""
+
+@pytest.mark.parametrize("pattern", PATTERNS)
+def test_generator_matches_parameters(pattern: str):
+    """
+    Test that generated histories are reproducible, sorted, bounded by the history and close to the probability.
+    :param pattern: Gap pattern of the generated histories.
+    """
+    end = date(2025, 6, 30)
+    habits = list(generate_habits(20, 2, 0.6, pattern, weekly_share=0, end=end))
+    assert [h.completion_dates for h in habits] == [h.completion_dates for h in generate_habits(20, 2, 0.6, pattern, weekly_share=0, end=end)]
+    days = [day for habit in habits for day in habit.completion_days]
+    assert min(days) >= to_epoch_day(habits[0].creation_date) and max(days) <= to_epoch_day(end.isoformat())
+    assert all(list(h.completion_days) == sorted(set(h.completion_days)) for h in habits)
+    assert 0.45 < len(days) / (20 * 730) < 0.75
+    assert habits_for(len(days), 2, 0.6) in range(15, 26)
+
+def test_compare_reports_regressions_only():
+    """
+    Test that only timings slower than the baseline beyond tolerance and noise floor are reported.
+    """
+    baseline = {"sizes": {"1e3": {"timings": {"a": 0.010, "b": 0.010, "c": 0.00001}}}}
+    results = {"sizes": {"1e3": {"timings": {"a": 0.020, "b": 0.011, "c": 0.00005, "d": 1.0}}}}
+    regressions = compare(results, baseline, tolerance=0.25)
+    assert len(regressions) == 1 and regressions[0].startswith("1e3 a:")
@@ -0,0 +1,89 @@
+import threading
+import pytest
+from habit_tracker.buffer import WriteBuffer
+from habit_tracker.database import Database
+from habit_tracker.habit import Habit
+from habit_tracker.stats import HabitStats
+
+"""
+Testing module including a unit test suite for validating the group-commit write buffer.
+"""
+
+@pytest.fixture
+def db(db: Database) -> Database:
+    """
+    Fixture for a database with two saved habits.
+    :param db: Fixture for an empty database.
+    """
+    db.save_habit(Habit("Exercise", "daily", "health"))
+    db.save_habit(Habit("Yoga", "weekly", "health"))
+    return db
+
+def test_concurrent_producers_are_batched(db: Database):
+    """
+    Test that completions from many threads are acknowledged after commit and coalesced into few transactions.
+    :param db: Fixture for a database with saved habits.
+    """
+    buffer = WriteBuffer(db, max_events=100, max_delay=0.05)
+    dates = [f"2025-{month:02d}-{day:02d}" for month in range(1, 13) for day in range(1, 29)]
+
+    def produce(id: int):
+        futures = [buffer.submit(id, date) for date in dates]
+        assert [future.result() for future in futures] == dates
+
+    threads = [threading.Thread(target=produce, args=(id,)) for id in (1, 2, 1, 2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = buffer.stats()
+    assert stats["committed"] == 4 * len(dates) and stats["failed"] == 0
+    assert stats["flushes"] < 4 * len(dates) / 10
+    assert [len(habit.completion_days) for habit in db.load_habits()] == [len(dates)] * 2
+    for stats, habit in zip(db.load_stats(), db.load_habits()):
+        assert stats.metrics() == HabitStats.from_habit(habit).metrics()
+    buffer.close()
+
+def test_close_flushes_pending_events(db: Database):
+    """
+    Test that closing the buffer writes events that have not reached the batch size or delay yet.
+    :param db: Fixture for a database with saved habits.
+    """
+    with WriteBuffer(db, max_events=1000, max_delay=60) as buffer:
+        future = buffer.submit(1, "2025-03-03T08:00:00")
+        assert not future.done()
+    assert future.result() == "2025-03-03T08:00:00"
+    assert db.get_habit(1).completion_dates == ("2025-03-03",)
+    with pytest.raises(ValueError):
+        buffer.submit(1)
+
+def test_failed_write_is_reported(db: Database, monkeypatch):
+    """
+    Test that events of a failed transaction resolve with an error instead of an acknowledgement.
+    :param db: Fixture for a database with saved habits.
+    :param monkeypatch: Pytest fixture for patching attributes.
+    """
+    monkeypatch.setattr(db, "record_completion_batch", lambda completions: [])
+    with WriteBuffer(db) as buffer:
+        with pytest.raises(IOError):
+            buffer.record_completion(1)
+        buffer.flush()
+        assert buffer.stats()["failed"] == 1
+
+def test_mixed_batch_resolves_each_event(db: Database):
+    """
+    Test that an event naming a deleted or missing habit fails on its own while the other events of its batch
+    are committed and acknowledged.
+    :param db: Fixture for a database with saved habits.
+    """
+    db.delete_habit(2)
+    with WriteBuffer(db, max_events=1000, max_delay=60) as buffer:
+        futures = [buffer.submit(id, f"2025-03-0{day}") for day, id in enumerate((1, 2, 1, 99), start=1)]
+        buffer.flush()
+        assert buffer.stats()["flushes"] == 1
+        assert [future.result() for future in futures[::2]] == ["2025-03-01", "2025-03-03"]
+        for future in futures[1::2]:
+            with pytest.raises(ValueError):
+                future.result()
+        assert buffer.stats()["committed"] == 2 and buffer.stats()["failed"] == 2
+    assert db.get_habit(1).completion_dates == ("2025-03-01", "2025-03-03")
@@ -0,0 +1,74 @@
+import pytest
+from habit_tracker import analytics
+from habit_tracker.cache import AnalyticsCache
+from habit_tracker.database import Database
+from habit_tracker.habit import Habit
+
+"""
+Testing module including a unit test suite for validating memoized analytics and version-based invalidation.
+"""
+
+@pytest.fixture
+def db(db: Database) -> Database:
+    """
+    Fixture for a database with one saved daily habit.
+    :param db: Fixture for an empty database.
+    """
+    habit = Habit("Exercise", "daily", "health")
+    habit.completion_dates = ["2025-03-01", "2025-03-02"]
+    db.save_habit(habit)
+    return db
+
+@pytest.fixture
+def cache(db: Database):
+    """
+    Fixture for a disk-backed cache installed in the analytics module for one test.
+    :param db: Fixture for a database with a saved habit.
+    """
+    cache = AnalyticsCache(db)
+    analytics.set_cache(cache)
+    yield cache
+    analytics.set_cache(None)
+
+def test_writes_bump_versions(db: Database):
+    """
+    Test that saving, recording and importing completions increment the habit version.
+    :param db: Fixture for a database with a saved habit.
+    """
+    habit = db.get_habit(1)
+    assert habit.version == db.load_stats()[0].version == 1
+    habit.category = "fitness"
+    db.save_habit(habit)
+    assert habit.version == 2
+    db.record_completion(1, "2025-03-03")
+    db.import_completions([{"habit_id": 1, "completion_date": "2025-03-04"}])
+    assert db.get_habit(1).version == 4
+
+def test_results_are_reused_until_the_habit_changes(db: Database, cache: AnalyticsCache):
+    """
+    Test that unchanged habits are served from memory and disk, and that writes and unsaved edits bypass stale results.
+    :param db: Fixture for a database with a saved habit.
+    :param cache: Fixture for an installed disk-backed cache.
+    """
+    habit = db.get_habit(1)
+    assert analytics.calculate_longest_streak_habit(habit) == 2
+    assert analytics.calculate_longest_streak_habit(habit) == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+    habit.add_completion("2025-03-03")
+    assert analytics.calculate_longest_streak_habit(habit) == 3
+    cache.flush()
+    reloaded = AnalyticsCache(db)
+    assert reloaded.get(1, 1, "longest_streak", lambda: pytest.fail("not reused")) == 2
+    db.save_habit(habit)
+    assert AnalyticsCache(db).get(1, habit.version, "longest_streak", lambda: 3) == 3
+    db.delete_habit(1)
+    assert db.connect().execute("SELECT COUNT(*) FROM analytics_cache").fetchone()[0] == 0
+
+def test_lru_eviction():
+    """
+    Test that the least recently used results are evicted beyond the size limit.
+    """
+    cache = AnalyticsCache(max_entries=2)
+    for id in (1, 2, 1, 3):
+        cache.get(id, 1, "longest_streak", lambda: id)
+    assert [key[0] for key in cache.entries] == [1, 3]
@@ -0,0 +1,88 @@
+import pytest
+from click.testing import CliRunner
+from habit_tracker.cli import cli
+
+"""
+Testing module validating the command-line interface end to end on a temporary database.
+"""
+
+@pytest.fixture
+def runner(tmp_path, monkeypatch) -> CliRunner:
+    """
+    Fixture for a CLI runner working in an empty temporary directory.
+    """
+    monkeypatch.chdir(tmp_path)
+    return CliRunner(mix_stderr=False)
+
+def test_create_complete_analyze(runner: CliRunner):
+    """
+    Test creating, completing, listing and analyzing a habit.
+    :param runner: Fixture for a CLI runner.
+    """
+    assert "(ID: 1)" in runner.invoke(cli, ["create", "--t", "Exercise", "--p", "daily"]).output
+    assert runner.invoke(cli, ["complete", "--id", "1"]).output == "Completed habit: Exercise\n"
+    failed = runner.invoke(cli, ["complete", "--id", "2"])
+    assert failed.output == "Error: No habit with ID 2 found.\n" and failed.exit_code == 1
+    assert "Exercise" in runner.invoke(cli, ["list"]).output
+    result = runner.invoke(cli, ["analyze", "--ls", "--cs"])
+    assert "Longest streak across all habits: 1" in result.output
+    assert "- Exercise: 1" in result.output
+
+def test_timing_breakdown(runner: CliRunner):
+    """
+    Test that --timing reports every phase on stderr.
+    :param runner: Fixture for a CLI runner.
+    """
+    result = runner.invoke(cli, ["--timing", "create", "--t", "Exercise", "--p", "daily"])
+    for name in ("startup", "import", "connect", "query", "render", "total"):
+        assert f"{name}:" in result.stderr
+    assert "ms" not in result.stdout
+
+def test_profile_and_stats(runner: CliRunner):
+    """
+    Test that --profile reports calls on stderr and accumulates them for the stats command.
+    :param runner: Fixture for a CLI runner.
+    """
+    from habit_tracker import profiling
+    try:
+        result = runner.invoke(cli, ["--profile", "create", "--t", "Exercise", "--p", "daily"])
+        assert "Database.save_habit" in result.stderr
+        runner.invoke(cli, ["--profile", "complete", "--id", "1"])
+    finally:
+        profiling.disable()
+        profiling.reset()
+    assert "Database.record_completion" in runner.invoke(cli, ["stats"]).output
+    runner.invoke(cli, ["stats", "--reset"])
+    assert "No profile statistics" in runner.invoke(cli, ["stats"]).output
+
+def test_streaming_formats_and_pagination(runner: CliRunner):
+    """
+    Test JSONL, CSV and fixed-width output of list and analyze with offset and keyset pagination.
+    :param runner: Fixture for a CLI runner.
+    """
+    for task in ("Exercise", "Yoga", "Read"):
+        runner.invoke(cli, ["create", "--t", task, "--p", "daily", "--c", "health"])
+    lines = runner.invoke(cli, ["list", "--format", "jsonl", "--limit", "1", "--offset", "1"]).output.splitlines()
+    assert lines == ['{"id": 2, "name": "Yoga", "periodicity": "daily", "category": "health"}']
+    assert runner.invoke(cli, ["list", "--format", "csv", "--after-id", "2"]).output.splitlines() == [
+        "id,name,periodicity,category", "3,Read,daily,health"]
+    listed = runner.invoke(cli, ["list", "--format", "csv"]).output.splitlines()
+    assert [line.split(",")[0] for line in listed[1:]] == ["1", "2", "3"]
+    fixed = runner.invoke(cli, ["list", "--format", "fixed"]).output.splitlines()
+    assert fixed[0] == "ID  Task      Periodicity  Category" and fixed[2] == " 1  Exercise  daily        health"
+    runner.invoke(cli, ["complete", "--id", "1"])
+    assert runner.invoke(cli, ["analyze", "--format", "csv", "--cs", "--limit", "1"]).output.splitlines() == [
+        "id,name,current_streak", "1,Exercise,1"]
+
+def test_users(runner: CliRunner):
+    """
+    Test that --user keeps habits of different users apart and that --all-users aggregates them.
+    :param runner: Fixture for a CLI runner.
+    """
+    for user in ("alice", "bob"):
+        assert "(ID: 1)" in runner.invoke(cli, ["--user", user, "create", "--t", "Exercise", "--p", "daily"]).output
+    runner.invoke(cli, ["--user", "alice", "complete", "--id", "1"])
+    assert runner.invoke(cli, ["--user", "bob", "analyze", "--cs"]).output == "Current streaks:\n- Exercise: 0\n"
+    lines = runner.invoke(cli, ["analyze", "--all-users", "--cs"]).output.splitlines()
+    assert sorted(lines[1:]) == ["- Exercise: 0", "- Exercise: 1"]
+    assert "Exercise" not in runner.invoke(cli, ["list"]).output
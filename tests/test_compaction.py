@@ -0,0 +1,69 @@
+import gzip
+import pytest
+from datetime import date, timedelta
+from habit_tracker.database import Database
+from habit_tracker.habit import Habit
+from habit_tracker.stats import HabitStats
+from habit_tracker.transfer import read_records, write_records
+
+"""
+Testing module including a unit test suite for validating the compaction of old completion history.
+"""
+
+@pytest.fixture
+def db(db: Database) -> Database:
+    """
+    Fixture for a database with a daily and a weekly habit with three years of irregular completions.
+    :param db: Fixture for an empty database.
+    """
+    for name, periodicity in (("Exercise", "daily"), ("Yoga", "weekly")):
+        habit = Habit(name, periodicity, "health")
+        habit.creation_date = "2022-01-01T08:00:00"
+        habit.completion_dates = [(date(2022, 1, 1) + timedelta(days=d)).isoformat()
+                                  for d in range(1095) if d % 9 and d % 13]
+        db.save_habit(habit)
+    return db
+
+def test_compaction_keeps_results_exact(db: Database, tmp_path):
+    """
+    Test that statistics, loaded habits and period reports are unchanged by compaction and rollup backfills,
+    and that the archive holds the removed rows.
+    :param db: Fixture for a database with history.
+    :param tmp_path: Temporary directory provided by pytest.
+    """
+    stats = [s.metrics() for s in db.load_stats()]
+    report = db.period_report("month", (2022, 1), (2024, 12))
+    path = tmp_path / "archive.jsonl.gz"
+    with gzip.open(path, "at") as file:
+        result = db.compact("2024-01-01", lambda rows: write_records(rows, file, "jsonl"))
+    with gzip.open(path, "rt") as file:
+        archived = list(read_records(file, "jsonl"))
+    assert result == {"habits": 2, "completions": len(archived)}
+    assert all(record["completion_date"] < "2024-01-01" for record in archived)
+    habits = db.load_habits()
+    assert all(habit.completion_days[0] >= habit.summary.horizon for habit in habits)
+    assert [HabitStats.from_habit(habit).metrics() for habit in habits] == stats
+    with db.connect() as conn:
+        conn.execute("DELETE FROM habit_stats")
+    assert [s.metrics() for s in db.load_stats()] == stats
+    db.backfill_rollups()
+    assert db.period_report("month", (2022, 1), (2024, 12)) == report
+    assert db.compact("2023-01-01") == {"habits": 0, "completions": 0}
+
+def test_rewrite_after_compaction(db: Database):
+    """
+    Test that rewriting the history or periodicity of a compacted habit keeps the compacted completions.
+    :param db: Fixture for a database with history.
+    """
+    original = db.load_habits()[0]
+    db.compact("2024-01-01")
+    habit = db.load_habits()[0]
+    habit.completion_dates = habit.completion_dates[:-10]
+    habit.periodicity = "weekly"
+    db.save_habit(habit)
+    original.completion_days = original.completion_days[:-10]
+    original.periodicity = "weekly"
+    assert db.load_stats()[0].metrics() == HabitStats.from_habit(original).metrics()
+    assert HabitStats.from_habit(db.load_habits()[0]).metrics() == HabitStats.from_habit(original).metrics()
+    assert db.period_report("month", (2023, 12))["Exercise"] == sum(
+        1 for day in original.completion_dates if day.startswith("2023-12"))
@@ -0,0 +1,135 @@
+import pytest
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from habit_tracker.database import Database
+from habit_tracker.habit import Habit
+from habit_tracker.stats import HabitStats
+
+"""
+Testing module including a unit test suite for validating concurrent and idempotent completion recording.
+"""
+
+WORKERS = 8
+EVENTS = 100
+
+def complete_habits(db_path: str, worker: int) -> int:
+    """
+    Worker entry point: record keyed completion events shared with one other worker, and unkeyed completions.
+    :param db_path: Path to the SQLite database file.
+    :param worker: Worker number.
+    :return: Number of completions the worker recorded.
+    """
+    recorded = 0
+    with Database(db_path, busy_timeout=100, retries=8) as db:
+        for event in range(EVENTS):
+            date = f"2025-{event % 12 + 1:02d}-{worker % 28 + 1:02d}T08:00:00"
+            recorded += db.record_completions([(event % 3 + 1, date, f"event-{worker // 2}-{event}")])
+            recorded += db.record_completions([(event % 3 + 1, date)])
+    return recorded
+
+def refresh_stats(db_path: str, expected: int) -> int:
+    """
+    Worker entry point: rebuild the statistics that recorded completions mark stale until every completion is in.
+    :param db_path: Path to the SQLite database file.
+    :param expected: Number of completions the other workers record.
+    :return: Number of statistics rebuilds.
+    """
+    rounds = 0
+    with Database(db_path, busy_timeout=100, retries=8) as db:
+        conn = db.connect()
+        while conn.execute('SELECT COUNT(*) FROM completions').fetchone()[0] < expected:
+            db.load_stats()
+            rounds += 1
+    return rounds
+
+def test_concurrent_processes_lose_no_completions(tmp_path):
+    """
+    Test that processes completing the same habits concurrently, while another process rebuilds stale
+    statistics, lose no completion, record every keyed event once and leave statistics and rollups consistent
+    with the completions.
+    :param tmp_path: Temporary directory provided by pytest.
+    """
+    path = str(tmp_path / "habits.db")
+    with Database(path) as db:
+        for name in ("Exercise", "Read", "Yoga"):
+            db.save_habit(Habit(name, "daily", "health"))
+    expected = WORKERS * EVENTS + WORKERS // 2 * EVENTS
+    with ProcessPoolExecutor(max_workers=WORKERS + 1) as pool:
+        refreshes = pool.submit(refresh_stats, path, expected)
+        recorded = sum(pool.map(complete_habits, [path] * WORKERS, range(WORKERS)))
+        assert refreshes.result() > 0
+    assert recorded == expected
+    with Database(path) as db:
+        conn = db.connect()
+        assert conn.execute('SELECT COUNT(*) FROM completions').fetchone()[0] == expected
+        assert conn.execute('SELECT COUNT(*) FROM completion_keys').fetchone()[0] == WORKERS // 2 * EVENTS
+        assert conn.execute("SELECT SUM(completions) FROM completion_rollups WHERE grain = 'month'").fetchone()[0] == expected
+        stats = {s.id: s.metrics() for s in db.load_stats()}
+        assert stats == {habit.id: HabitStats.from_habit(habit).metrics() for habit in db.load_habits()}
+
+def test_idempotency_keys_and_lock_retries(tmp_path):
+    """
+    Test that a repeated idempotency key records nothing and returns the first completion, and that a write
+    waiting for a lock held longer than the busy timeout succeeds by retrying, and that a write failing after all
+    retries or for a missing habit is reported instead of acknowledged.
+    :param tmp_path: Temporary directory provided by pytest.
+    """
+    path = str(tmp_path / "habits.db")
+    db = Database(path, busy_timeout=50, retries=6, backoff=0.05)
+    habit = Habit("Exercise", "daily", "health")
+    db.save_habit(habit)
+    assert db.record_completion(habit.id, "2025-03-01T08:00:00", key="a") == "2025-03-01T08:00:00"
+    assert db.record_completion(habit.id, "2025-03-02T08:00:00", key="a") == "2025-03-01T08:00:00"
+    assert db.record_completions([(habit.id, "2025-03-03", "b"), (habit.id, "2025-03-03", "b")]) == 1
+    assert list(db.get_habit(habit.id).completion_days) == [20148, 20150]
+    blocker = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+    blocker.execute('BEGIN IMMEDIATE')
+    threading.Timer(0.3, blocker.execute, ['COMMIT']).start()
+    start = time.perf_counter()
+    assert db.record_completion(habit.id, "2025-03-04T08:00:00", key="c") == "2025-03-04T08:00:00"
+    assert time.perf_counter() - start >= 0.25
+    assert db.keyed_completion("c") == (habit.id, "2025-03-04T08:00:00")
+    blocker.execute('BEGIN IMMEDIATE')
+    impatient = Database(path, busy_timeout=10, retries=2, backoff=0.01)
+    assert impatient.record_completions([(habit.id, "2025-03-05")]) == 0
+    with pytest.raises(sqlite3.OperationalError, match="locked"):
+        impatient.record_completion(habit.id, "2025-03-05T08:00:00", key="d")
+    blocker.execute('ROLLBACK')
+    blocker.close()
+    assert impatient.keyed_completion("d") is None
+    assert len(db.get_habit(habit.id).completion_days) == 3
+    with pytest.raises(ValueError):
+        db.record_completion(habit.id + 1, key="e")
+    db.delete_habit(habit.id)
+    assert db.keyed_completion("a") is None
+
+def test_refresh_stats_keeps_completions_recorded_meanwhile(tmp_path, monkeypatch):
+    """
+    Test that a completion recorded while stale statistics are being rebuilt is not overwritten by the rebuild.
+    :param tmp_path: Temporary directory provided by pytest.
+    :param monkeypatch: Fixture for patching the rebuild to record a completion from another connection.
+    """
+    path = str(tmp_path / "habits.db")
+    db, writer = Database(path), Database(path)
+    habit = Habit("Exercise", "daily", "health")
+    habit.completion_dates = ["2025-03-01", "2025-03-02", "2025-03-03"]
+    db.save_habit(habit)
+    with db.transaction() as conn:
+        db.mark_stale(conn, habit.id)
+    write_stats = db.write_stats
+    threads = []
+    def interleaved(conn, stats):
+        threads.append(threading.Thread(target=writer.record_completion, args=(habit.id, "2025-03-04T08:00:00")))
+        threads[-1].start()
+        threads[-1].join(0.3)
+        write_stats(conn, stats)
+    monkeypatch.setattr(db, "write_stats", interleaved)
+    db.refresh_stats()
+    threads[0].join()
+    monkeypatch.undo()
+    assert db.load_stats()[0].metrics() == HabitStats.from_habit(db.get_habit(habit.id)).metrics()
+    assert db.load_stats()[0].current_streak == 4
+    db.close()
+    writer.close()
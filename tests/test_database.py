@@ -0,0 +1,201 @@
+import pytest
+import sqlite3
+from contextlib import closing
+from habit_tracker.habit import Habit, to_epoch_day
+from habit_tracker.database import Database, MIGRATIONS, SCHEMA_VERSION
+from habit_tracker.stats import HabitStats
+from datetime import datetime, timedelta
+
+"""
+Testing module including a unit test suite for validating the SQLite persistence layer.
+"""
+
+@pytest.fixture
+def saved_habits(db: Database) -> list[Habit]:
+    """
+    Fixture for a daily and a weekly habit saved with completion data.
+    :param db: Fixture for an empty database.
+    """
+    daily = Habit("Exercise", "daily", "health")
+    daily.completion_dates = [(datetime.now() - timedelta(days=i)).isoformat() for i in range(3)]
+    weekly = Habit("Yoga", "weekly", "health")
+    weekly.completion_dates = [(datetime.now() - timedelta(weeks=i)).isoformat() for i in range(4)]
+    empty = Habit("Read", "daily", "education")
+    for habit in (daily, weekly, empty):
+        db.save_habit(habit)
+    return [daily, weekly, empty]
+
+def test_load_habits(db: Database, saved_habits: list[Habit]):
+    """
+    Test that habits and completions are loaded back in insertion order.
+    :param db: Fixture for an empty database.
+    :param saved_habits: Fixture for saved habits.
+    """
+    loaded = db.load_habits()
+    assert [habit.id for habit in loaded] == [habit.id for habit in saved_habits]
+    for habit, original in zip(loaded, saved_habits):
+        assert habit.name == original.name
+        assert habit.periodicity == original.periodicity
+        assert habit.category == original.category
+        assert habit.creation_date == original.creation_date
+        assert habit.completion_dates == original.completion_dates
+
+def test_iter_habits_is_lazy(db: Database, saved_habits: list[Habit]):
+    """
+    Test that habits are streamed one at a time.
+    :param db: Fixture for an empty database.
+    :param saved_habits: Fixture for saved habits.
+    """
+    habits = db.iter_habits()
+    assert next(habits).name == "Exercise"
+    habits.close()
+
+def test_save_habit_appends_new_completions(db: Database, saved_habits: list[Habit]):
+    """
+    Test that saving a loaded habit only inserts completions appended since loading.
+    :param db: Fixture for an empty database.
+    :param saved_habits: Fixture for saved habits.
+    """
+    habit = db.load_habits()[0]
+    assert not habit.fields_changed() and habit.new_completions() == []
+    habit.complete_habit()
+    assert len(habit.new_completions()) == 1
+    db.save_habit(habit)
+    assert habit.new_completions() == []
+    assert db.load_habits()[0].completion_dates == habit.completion_dates
+
+def test_save_habit_rewrites_removed_completions(db: Database, saved_habits: list[Habit]):
+    """
+    Test that removing completions from a habit rewrites its history on save.
+    :param db: Fixture for an empty database.
+    :param saved_habits: Fixture for saved habits.
+    """
+    habit = db.load_habits()[0]
+    habit.completion_dates = habit.completion_dates[:-1]
+    habit.category = "fitness"
+    db.save_habit(habit)
+    loaded = db.load_habits()[0]
+    assert loaded.category == "fitness"
+    assert loaded.completion_dates == habit.completion_dates
+
+def test_rewritten_history_keeps_stored_timestamps(db: Database):
+    """
+    Test that rewriting a history keeps the recorded timestamps of the days still completed and only
+    writes bare dates for the days that are new.
+    :param db: Fixture for an empty database.
+    """
+    habit = Habit("Exercise", "daily", "health")
+    db.save_habit(habit)
+    for date in ("2025-03-01T07:15:00", "2025-03-02T09:30:00", "2025-03-02T21:00:00", "2025-03-03T18:45:00"):
+        db.record_completion(habit.id, date)
+    habit = db.get_habit(habit.id)
+    habit.completion_dates = ["2025-03-02", "2025-03-03", "2025-03-05"]
+    db.save_habit(habit)
+    assert [row[5] for row in db.iter_completions()] == ["2025-03-02T09:30:00", "2025-03-03T18:45:00", "2025-03-05"]
+
+def test_record_completion(db: Database, saved_habits: list[Habit]):
+    """
+    Test that recording a completion appends a single row to the habit history.
+    :param db: Fixture for an empty database.
+    :param saved_habits: Fixture for saved habits.
+    """
+    habit = saved_habits[2]
+    date = db.record_completion(habit.id)
+    assert db.load_habits()[2].completion_days.tolist() == [to_epoch_day(date)]
+
+def test_legacy_database_upgrades_in_place(tmp_path):
+    """
+    Test that a database created before schema versioning is migrated when opened.
+    :param tmp_path: Temporary directory provided by pytest.
+    """
+    path = str(tmp_path / "legacy.db")
+    with sqlite3.connect(path) as conn:
+        conn.executescript(MIGRATIONS[0])
+        conn.execute("INSERT INTO habits (name, periodicity, category, creation_date) VALUES ('Yoga', 'weekly', 'health', '2025-03-01T08:00:00')")
+        conn.execute("INSERT INTO completions (id, completion_date) VALUES (1, '2025-03-02T09:30:00')")
+    Database(path)
+    with closing(sqlite3.connect(path)) as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        assert conn.execute("SELECT creation_day FROM habits").fetchone()[0] == to_epoch_day("2025-03-01")
+        assert conn.execute("SELECT completion_day FROM completions").fetchone()[0] == to_epoch_day("2025-03-02")
+        indexes = {row[1] for row in conn.execute("SELECT * FROM sqlite_master WHERE type = 'index'")}
+    assert {"idx_habits_user_name", "idx_completions_habit_day"} <= indexes
+
+def test_connection_is_reused_and_tuned(db: Database):
+    """
+    Test that a database keeps one tuned connection per thread until it is closed.
+    :param db: Fixture for an empty database.
+    """
+    conn = db.connect()
+    assert db.connect() is conn
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+    db.close()
+    assert db.connect() is not conn
+
+def test_stats_match_analytics(db: Database, saved_habits: list[Habit]):
+    """
+    Test that incrementally maintained statistics match statistics computed from the completions.
+    :param db: Fixture for an empty database.
+    :param saved_habits: Fixture for saved habits.
+    """
+    db.record_completion(saved_habits[2].id)
+    db.record_completion(saved_habits[0].id, (datetime.now() - timedelta(days=10)).isoformat())
+    for stats, habit in zip(db.load_stats(), db.load_habits()):
+        assert stats.metrics() == HabitStats.from_habit(habit).metrics()
+
+def test_stale_stats_are_rebuilt(db: Database, saved_habits: list[Habit]):
+    """
+    Test that missing statistics are rebuilt lazily when loaded.
+    :param db: Fixture for an empty database.
+    :param saved_habits: Fixture for saved habits.
+    """
+    with db.connect() as conn:
+        conn.execute("DELETE FROM habit_stats")
+    stats = db.load_stats()
+    assert [s.longest_streak for s in stats] == [3, 4, 0]
+    assert [s.completed_periods for s in stats] == [3, 4, 0]
+
+def test_query_api(db: Database, saved_habits: list[Habit]):
+    """
+    Test single-habit lookup, filtering, date ranges and pagination.
+    :param db: Fixture for an empty database.
+    :param saved_habits: Fixture for saved habits.
+    """
+    assert db.get_habit(saved_habits[1].id).completion_dates == saved_habits[1].completion_dates
+    assert len(db.get_habit(saved_habits[1].id, with_completions=False).completion_days) == 0
+    assert db.get_habit(99) is None
+    assert [habit.name for habit in db.find_habits(category="health")] == ["Exercise", "Yoga"]
+    assert [habit.name for habit in db.find_habits(periodicity="daily", category="education")] == ["Read"]
+    assert [habit.name for habit in db.find_habits(limit=1, offset=1)] == ["Yoga"]
+    since = (datetime.now() - timedelta(days=1)).date().isoformat()
+    assert [len(habit.completion_days) for habit in db.find_habits(since=since)] == [2, 1, 0]
+    assert [stats.name for stats in db.load_stats(periodicity="weekly")] == ["Yoga"]
+
+def test_rollups_match_backfill(db: Database, saved_habits: list[Habit]):
+    """
+    Test that incrementally maintained rollups equal rollups rebuilt in bulk, including across a year boundary.
+    :param db: Fixture for an empty database.
+    :param saved_habits: Fixture for saved habits.
+    """
+    for date in ["2020-12-31", "2021-01-01", "2021-01-04", "2021-01-04T20:00:00"]:
+        db.record_completion(saved_habits[2].id, date)
+    query = "SELECT * FROM completion_rollups ORDER BY id, grain, year, period"
+    incremental = db.connect().execute(query).fetchall()
+    db.backfill_rollups()
+    assert db.connect().execute(query).fetchall() == incremental
+    assert db.period_report("week", (2020, 53))["Read"] == 2
+    assert db.period_report("week", (2021, 1))["Read"] == 2
+    assert db.period_report("month", (2020, 12), (2021, 1)) == {"Exercise": 0, "Yoga": 0, "Read": 4}
+    assert db.period_report("day", (2021, 4), category="education") == {"Read": 2}
+
+def test_iter_stats_and_column_widths(db: Database, saved_habits: list[Habit]):
+    """
+    Test streamed statistics with keyset pagination and column widths computed in SQL.
+    :param db: Fixture for an empty database.
+    :param saved_habits: Fixture for saved habits.
+    """
+    assert [stats.name for stats in db.iter_stats(min_id=2)] == ["Yoga", "Read"]
+    assert [stats.name for stats in db.iter_stats(category="health", limit=1, offset=1)] == ["Yoga"]
+    assert db.column_widths() == {"id": 1, "name": 8, "periodicity": 6, "category": 9, "longest_streak": 1,
+                                  "missed_periods": 1}
@@ -1,6 +1,7 @@
 import pytest
 from habit_tracker.habit import Habit
-from datetime import datetime, timedelta
+from habit_tracker.stats import HabitStats
+from datetime import date, datetime, timedelta
 from habit_tracker.analytics import *
 
 """ 
@@ -73,6 +74,23 @@ def test_completion_rate_weekly(sample_weekly_habit: Habit):
     """
     assert get_completion_rate(sample_weekly_habit) == 4.0 / 4.0
 
+def test_rates_and_streaks_count_periods():
+    """
+    Test that completion rates count periods with at least one completion rather than completions, and that
+    weekly streaks count consecutive ISO weeks however many days apart their completions are.
+    """
+    weekly = Habit("Yoga", "weekly", "health")
+    weekly.creation_date = "2025-03-03T08:00:00"
+    weekly.completion_dates = ["2025-03-03T08:00:00", "2025-03-12T18:00:00", "2025-03-14T07:00:00", "2025-03-17T08:00:00"]
+    assert calculate_current_streak(weekly, date(2025, 3, 19)) == 3
+    assert get_completion_rate(weekly, date(2025, 3, 23)) == 3 / 3
+    assert get_completion_rate(weekly, date(2025, 3, 30)) == 3 / 4
+    assert habit_stats(weekly).completed_periods == 3
+    daily = Habit("Exercise", "daily", "health")
+    daily.creation_date = "2025-03-01T08:00:00"
+    daily.completion_dates = ["2025-03-01T07:00:00", "2025-03-01T19:00:00", "2025-03-02T07:00:00"]
+    assert get_completion_rate(daily, date(2025, 3, 4)) == 2 / 4
+
 def test_average_completion_rate(sample_daily_habit: Habit, sample_weekly_habit: Habit):
     """
     Test the average completion rate calculation across all habits.
@@ -105,3 +123,44 @@ def test_monthly_report(sample_daily_habit: Habit, sample_weekly_habit: Habit):
     report = generate_monthly_report(habits)
     assert report[sample_daily_habit.name] == True
     assert report[sample_weekly_habit.name] == True
+
+def test_stats_from_periods():
+    """
+    Test incremental statistics over completed periods with a gap and a duplicate.
+    """
+    stats = HabitStats(1, "Exercise", "daily", "health", datetime.now().isoformat())
+    assert stats.add_days([10, 11, 11, 12, 15, 16])
+    assert (stats.current_streak, stats.longest_streak, stats.completed_periods, stats.missed_periods) == (2, 3, 5, 1)
+    assert not stats.add_period(14)
+
+def test_most_struggled_habit(sample_daily_habit: Habit, sample_weekly_habit: Habit):
+    """
+    Test that the habit with most broken streaks is selected.
+    :param sample_daily_habit: Fixture for a daily habit.
+    :param sample_weekly_habit: Fixture for a weekly habit.
+    """
+    dates = list(sample_weekly_habit.completion_dates)
+    del dates[1]
+    sample_weekly_habit.completion_dates = dates
+    assert get_most_struggled_habit([sample_daily_habit, sample_weekly_habit]) is sample_weekly_habit
+
+def test_completions_are_sorted_and_deduplicated():
+    """
+    Test that completions are stored as sorted, distinct epoch days.
+    """
+    habit = Habit("Read", "daily", "education")
+    for timestamp in ["2025-03-03T20:00:00", "2025-03-01T08:00:00", "2025-03-03T07:00:00", "2025-03-02"]:
+        habit.add_completion(timestamp)
+    assert habit.completion_dates == ("2025-03-01", "2025-03-02", "2025-03-03")
+    assert len(habit.new_completions()) == 4
+
+def test_reports_compare_year(sample_daily_habit: Habit):
+    """
+    Test that weekly and monthly reports do not count completions from the same week or month of another year.
+    :param sample_daily_habit: Fixture for a daily habit.
+    """
+    sample_daily_habit.completion_dates = ["2024-03-12"]
+    assert generate_weekly_report([sample_daily_habit], 2024, 11)[sample_daily_habit.name] == True
+    assert generate_weekly_report([sample_daily_habit], 2025, 11)[sample_daily_habit.name] == False
+    assert generate_monthly_report([sample_daily_habit], 2024, 3)[sample_daily_habit.name] == True
+    assert generate_monthly_report([sample_daily_habit], 2025, 3)[sample_daily_habit.name] == False
@@ -0,0 +1,50 @@
+import pytest
+from habit_tracker.habit import Habit
+from habit_tracker.database import Database
+from habit_tracker.parallel import analyze_parallel, summarize, id_ranges
+from datetime import datetime, timedelta
+from habit_tracker.analytics import *
+
+"""
+Testing module validating that parallel analytics merge to the same results as a serial pass.
+"""
+
+@pytest.fixture
+def db(db: Database) -> Database:
+    """
+    Fixture for a database with 30 habits with varying streaks and gaps.
+    :param db: Fixture for an empty database.
+    """
+    for i in range(30):
+        habit = Habit(f"Habit {i}", "daily" if i % 3 else "weekly", "health" if i % 2 else "education")
+        habit.creation_date = (datetime.now() - timedelta(days=60)).isoformat()
+        habit.completion_dates = [(datetime.now() - timedelta(days=day)).isoformat()
+                                  for day in range(60) if day % (i % 7 + 2)]
+        db.save_habit(habit)
+    return db
+
+def test_id_ranges_cover_all_habits(db: Database):
+    """
+    Test that ID ranges are contiguous and cover every habit.
+    :param db: Fixture for a populated database.
+    """
+    ranges = id_ranges(db, 4)
+    assert ranges[0][0] == 1 and ranges[-1][1] == 30
+    assert all(previous[1] + 1 == current[0] for previous, current in zip(ranges, ranges[1:]))
+
+@pytest.mark.parametrize("category", [None, "health"])
+def test_parallel_matches_serial(db: Database, category: str):
+    """
+    Test that merged worker aggregates equal the serial aggregates.
+    :param db: Fixture for a populated database.
+    :param category: Category to filter by.
+    """
+    habits = db.load_habits()
+    serial = summarize(habits, category=category)
+    parallel = analyze_parallel(db, 3, category=category)
+    selected = get_by_category(habits, category) if category else habits
+    assert parallel.habit_count == serial.habit_count == len(selected)
+    assert parallel.longest_streak == serial.longest_streak == calculate_longest_streak_all(selected)
+    assert parallel.average_completion_rate == pytest.approx(serial.average_completion_rate)
+    assert parallel.most_struggled_name == serial.most_struggled_name == get_most_struggled_habit(selected).name
+    assert parallel.current_streaks == serial.current_streaks
@@ -0,0 +1,54 @@
+import pytest
+from habit_tracker import analytics, profiling
+from habit_tracker.database import Database
+from habit_tracker.habit import Habit
+
+"""
+Testing module including a unit test suite for validating the opt-in instrumentation layer.
+"""
+
+@pytest.fixture
+def profiled():
+    """
+    Fixture enabling instrumentation for one test and restoring the original functions afterwards.
+    """
+    profiling.reset()
+    profiling.enable()
+    yield profiling.registry
+    profiling.disable()
+    profiling.reset()
+
+def test_instrumentation_is_opt_in():
+    """
+    Test that no function is wrapped while instrumentation is off.
+    """
+    assert not hasattr(Database.load_stats, "__wrapped__")
+    assert not hasattr(analytics.calculate_current_streak, "__wrapped__")
+
+def test_calls_rows_and_latency_are_recorded(profiled: dict, tmp_path):
+    """
+    Test that calls, rows read, rows written and latencies are recorded and survive a save/load round trip.
+    :param profiled: Fixture for the registry of enabled instrumentation.
+    :param tmp_path: Temporary directory provided by pytest.
+    """
+    db = Database(str(tmp_path / "habits.db"))
+    habit = Habit("Exercise", "daily", "health")
+    habit.completion_dates = ["2025-03-01", "2025-03-02"]
+    db.save_habit(habit)
+    db.record_completion(habit.id, "2025-03-03")
+    stats = db.load_stats()
+    assert analytics.calculate_longest_streak_all(stats) == 3
+    assert sum(1 for _ in db.iter_habits()) == 1
+    assert profiled["Database.save_habit"].rows_written >= 4
+    assert profiled["Database.record_completion"].calls == 1
+    assert profiled["Database.load_stats"].rows_read == 1
+    assert profiled["Database.iter_habits"].rows_read == 1
+    assert profiled["analytics.calculate_longest_streak_habit"].calls == 1
+    assert sum(profiled["Database.save_habit"].histogram) == 1
+    assert profiled["Database.save_habit"].percentile(0.99) >= profiled["Database.save_habit"].seconds
+    path = str(tmp_path / "profile.json")
+    profiling.save(path)
+    profiling.save(path)
+    assert profiling.load(path)["Database.record_completion"].calls == 2
+    profiling.disable()
+    assert not hasattr(Database.load_stats, "__wrapped__")
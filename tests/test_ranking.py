@@ -0,0 +1,55 @@
+import pytest
+from datetime import date
+from benchmarks.generator import generate_habits, populate
+from habit_tracker.analytics import RANKINGS, rank_habits
+from habit_tracker.database import Database
+
+"""
+Testing module including a unit test suite for validating top-K and bottom-K habit rankings.
+"""
+
+@pytest.fixture(scope="module")
+def db(tmp_path_factory) -> Database:
+    """
+    Fixture for a database with 300 generated habits with a year of history, shared by the tests of this module and closed after them.
+    :param tmp_path_factory: Temporary directory factory provided by pytest.
+    """
+    with Database(str(tmp_path_factory.mktemp("ranking") / "habits.db")) as db:
+        populate(db, generate_habits(300, 1, 0.6, "lapses", end=date.today()))
+        yield db
+
+def expected(db: Database, k: int, metric: str, bottom: bool, group_by: str) -> dict:
+    """
+    Rank habits by sorting all of them, for comparison.
+    """
+    ranking = {}
+    for stats in db.load_stats():
+        ranking.setdefault(getattr(stats, group_by) if group_by else None, []).append(stats)
+    sign = -1 if bottom else 1
+    return {group: [(stats.id, RANKINGS[metric](stats)) for stats in
+                    sorted(habits, key=lambda s: (-sign * RANKINGS[metric](s), s.id))[:k]]
+            for group, habits in ranking.items()}
+
+@pytest.mark.parametrize("metric", RANKINGS)
+@pytest.mark.parametrize("bottom", [False, True])
+@pytest.mark.parametrize("group_by", [None, "category"])
+def test_rank_habits_matches_sorting(db: Database, metric: str, bottom: bool, group_by: str):
+    """
+    Test that heap selection over all statistics and over an ordered, early-terminated stream match a full sort.
+    :param db: Fixture for a database with generated habits.
+    :param metric: Ranking metric.
+    :param bottom: Rank the lowest values.
+    :param group_by: Attribute to rank habits within.
+    """
+    ranking = rank_habits(db.iter_stats(), 5, metric, bottom, group_by)
+    assert {group: [(habit.id, value) for value, habit in ranked] for group, ranked in ranking.items()} == \
+           expected(db, 5, metric, bottom, group_by)
+    if metric == "completion_rate" or (metric == "current_streak" and bottom):
+        return
+    read = []
+    stream = (read.append(stats) or stats for stats in db.iter_stats(order_by=metric, descending=not bottom))
+    groups = db.group_values(group_by) if group_by else None
+    ranking = rank_habits(stream, 5, metric, bottom, group_by, groups, lambda stats: getattr(stats, metric))
+    assert {group: [(habit.id, value) for value, habit in ranked] for group, ranked in ranking.items()} == \
+           expected(db, 5, metric, bottom, group_by)
+    assert len(read) < 300 or metric == "current_streak"
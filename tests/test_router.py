@@ -0,0 +1,65 @@
+import threading
+import pytest
+from habit_tracker.habit import Habit
+from habit_tracker.router import StorageRouter
+
+"""
+Testing module including a unit test suite for validating per-user sharded storage.
+"""
+
+@pytest.fixture
+def router(tmp_path) -> StorageRouter:
+    """
+    Fixture for a storage router over four shard files in a temporary directory.
+    :param tmp_path: Temporary directory provided by pytest.
+    """
+    with StorageRouter(str(tmp_path / "shards"), shards=4) as router:
+        yield router
+
+def test_users_are_isolated(router: StorageRouter):
+    """
+    Test that habit names are unique per user and that users cannot read or change each other's habits.
+    :param router: Fixture for a storage router.
+    """
+    users = [f"user-{number}" for number in range(8)]
+    assert router.shard_of("alice") == router.shard_of("alice")
+    assert len({router.shard_of(user) for user in users}) > 1
+    shared = next(user for user in users if router.shard_of(user) == router.shard_of(users[0]) and user != users[0])
+    for user in (users[0], shared):
+        router.database(user).save_habit(Habit("Exercise", "daily", "health"))
+    first, second = router.database(users[0]), router.database(shared)
+    with pytest.raises(ValueError):
+        first.save_habit(Habit("Exercise", "daily", "health"))
+    other_id = second.find_habits()[0].id
+    assert first.get_habit(other_id) is None
+    assert first.record_completions([(other_id, "2025-03-01")]) == 0
+    first.delete_habit(other_id)
+    stolen = second.get_habit(other_id)
+    stolen.name = "Hacked"
+    stolen.completion_dates = ["2025-03-01"]
+    with pytest.raises(ValueError):
+        first.save_habit(stolen)
+    assert [(habit.name, habit.completion_dates) for habit in second.load_habits()] == [("Exercise", ())]
+    assert router.users() == sorted([users[0], shared])
+
+def test_concurrent_writers_and_cross_shard_aggregates(router: StorageRouter):
+    """
+    Test that users on different shards write concurrently and that aggregates cover every shard.
+    :param router: Fixture for a storage router.
+    """
+    users = [f"user-{number}" for number in range(6)]
+
+    def write(user: str):
+        habit = Habit("Exercise", "daily", "health")
+        habit.completion_dates = [f"2025-03-{day:02d}" for day in range(1, 1 + int(user[-1]) + 1)]
+        router.database(user).save_habit(habit)
+
+    threads = [threading.Thread(target=write, args=(user,)) for user in users]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    summary = router.summarize()
+    assert summary.habit_count == 6
+    assert summary.longest_streak == 6
+    assert router.summarize(category="education").habit_count == 0
@@ -0,0 +1,133 @@
+import asyncio
+import threading
+import time
+import pytest
+from contextlib import suppress
+from click.testing import CliRunner
+from habit_tracker.cli import cli
+from habit_tracker.client import connect, socket_path
+from habit_tracker.database import Database
+from habit_tracker.habit import Habit
+from habit_tracker.server import HabitServer
+
+"""
+Testing module including a unit test suite for validating the daemon and its socket client.
+"""
+
+@pytest.fixture
+def daemon(tmp_path):
+    """
+    Fixture for a daemon serving a database with one habit, running on a background event loop.
+    :param tmp_path: Temporary directory provided by pytest.
+    """
+    db = Database(str(tmp_path / "data" / "habits.db"))
+    db.save_habit(Habit("Exercise", "daily", "health"))
+    server = HabitServer(db, socket_path(db.db_path), flush_interval=60)
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(server.serve())
+
+    def run():
+        with suppress(asyncio.CancelledError):
+            loop.run_until_complete(task)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    while (client := connect(db.db_path)) is None:
+        time.sleep(0.01)
+    client.close()
+    yield server
+    loop.call_soon_threadsafe(task.cancel)
+    thread.join()
+    loop.close()
+
+def test_daemon_serves_from_memory_and_flushes(daemon: HabitServer):
+    """
+    Test that completions are acknowledged from memory and written to SQLite on flush and on shutdown, and that
+    completions with an idempotency key are written before they are acknowledged.
+    :param daemon: Fixture for a running daemon.
+    """
+    client = connect(daemon.db.db_path)
+    habit = Habit("Yoga", "weekly", "health")
+    client.save_habit(habit)
+    with pytest.raises(ValueError):
+        client.save_habit(Habit("Yoga", "weekly", "health"))
+    client.record_completion(habit.id, "2025-03-03T08:00:00")
+    client.record_completion(habit.id, "2025-03-10T08:00:00")
+    assert Database(daemon.db.db_path).get_habit(habit.id).completion_dates == ()
+    assert client.get_habit(habit.id).completion_dates == ("2025-03-03", "2025-03-10")
+    assert [stats.longest_streak for stats in client.load_stats(category="health")] == [0, 2]
+    assert client.period_report("week", (2025, 10)) == {"Exercise": 0, "Yoga": 1}
+    assert [h.name for h in client.iter_habits(page_size=1)] == ["Exercise", "Yoga"]
+    assert [s.name for s in client.iter_stats(limit=1, offset=1, page_size=1)] == ["Yoga"]
+    assert client.column_widths()["name"] == 8
+    client.request("flush")
+    assert Database(daemon.db.db_path).get_habit(habit.id).completion_dates == ("2025-03-03", "2025-03-10")
+    assert client.record_completion(habit.id, "2025-03-17T08:00:00", key="a") == "2025-03-17T08:00:00"
+    assert client.record_completion(habit.id, "2025-03-24T08:00:00", key="a") == "2025-03-17T08:00:00"
+    assert Database(daemon.db.db_path).get_habit(habit.id).completion_dates == ("2025-03-03", "2025-03-10", "2025-03-17")
+    assert client.get_habit(habit.id).completion_dates == ("2025-03-03", "2025-03-10", "2025-03-17")
+    client.close()
+    assert connect(daemon.db.db_path + ".missing") is None
+
+def test_daemon_delete(daemon: HabitServer):
+    """
+    Test that deleting through the daemon removes the habit from memory and from SQLite.
+    :param daemon: Fixture for a running daemon.
+    """
+    client = connect(daemon.db.db_path)
+    client.record_completion(1)
+    client.delete_habit(1)
+    assert client.get_habit(1) is None and client.find_habits() == []
+    with pytest.raises(ValueError):
+        client.record_completion(1)
+    assert Database(daemon.db.db_path).load_habits() == []
+    client.close()
+
+def test_offline_commands_refused_while_serving(daemon: HabitServer, tmp_path, monkeypatch):
+    """
+    Test that commands writing around the daemon are refused while it serves the database, unless --direct is set.
+    :param daemon: Fixture for a running daemon.
+    :param tmp_path: Temporary directory provided by pytest.
+    :param monkeypatch: Pytest fixture for changing the working directory.
+    """
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "completions.csv").write_text("name,periodicity,completion_date\nRun,daily,2025-03-01\n")
+    runner = CliRunner(mix_stderr=False)
+    for command in (["import", "--file", "completions.csv"], ["compact"], ["reset"]):
+        assert "A daemon is serving the database" in runner.invoke(cli, command).output
+    assert [habit.name for habit in Database(daemon.db.db_path).load_habits()] == ["Exercise"]
+    assert "Compacted 0 completions" in runner.invoke(cli, ["--direct", "compact"]).output
+
+def test_durable_completions(daemon: HabitServer, tmp_path, monkeypatch):
+    """
+    Test that a durable completion from the command line is committed before it is acknowledged, and that a
+    durable completion that cannot be written is answered with an error on a connection that stays usable.
+    :param daemon: Fixture for a running daemon.
+    :param tmp_path: Temporary directory provided by pytest.
+    :param monkeypatch: Pytest fixture for changing the working directory and failing the write.
+    """
+    monkeypatch.chdir(tmp_path)
+    result = CliRunner(mix_stderr=False).invoke(cli, ["complete", "--id", "1", "--durable"])
+    assert result.exit_code == 0 and "Completed habit: Exercise" in result.output
+    assert len(Database(daemon.db.db_path).get_habit(1).completion_days) == 1
+    monkeypatch.setattr(daemon.db, "record_completion_batch", lambda completions: [])
+    client = connect(daemon.db.db_path)
+    with pytest.raises(ValueError, match="could not be written"):
+        client.record_completion(1, "2025-03-03T08:00:00", durable=True)
+    assert client.get_habit(1).name == "Exercise"
+    client.close()
+
+def test_daemon_report_matches_database(daemon: HabitServer):
+    """
+    Test that period reports from the daemon count every completion like the direct database path, including
+    several completions on one day and completions still waiting in the write buffer.
+    :param daemon: Fixture for a running daemon.
+    """
+    client = connect(daemon.db.db_path)
+    for date in ("2025-03-03T07:00:00", "2025-03-03T19:00:00", "2025-03-05T07:00:00"):
+        client.record_completion(1, date)
+    for grain, start in (("day", (2025, 62)), ("week", (2025, 10)), ("month", (2025, 3))):
+        assert client.period_report(grain, start) == Database(daemon.db.db_path).period_report(grain, start)
+    assert client.period_report("week", (2025, 10)) == {"Exercise": 3}
+    assert client.period_report("day", (2025, 62)) == {"Exercise": 2}
+    client.close()
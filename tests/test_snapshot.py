@@ -0,0 +1,74 @@
+import pytest
+from datetime import datetime, timedelta
+from habit_tracker.database import Database
+from habit_tracker.habit import Habit
+from habit_tracker.snapshot import Snapshot, write_snapshot
+from habit_tracker.stats import HabitStats
+
+"""
+Testing module including a unit test suite for validating the binary snapshot format.
+"""
+
+@pytest.fixture
+def db(db: Database) -> Database:
+    """
+    Fixture for a database with a compacted daily habit, a weekly habit and a habit without completions.
+    :param db: Fixture for an empty database.
+    """
+    for name, periodicity, days in (("Exercise", "daily", 400), ("Yoga", "weekly", 90), ("Read", "daily", 0)):
+        habit = Habit(name, periodicity, "health")
+        habit.completion_dates = [(datetime.now() - timedelta(days=d)).isoformat() for d in range(days) if d % 5]
+        db.save_habit(habit)
+    db.compact((datetime.now() - timedelta(days=200)).date().isoformat())
+    return db
+
+def test_snapshot_round_trip(db: Database, tmp_path):
+    """
+    Test that habits read from a mapped snapshot equal the habits loaded from the database.
+    :param db: Fixture for a database with habits.
+    :param tmp_path: Temporary directory provided by pytest.
+    """
+    path = str(tmp_path / "habits.snapshot")
+    assert write_snapshot(db, path) == 3
+    with Snapshot(path) as snapshot:
+        habits = list(snapshot)
+        for habit, loaded in zip(habits, db.load_habits()):
+            assert (habit.id, habit.version, *habit.fields()) == (loaded.id, loaded.version, *loaded.fields())
+            assert list(habit.completion_days) == list(loaded.completion_days)
+            assert HabitStats.from_habit(habit).metrics() == HabitStats.from_habit(loaded).metrics()
+        assert habits[0].summary is not None and habits[1].summary is None
+        assert len(snapshot) == 3 and snapshot.is_current(db)
+        del habits, habit
+
+def test_numpy_backend_reads_snapshot(db: Database, tmp_path):
+    """
+    Test that the numpy backend computes the same statistics from the mapped completion days of a snapshot.
+    :param db: Fixture for a database with habits.
+    :param tmp_path: Temporary directory provided by pytest.
+    """
+    pytest.importorskip("numpy")
+    from habit_tracker.numpy_analytics import habit_stats
+    path = str(tmp_path / "habits.snapshot")
+    write_snapshot(db, path)
+    with Snapshot(path) as snapshot:
+        habits = list(snapshot)
+        assert habit_stats(habits[1]).metrics() == HabitStats.from_habit(habits[1]).metrics()
+        del habits
+
+def test_snapshot_invalidated_by_changes(db: Database, tmp_path):
+    """
+    Test that any write to the database makes a snapshot stale and that other files are rejected.
+    :param db: Fixture for a database with habits.
+    :param tmp_path: Temporary directory provided by pytest.
+    """
+    path = str(tmp_path / "habits.snapshot")
+    for change in (lambda: db.record_completion(3), lambda: db.save_habit(Habit("Walk", "daily", "health")),
+                   lambda: db.delete_habit(2)):
+        write_snapshot(db, path)
+        with Snapshot(path) as snapshot:
+            assert snapshot.is_current(db)
+            change()
+            assert not snapshot.is_current(db)
+    (tmp_path / "other.snapshot").write_bytes(b"not a snapshot")
+    with pytest.raises(ValueError):
+        Snapshot(str(tmp_path / "other.snapshot"))
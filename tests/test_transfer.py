@@ -0,0 +1,53 @@
+import io
+import pytest
+from habit_tracker.habit import Habit
+from habit_tracker.database import Database
+from habit_tracker.transfer import read_records, write_records
+from habit_tracker.analytics import *
+
+"""
+Testing module validating the bulk import and export pipeline.
+"""
+
+@pytest.fixture
+def db(db: Database) -> Database:
+    """
+    Fixture for a database with a daily and a weekly habit with completions.
+    :param db: Fixture for an empty database.
+    """
+    for name, periodicity, dates in [("Exercise", "daily", ["2025-03-01", "2025-03-02", "2025-03-04"]),
+                                     ("Yoga", "weekly", ["2025-03-03", "2025-03-10"])]:
+        habit = Habit(name, periodicity, "health")
+        habit.creation_date = "2025-03-01T08:00:00"
+        habit.completion_dates = dates
+        db.save_habit(habit)
+    return db
+
+@pytest.mark.parametrize("fmt", ["csv", "jsonl"])
+def test_export_import_round_trip(db: Database, tmp_path, fmt: str):
+    """
+    Test that exported completions import into an empty database with the same habits and statistics.
+    :param db: Fixture for a populated database.
+    :param fmt: Record format.
+    """
+    stream = io.StringIO()
+    assert write_records(db.iter_completions(), stream, fmt) == 5
+    stream.seek(0)
+    target = Database(str(tmp_path / "target.db"))
+    progress = []
+    assert target.import_completions(read_records(stream, fmt), batch_size=2, progress=progress.append) == 5
+    assert progress == [2, 4, 5]
+    for imported, original in zip(target.load_habits(), db.load_habits()):
+        assert imported.fields() == original.fields()
+        assert imported.completion_dates == original.completion_dates
+    assert [s.metrics() for s in target.load_stats()] == [s.metrics() for s in db.load_stats()]
+
+def test_import_by_id_rejects_unknown_habit(db: Database):
+    """
+    Test that importing a record for an unknown habit ID aborts the whole import.
+    :param db: Fixture for a populated database.
+    """
+    records = [{"habit_id": "1", "completion_date": "2025-03-05"}, {"habit_id": "99", "completion_date": "2025-03-05"}]
+    with pytest.raises(ValueError):
+        db.import_completions(records)
+    assert len(db.load_habits()[0].completion_dates) == 3
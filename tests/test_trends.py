@@ -0,0 +1,76 @@
+import pytest
+from datetime import date, timedelta
+from habit_tracker.analytics import (calculate_current_streak, get_completion_rate, generate_weekly_report,
+                                     habit_stats_as_of)
+from habit_tracker.database import Database
+from habit_tracker.habit import Habit
+from habit_tracker.trends import cohort_trend, habit_trend
+
+"""
+Testing module including a unit test suite for validating as-of analytics and trend series.
+"""
+
+@pytest.fixture
+def db(db: Database) -> Database:
+    """
+    Fixture for a database with a daily and a weekly habit with two years of irregular completions.
+    :param db: Fixture for an empty database.
+    """
+    for name, periodicity in (("Exercise", "daily"), ("Yoga", "weekly")):
+        habit = Habit(name, periodicity, "health")
+        habit.creation_date = "2024-01-01T08:00:00"
+        habit.completion_dates = [(date(2024, 1, 1) + timedelta(days=d)).isoformat()
+                                  for d in range(730) if d % 5 and d % 11 and d % 17]
+        db.save_habit(habit)
+    return db
+
+def recomputed(habit: Habit, as_of: date) -> Habit:
+    """
+    Return a copy of a habit without the completions after a date.
+    :param habit: Habit to copy.
+    :param as_of: Last date kept.
+    """
+    copy = Habit(habit.name, habit.periodicity, habit.category)
+    copy.creation_date = habit.creation_date
+    copy.completion_dates = [day for day in habit.completion_dates if day <= as_of.isoformat()]
+    return copy
+
+@pytest.mark.parametrize("step", ["daily", "weekly"])
+def test_trend_matches_as_of_analytics(db: Database, step: str):
+    """
+    Test that every point of a trend equals the as-of analytics of that day and a recomputation from the
+    completions up to that day, before and after compaction.
+    :param db: Fixture for a database with history.
+    :param step: Sampling step.
+    """
+    start, end = date(2024, 11, 1), date(2025, 3, 1)
+    for compacted in (False, True):
+        if compacted:
+            db.compact("2024-10-01")
+        for habit in db.load_habits():
+            for row in habit_trend(habit, start, end, step):
+                as_of = date.fromisoformat(row[0])
+                copy = recomputed(habit, as_of) if not compacted else habit_stats_as_of(habit, as_of)
+                expected = [calculate_current_streak(copy, as_of), habit_stats_as_of(copy, as_of).longest_streak,
+                            round(get_completion_rate(copy, as_of), 4)]
+                assert row[1:] == expected
+                assert expected == [calculate_current_streak(habit, as_of), habit_stats_as_of(habit, as_of).longest_streak,
+                                    round(get_completion_rate(habit, as_of), 4)]
+
+def test_cohort_trend_and_as_of_limits(db: Database):
+    """
+    Test cohort aggregates, reports clipped to the reference date and the errors for history that is not available.
+    :param db: Fixture for a database with history.
+    """
+    habits = db.load_habits()
+    rows = cohort_trend(habits, date(2023, 12, 25), date(2024, 2, 5), "weekly")
+    assert rows[0][1:] == [0, 0, 0.0, 0, 0.0]
+    assert [row[1] for row in rows[1:]] == [2] * (len(rows) - 1)
+    assert rows[-1][4] == max(habit_stats_as_of(habit, date(2024, 2, 5)).longest_streak for habit in habits)
+    assert generate_weekly_report(habits, as_of=date(2024, 1, 5)) == {"Exercise": True, "Yoga": True}
+    assert generate_weekly_report(habits, 2024, 2, as_of=date(2024, 1, 5)) == {"Exercise": False, "Yoga": False}
+    with pytest.raises(ValueError):
+        calculate_current_streak(db.load_stats()[0], date(2024, 6, 1))
+    db.compact("2024-10-01")
+    with pytest.raises(ValueError):
+        habit_trend(db.load_habits()[0], date(2024, 6, 1), date(2024, 12, 1))